@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from aiohttp.client_exceptions import ClientConnectorError
 from homeassistant.config_entries import ConfigEntry, ConfigEntryNotReady, SOURCE_IMPORT
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.check_config import HomeAssistantConfig
@@ -19,16 +20,32 @@ from wyzeapy.wyze_auth_lib import Token
 from .const import (
     DOMAIN,
     CONF_CLIENT,
+    DEVICE_INDEX,
+    INVENTORY,
+    POLL_SCHEDULER,
+    RATE_LIMITER,
+    BLE_SCHEDULER,
     ACCESS_TOKEN,
     REFRESH_TOKEN,
     REFRESH_TIME,
+    WYZE_API_DEVICE_SUFFIX,
     WYZE_NOTIFICATION_TOGGLE,
     BULB_LOCAL_CONTROL,
     DEFAULT_LOCAL_CONTROL,
     KEY_ID,
     API_KEY,
+    BLE_PASSIVE_UPDATES,
+    BLE_PERSISTENT_CONNECTION,
+    DEFAULT_BLE_PASSIVE_UPDATES,
+    DEFAULT_BLE_PERSISTENT_CONNECTION,
 )
+from .ble_scheduler import WyzeBleScheduler
+from .cache import WyzeInventoryCache, WyzeLockBoltCache
 from .coordinator import WyzeLockBoltCoordinator
+from .device_index import WyzeDeviceIndex
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import RequestPriority, WyzeRateLimiter, request_priority
+from .scheduler import WyzePollScheduler
 from .token_manager import TokenManager
 
 PLATFORMS = [
@@ -135,32 +152,82 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
         _LOGGER.error(e)
         raise ConfigEntryAuthFailed("Unable to login, please re-login.") from None
 
+    rate_limiter = WyzeRateLimiter()
+    rate_limiter.attach(client)
+
+    inventory_cache = WyzeInventoryCache(hass, config_entry)
+    if (inventory := await inventory_cache.async_load(client)) is not None:
+        _LOGGER.debug("Creating entities from the cached Wyze device list")
+        inventory_is_cached = True
+    else:
+        try:
+            with request_priority(RequestPriority.SETUP):
+                inventory = await WyzeDeviceInventory.async_fetch(client)
+        except ClientConnectorError as e:
+            raise ConfigEntryNotReady(
+                "Unable to fetch devices due to network issues."
+            ) from e
+        inventory_is_cached = False
+
+    scheduler = WyzePollScheduler(hass, config_entry)
+    scheduler.async_start()
+
     hass.data[DOMAIN][config_entry.entry_id] = {
         CONF_CLIENT: client,
+        INVENTORY: inventory,
+        POLL_SCHEDULER: scheduler,
+        DEVICE_INDEX: WyzeDeviceIndex(),
+        RATE_LIMITER: rate_limiter,
         "key_id": KEY_ID,
         "api_key": API_KEY,
         "coordinators": {},
     }
-    await setup_coordinators(hass, config_entry, client)
+    await setup_coordinators(hass, config_entry, client, inventory)
 
     options_dict = {
+        **config_entry.options,
         BULB_LOCAL_CONTROL: config_entry.options.get(
             BULB_LOCAL_CONTROL, DEFAULT_LOCAL_CONTROL
-        )
+        ),
     }
     hass.config_entries.async_update_entry(config_entry, options=options_dict)
 
-    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    with rate_limiter.setting_up():
+        await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    if not inventory_is_cached:
+        # Stored once the platforms hydrated the devices, with their zones
+        await inventory_cache.async_save(inventory)
 
-    mac_addresses = await client.unique_device_ids
-
-    mac_addresses.add(WYZE_NOTIFICATION_TOGGLE)
+    mac_addresses = set(inventory.unique_device_ids)
 
     hms_service = await client.hms_service
     hms_id = hms_service.hms_id
     if hms_id is not None:
         mac_addresses.add(hms_id)
 
+    async_remove_stale_devices(hass, config_entry, mac_addresses)
+
+    if inventory_is_cached:
+        config_entry.async_create_background_task(
+            hass,
+            async_reconcile_inventory(
+                hass, config_entry, client, inventory, inventory_cache
+            ),
+            "wyzeapi_inventory_reconcile",
+        )
+    return True
+
+
+@callback
+def async_remove_stale_devices(
+    hass: HomeAssistant, config_entry: ConfigEntry, mac_addresses: set[str]
+) -> None:
+    """Remove the devices of an entry that are not in the mac address list."""
+    # Devices the integration adds on its own are never stale
+    mac_addresses = mac_addresses | {
+        WYZE_NOTIFICATION_TOGGLE,
+        config_entry.entry_id + WYZE_API_DEVICE_SUFFIX,
+    }
     device_registry = dr.async_get(hass)
     for device in dr.async_entries_for_config_entry(
         device_registry, config_entry.entry_id
@@ -174,7 +241,40 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
                     "%s is not in the mac_addresses list, removing the entry", mac
                 )
                 device_registry.async_remove_device(device.id)
-    return True
+
+
+async def async_reconcile_inventory(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    client: Wyzeapy,
+    inventory: WyzeDeviceInventory,
+    inventory_cache: WyzeInventoryCache,
+) -> None:
+    """Check a cached device list against the cloud after startup.
+
+    The devices restored from the cache are then updated, and their entities
+    written, which the platforms skipped to create the entities right away.
+    """
+    try:
+        unchanged = await inventory_cache.async_reconcile(client, inventory)
+    except ClientConnectorError as e:
+        _LOGGER.warning("Unable to refresh the cached Wyze device list: %s", e)
+        return
+    if not unchanged:
+        _LOGGER.info("Wyze devices changed since the last start, reloading")
+        hass.config_entries.async_schedule_reload(config_entry.entry_id)
+        return
+
+    irrigation_zones = dict(inventory.irrigation_zones)
+    device_index: WyzeDeviceIndex = hass.data[DOMAIN][config_entry.entry_id][
+        DEVICE_INDEX
+    ]
+    for device in await inventory.async_hydrate_deferred(client):
+        device_index.async_device_updated(None, device)
+    if inventory.irrigation_zones != irrigation_zones:
+        _LOGGER.info("Wyze irrigation zones changed since the last start, reloading")
+        await inventory_cache.async_save(inventory)
+        hass.config_entries.async_schedule_reload(config_entry.entry_id)
 
 
 async def options_update_listener(hass: HomeAssistant, config_entry: ConfigEntry):
@@ -192,11 +292,25 @@ async def options_update_listener(hass: HomeAssistant, config_entry: ConfigEntry
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinators = hass.data[DOMAIN][entry.entry_id].get("coordinators", {})
+        for coordinator in coordinators.values():
+            await coordinator.async_shutdown()
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cached devices of a removed config entry."""
+    await WyzeInventoryCache(hass, entry).async_remove()
+    await WyzeLockBoltCache(hass, entry).async_remove()
 
 
 async def setup_coordinators(
-    hass: HomeAssistant, config_entry: ConfigEntry, client: Wyzeapy
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    client: Wyzeapy,
+    inventory: WyzeDeviceInventory,
 ):
     """Set up coordinators for Wyze devices that require Bluetooth."""
     # Check if Bluetooth is active and functioning
@@ -207,10 +321,73 @@ async def setup_coordinators(
         return
 
     lock_service = await client.lock_service
-    for lock in await lock_service.get_locks():
+    ble_scheduler = hass.data[DOMAIN][config_entry.entry_id].setdefault(
+        BLE_SCHEDULER, WyzeBleScheduler(hass)
+    )
+    passive_updates = config_entry.options.get(
+        BLE_PASSIVE_UPDATES, DEFAULT_BLE_PASSIVE_UPDATES
+    )
+    coordinators = hass.data[DOMAIN][config_entry.entry_id].setdefault(
+        "coordinators", {}
+    )
+    for lock in inventory.locks:
         if lock.product_model == "YD_BT1":
-            coordinators = hass.data[DOMAIN][config_entry.entry_id].setdefault(
-                "coordinators", {}
+            coordinators[lock.mac] = WyzeLockBoltCoordinator(
+                hass,
+                lock_service,
+                lock,
+                persistent_connection=config_entry.options.get(
+                    BLE_PERSISTENT_CONNECTION, DEFAULT_BLE_PERSISTENT_CONNECTION
+                ),
+                ble_scheduler=ble_scheduler,
+                passive_updates=passive_updates,
             )
-            coordinators[lock.mac] = WyzeLockBoltCoordinator(hass, lock_service, lock)
-            await coordinators[lock.mac].update_lock_info()
+
+    # Locks resolved on an earlier start don't wait for the cloud, they are
+    # refreshed in the background instead
+    lock_bolt_cache = WyzeLockBoltCache(hass, config_entry)
+    lock_infos = await lock_bolt_cache.async_load()
+    restored = {}
+    unresolved = []
+    for mac, coordinator in coordinators.items():
+        if mac in lock_infos:
+            coordinator.restore_lock_info(lock_infos[mac])
+            restored[mac] = coordinator
+        else:
+            unresolved.append(coordinator)
+    with request_priority(RequestPriority.SETUP):
+        await asyncio.gather(
+            *(coordinator.update_lock_info() for coordinator in unresolved)
+        )
+    if unresolved:
+        await lock_bolt_cache.async_save(
+            {mac: coordinator.lock_info for mac, coordinator in coordinators.items()}
+        )
+    if restored:
+        config_entry.async_create_background_task(
+            hass,
+            async_refresh_lock_bolts(restored, coordinators, lock_bolt_cache),
+            "wyzeapi_lock_bolt_refresh",
+        )
+
+    if passive_updates:
+        for coordinator in coordinators.values():
+            config_entry.async_on_unload(coordinator.async_watch_advertisements())
+
+
+async def async_refresh_lock_bolts(
+    restored: dict[str, WyzeLockBoltCoordinator],
+    coordinators: dict[str, WyzeLockBoltCoordinator],
+    lock_bolt_cache: WyzeLockBoltCache,
+) -> None:
+    """Refresh the cloud details of the restored Lock Bolts and store them all."""
+    results = await asyncio.gather(
+        *(coordinator.update_lock_info() for coordinator in restored.values()),
+        return_exceptions=True,
+    )
+    for mac, result in zip(restored, results):
+        if isinstance(result, Exception):
+            _LOGGER.warning("Unable to refresh Lock Bolt %s: %s", mac, result)
+    await lock_bolt_cache.async_save(
+        {mac: coordinator.lock_info for mac, coordinator in coordinators.items()}
+    )
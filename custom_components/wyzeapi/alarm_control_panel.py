@@ -23,6 +23,7 @@ from .token_manager import token_exception_handler
 from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN, CONF_CLIENT
+from .rate_limiter import user_command
 
 _LOGGER = logging.getLogger(__name__)
 ATTRIBUTION = "Data provided by Wyze"
@@ -89,6 +90,7 @@ class WyzeHomeMonitoring(AlarmControlPanelEntity):
 
     # Implemented Methods
     @token_exception_handler
+    @user_command
     async def async_alarm_disarm(self, code: Optional[str] = None) -> None:
         """Send disarm command."""
         try:
@@ -102,6 +104,7 @@ class WyzeHomeMonitoring(AlarmControlPanelEntity):
             self._server_out_of_sync = True
 
     @token_exception_handler
+    @user_command
     async def async_alarm_arm_home(self, code: Optional[str] = None) -> None:
         try:
             await self._hms_service.set_mode(HMSMode.HOME)
@@ -114,6 +117,7 @@ class WyzeHomeMonitoring(AlarmControlPanelEntity):
             self._server_out_of_sync = True
 
     @token_exception_handler
+    @user_command
     async def async_alarm_arm_away(self, code: Optional[str] = None) -> None:
         try:
             await self._hms_service.set_mode(HMSMode.AWAY)
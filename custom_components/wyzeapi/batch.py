@@ -0,0 +1,170 @@
+"""Batched device polling for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from wyzeapy.const import APP_NAME, APP_VER, APP_VERSION, PHONE_ID, PHONE_SYSTEM_TYPE
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.bulb_service import BulbService
+from wyzeapy.services.camera_service import DEVICEMGMT_API_MODELS, CameraService
+from wyzeapy.services.switch_service import SwitchService
+from wyzeapy.types import Device, PropertyIDs
+from wyzeapy.utils import check_for_errors_standard
+
+_LOGGER = logging.getLogger(__name__)
+
+# Services whose update() reads device state through get_property_list. Their
+# subclasses, like SwitchUsageService, may update something else entirely.
+BATCHED_SERVICES = (BulbService, SwitchService, CameraService)
+MAX_BATCH_SIZE = 20
+
+
+async def async_fetch_property_lists(
+    service: BaseService, devices: list[Device]
+) -> dict[str, list[tuple[PropertyIDs, Any]]]:
+    """Fetch the property lists of several devices with one request per chunk.
+
+    Wraps the api.wyzecam.com/app/v2/device_list/get_property_list endpoint and
+    returns the properties in the same shape as the per-device
+    ``_get_property_list`` of wyzeapy, keyed by device mac.
+    """
+    property_lists: dict[str, list[tuple[PropertyIDs, Any]]] = {}
+    for start in range(0, len(devices), MAX_BATCH_SIZE):
+        chunk = devices[start : start + MAX_BATCH_SIZE]
+        await service._auth_lib.refresh_if_should()
+
+        payload = {
+            "phone_system_type": PHONE_SYSTEM_TYPE,
+            "app_version": APP_VERSION,
+            "app_ver": APP_VER,
+            "sc": "9f275790cab94a72bd206c8876429f3c",
+            "ts": int(time.time()),
+            "sv": "9d74946e652647e9b6c9d59326aef104",
+            "access_token": service._auth_lib.token.access_token,
+            "phone_id": PHONE_ID,
+            "app_name": APP_NAME,
+            "device_list": [device.mac for device in chunk],
+            "target_pid_list": [],
+        }
+        response_json = await service._auth_lib.post(
+            "https://api.wyzecam.com/app/v2/device_list/get_property_list",
+            json=payload,
+        )
+        check_for_errors_standard(service, response_json)
+
+        for device_json in (response_json.get("data") or {}).get("device_list", []):
+            properties = []
+            for prop in device_json.get("device_property_list", []):
+                try:
+                    properties.append((PropertyIDs(prop["pid"]), prop["value"]))
+                except ValueError:
+                    pass
+            property_lists[device_json["device_mac"]] = properties
+
+    return property_lists
+
+
+class BatchedService:
+    """Stand-in for a wyzeapy service that answers from one batched fetch.
+
+    ``update`` runs the wrapped service's own update logic, so devices are parsed
+    exactly as wyzeapy would, but property lists are served from the batched
+    response and the account event list is only fetched once per batch. Devices
+    missing from the batch fall back to the per-device request.
+    """
+
+    def __init__(
+        self,
+        service: BaseService,
+        property_lists: dict[str, list[tuple[PropertyIDs, Any]]],
+    ) -> None:
+        """Initialize the batched service."""
+        self._service = service
+        self._property_lists = property_lists
+        self._event_list: dict[Any, Any] | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate everything else to the wrapped service."""
+        return getattr(self._service, name)
+
+    async def update(self, device: Device) -> Device:
+        """Update a device using the wrapped service's update logic."""
+        return await type(self._service).update(self, device)
+
+    async def _get_property_list(self, device: Device) -> list[tuple[PropertyIDs, Any]]:
+        if (properties := self._property_lists.get(device.mac)) is None:
+            return await self._service._get_property_list(device)
+        return properties
+
+    async def _get_event_list(self, count: int) -> dict[Any, Any]:
+        if self._event_list is None:
+            self._event_list = await self._service._get_event_list(count)
+        return self._event_list
+
+
+async def async_batched_service(
+    service: BaseService, devices: list[Device]
+) -> BaseService | BatchedService:
+    """Return a service that updates the devices with batched requests."""
+    if type(service) not in BATCHED_SERVICES:
+        return service
+
+    devices = [
+        device
+        for device in devices
+        if not (
+            isinstance(service, CameraService)
+            and device.product_model in DEVICEMGMT_API_MODELS
+        )
+    ]
+    try:
+        property_lists = await async_fetch_property_lists(service, devices)
+    except Exception:
+        _LOGGER.exception(
+            "Batched property fetch failed, polling %s devices one by one",
+            type(service).__name__,
+        )
+        property_lists = {}
+    return BatchedService(service, property_lists)
+
+
+async def async_set_property_lists(
+    service: BaseService, commands: list[tuple[Device, list[dict[str, str]]]]
+) -> None:
+    """Set properties on several devices with one request per chunk.
+
+    Wraps the api.wyzecam.com/app/v2/device_list/set_property_list endpoint,
+    which wyzeapy already uses to switch a single bulb, with every device of
+    the chunk in its ``device_list``.
+    """
+    for start in range(0, len(commands), MAX_BATCH_SIZE):
+        chunk = commands[start : start + MAX_BATCH_SIZE]
+        await service._auth_lib.refresh_if_should()
+
+        payload = {
+            "phone_system_type": PHONE_SYSTEM_TYPE,
+            "app_version": APP_VERSION,
+            "app_ver": APP_VER,
+            "sc": "a626948714654991afd3c0dbd7cdb901",
+            "ts": int(time.time()),
+            "sv": "ddb9baef0d7f44379cd6bfaa8698e682",
+            "access_token": service._auth_lib.token.access_token,
+            "phone_id": PHONE_ID,
+            "app_name": APP_NAME,
+            "device_list": [
+                {
+                    "device_mac": device.mac,
+                    "device_model": device.product_model,
+                    "property_list": plist,
+                }
+                for device, plist in chunk
+            ],
+        }
+        response_json = await service._auth_lib.post(
+            "https://api.wyzecam.com/app/v2/device_list/set_property_list",
+            json=payload,
+        )
+        check_for_errors_standard(service, response_json)
@@ -19,7 +19,8 @@ from wyzeapy.services.sensor_service import Sensor
 from wyzeapy.types import DeviceTypes
 from .token_manager import token_exception_handler
 
-from .const import DOMAIN, CONF_CLIENT
+from .const import DOMAIN, CONF_CLIENT, INVENTORY
+from .inventory import WyzeDeviceInventory
 
 _LOGGER = logging.getLogger(__name__)
 ATTRIBUTION = "Data provided by Wyze"
@@ -42,21 +43,16 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi binary sensor component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
 
     sensor_service = await client.sensor_service
     camera_service = await client.camera_service
 
-    cameras = [
-        WyzeCameraMotion(camera_service, camera)
-        for camera in await camera_service.get_cameras()
-    ]
-    sensors = [
-        WyzeSensor(sensor_service, sensor)
-        for sensor in await sensor_service.get_sensors()
-    ]
-
-    async_add_entities(cameras, True)
-    async_add_entities(sensors, True)
+    cameras = [WyzeCameraMotion(camera_service, camera) for camera in inventory.cameras]
+    sensors = [WyzeSensor(sensor_service, sensor) for sensor in inventory.sensors]
+
+    async_add_entities(cameras, inventory.update_before_add)
+    async_add_entities(sensors, inventory.update_before_add)
 
 
 class WyzeSensor(BinarySensorEntity):
@@ -0,0 +1,155 @@
+"""Bluetooth connection scheduling for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Connections a single adapter or proxy is trusted with at the same time
+MAX_CONNECTIONS_PER_SCANNER = 2
+# Seconds between the starts of two polls through the same adapter or proxy
+POLL_SPACING = 5
+
+
+class BlePriority(IntEnum):
+    """Order in which waiting Bluetooth operations get a connection slot."""
+
+    COMMAND = 0
+    POLL = 1
+
+
+class _ScannerSlots:
+    """Connection slots of one Bluetooth adapter or proxy."""
+
+    def __init__(self) -> None:
+        """Initialize the slots."""
+        self.in_use = 0
+        self._waiters: list[tuple[BlePriority, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._next_poll_at = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of operations waiting for a slot."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority: BlePriority) -> None:
+        """Wait for a free slot."""
+        waiter = (
+            priority,
+            next(self._counter),
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+        self._release()
+        try:
+            await waiter[2]
+        except asyncio.CancelledError:
+            if waiter[2].done() and not waiter[2].cancelled():
+                # Granted just before the cancellation, hand the slot on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            raise
+
+    def release(self) -> None:
+        """Free a slot and let the next operation through."""
+        self.in_use -= 1
+        self._release()
+
+    def _release(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._waiters and self.in_use < MAX_CONNECTIONS_PER_SCANNER:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if priority is BlePriority.POLL and now < self._next_poll_at:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self._next_poll_at - now, self._release
+                )
+                return
+            heapq.heappop(self._waiters)
+            self.in_use += 1
+            if priority is BlePriority.POLL:
+                self._next_poll_at = now + POLL_SPACING
+            future.set_result(None)
+
+
+class WyzeBleScheduler:
+    """Shares Bluetooth adapters and proxies between the Lock Bolts of an entry.
+
+    Locks connect through the scanner that hears them with the best RSSI, and
+    each scanner is used by at most MAX_CONNECTIONS_PER_SCANNER operations at a
+    time. Waiting commands are let through before waiting polls. Polls through
+    one scanner start at least POLL_SPACING seconds apart, so locks that were
+    set up together drift apart instead of all connecting on the same tick.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._slots: dict[str | None, _ScannerSlots] = {}
+
+    def async_best_device(
+        self, address: str
+    ) -> bluetooth.BluetoothScannerDevice | None:
+        """Return the connectable scanner device that hears an address best."""
+        return max(
+            bluetooth.async_scanner_devices_by_address(
+                self._hass, address, connectable=True
+            ),
+            key=lambda device: device.advertisement.rssi,
+            default=None,
+        )
+
+    async def async_acquire(self, source: str | None, priority: BlePriority) -> None:
+        """Wait for a connection slot of a scanner, see release."""
+        slots = self._slots.setdefault(source, _ScannerSlots())
+        if slots.in_use >= MAX_CONNECTIONS_PER_SCANNER:
+            _LOGGER.debug("Waiting for a Bluetooth connection slot on %s", source)
+        await slots.acquire(priority)
+
+    def release(self, source: str | None) -> None:
+        """Free a connection slot taken with async_acquire."""
+        self._slots[source].release()
+
+    @contextlib.asynccontextmanager
+    async def async_slot(
+        self, source: str | None, priority: BlePriority
+    ) -> AsyncIterator[None]:
+        """Hold a connection slot of a scanner while the block runs."""
+        await self.async_acquire(source, priority)
+        try:
+            yield
+        finally:
+            self.release(source)
+
+    def async_has_spare_slot(self, source: str | None) -> bool:
+        """Return whether a scanner has a slot left besides the ones in use."""
+        slots = self._slots.get(source)
+        return slots is None or slots.in_use < MAX_CONNECTIONS_PER_SCANNER
+
+    def diagnostics(self) -> dict[str, dict[str, int]]:
+        """Return the slot usage of every scanner."""
+        return {
+            str(source): {"in_use": slots.in_use, "queue_depth": slots.queue_depth}
+            for source, slots in self._slots.items()
+        }
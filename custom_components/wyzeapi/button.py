@@ -18,7 +18,10 @@ from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_registry import EntityCategory
 
-from .const import CONF_CLIENT, DOMAIN, RESET_BUTTON_PRESSED
+from .const import CONF_CLIENT, DOMAIN, INVENTORY, RESET_BUTTON_PRESSED
+from .coordinator import WyzeLockBoltCoordinator
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,17 +45,17 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new Wyze button component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     irrigation_service = await client.irrigation_service
-    switch_service = await client.switch_service
 
-    # Get all irrigation devices
-    irrigation_devices = await irrigation_service.get_irrigations()
+    # Get all irrigation devices, updated or restored to get their zones
+    irrigation_devices = await inventory.async_entity_devices(
+        irrigation_service, inventory.irrigations
+    )
 
     # Create a button entity for each zone in each irrigation device
     buttons = []
     for device in irrigation_devices:
-        # Update the device to get its zones
-        device = await irrigation_service.update(device)
         # Add a button entity for each enabled zone in the irrigation device
         buttons.extend(
             [
@@ -64,7 +67,7 @@ async def async_setup_entry(
         # Add a stop all schedules button for each irrigation device, not each zone
         buttons.append(WyzeIrrigationStopAllButton(irrigation_service, device))
 
-    plugs = await switch_service.get_switches()
+    plugs = inventory.switches
     buttons.extend(
         [
             WyzePowerSensorResetButton(plug)
@@ -73,6 +76,11 @@ async def async_setup_entry(
         ]
     )
 
+    coordinators = hass.data[DOMAIN][config_entry.entry_id].get("coordinators", {})
+    buttons.extend(
+        WyzeLockBoltPrepareButton(coordinator) for coordinator in coordinators.values()
+    )
+
     async_add_entities(buttons, True)
 
 
@@ -130,6 +138,7 @@ class WyzeIrrigationZoneButton(ButtonEntity):
             "quickrun_duration": self._zone.quickrun_duration,
         }
 
+    @user_command
     async def async_press(self) -> None:
         """Start the zone with its quickrun duration.
 
@@ -265,6 +274,7 @@ class WyzeIrrigationStopAllButton(ButtonEntity):
         """Return the icon for the stop all button."""
         return "mdi:octagon"
 
+    @user_command
     async def async_press(self) -> None:
         """Stop all running irrigation schedules.
 
@@ -315,3 +325,42 @@ class WyzePowerSensorResetButton(ButtonEntity):
             f"{RESET_BUTTON_PRESSED}-{self._switch.mac}",
             self._switch,
         )
+
+
+class WyzeLockBoltPrepareButton(ButtonEntity):
+    """Prepares a Wyze Lock Bolt for a lock or unlock command.
+
+    Pressing it fetches the lock's challenge ahead of time, so a command that
+    follows shortly after only has to send itself. Automations can press it on
+    presence or proximity triggers, like someone arriving home.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_name = "Prepare command"
+    _attr_icon = "mdi:lock-clock"
+
+    def __init__(self, coordinator: WyzeLockBoltCoordinator) -> None:
+        """Initialize the prepare button."""
+        self._coordinator = coordinator
+        self._lock = coordinator._lock
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID for the button."""
+        return f"{self._lock.mac}-prepare-command"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device information about this entity."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._lock.mac)},
+            name=self._lock.nickname,
+            manufacturer="WyzeLabs",
+            model=self._lock.product_model,
+        )
+
+    @user_command
+    async def async_press(self) -> None:
+        """Fetch a challenge for the next command."""
+        await self._coordinator.async_prefetch_challenge()
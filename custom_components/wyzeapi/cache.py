@@ -0,0 +1,97 @@
+"""On-disk device cache for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from wyzeapy import Wyzeapy
+
+from .const import DOMAIN
+from .inventory import WyzeDeviceInventory
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class WyzeInventoryCache:
+    """The last device list of a config entry, stored with Home Assistant.
+
+    On a warm start the inventory is rebuilt from the stored list so entities
+    exist before the Wyze cloud has answered. The list is then reconciled
+    against the cloud in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}.inventory"
+        )
+
+    async def async_load(self, client: Wyzeapy) -> WyzeDeviceInventory | None:
+        """Return the inventory from the stored device list, if there is one."""
+        if not (data := await self._store.async_load()):
+            return None
+        inventory = await WyzeDeviceInventory.async_fetch(client, data["object_list"])
+        inventory.restore(data.get("irrigation_zones", {}))
+        return inventory
+
+    async def async_save(self, inventory: WyzeDeviceInventory) -> None:
+        """Store the device list and the irrigation zones of an inventory."""
+        await self._store.async_save(
+            {
+                "object_list": inventory.object_list,
+                "irrigation_zones": inventory.irrigation_zones,
+            }
+        )
+
+    async def async_remove(self) -> None:
+        """Delete the stored device list."""
+        await self._store.async_remove()
+
+    async def async_reconcile(
+        self, client: Wyzeapy, inventory: WyzeDeviceInventory
+    ) -> bool:
+        """Refresh a cached inventory from the cloud.
+
+        Returns False when the account's devices changed since the list was
+        stored, in which case the entities have to be rebuilt.
+        """
+        fresh = await WyzeDeviceInventory.async_fetch(client)
+        fresh.irrigation_zones = inventory.irrigation_zones
+        await self.async_save(fresh)
+        if fresh.unique_device_ids != inventory.unique_device_ids:
+            return False
+        inventory.refresh_from(fresh)
+        return True
+
+
+class WyzeLockBoltCache:
+    """The cloud details of a config entry's Lock Bolts, stored with Home Assistant.
+
+    Resolving a Lock Bolt's BLE address and token takes two cloud requests per
+    lock. With the stored details, keyed by the lock's Wyze mac, the locks are
+    usable on a restart before the cloud has answered.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{config_entry.entry_id}.lock_bolts"
+        )
+
+    async def async_load(self) -> dict[str, dict[str, Any]]:
+        """Return the stored lock details by mac."""
+        return await self._store.async_load() or {}
+
+    async def async_save(self, lock_infos: dict[str, dict[str, Any]]) -> None:
+        """Store the lock details by mac."""
+        await self._store.async_save(lock_infos)
+
+    async def async_remove(self) -> None:
+        """Delete the stored lock details."""
+        await self._store.async_remove()
@@ -1,17 +1,20 @@
 """Wyze Camera integration for Home Assistant."""
 
-import base64
-import json
 import asyncio
-from dataclasses import asdict
 from collections.abc import Callable
 from typing import Any
 import logging
 import uuid
 import re
+import time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.components.camera import Camera as CameraEntity, CameraEntityFeature
+from homeassistant.components.camera import (
+    Camera as CameraEntity,
+    CameraEntityFeature,
+    Image,
+)
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
 from homeassistant.components.camera.webrtc import (
     WebRTCClientConfiguration,
     WebRTCSendMessage,
@@ -21,7 +24,6 @@ from homeassistant.components.camera.webrtc import (
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.util.ssl import get_default_context
 from propcache.api import cached_property
 from webrtc_models import RTCConfiguration, RTCIceCandidateInit, RTCIceServer
@@ -29,8 +31,34 @@ from websockets.asyncio.client import connect as websocket_connect
 from wyzeapy import Wyzeapy, CameraService
 from wyzeapy.services.camera_service import Camera
 
-from .const import CAMERA_UPDATED, CONF_CLIENT, DOMAIN
+from .const import (
+    CONF_CLIENT,
+    DEFAULT_WEBRTC_FAN_OUT,
+    DEFAULT_WEBRTC_PRESEED_TIMEOUT,
+    DOMAIN,
+    INVENTORY,
+    WEBRTC_FAN_OUT,
+    WEBRTC_PRESEED_TIMEOUT,
+)
+from .device_index import async_track_device
+from .inventory import WyzeDeviceInventory
+from .kvs_codec import (
+    decode_answer,
+    decode_candidate,
+    decode_message,
+    encode_candidate,
+    encode_offer,
+)
+from .rate_limiter import user_command
+from .snapshot import WyzeSnapshotCache
+from .stream_info import (
+    WyzeStreamInfoPrefetcher,
+    go2rtc_source,
+    signaling_url,
+    usable_lifetime,
+)
 from .token_manager import token_exception_handler
+from .webrtc_sessions import WyzeWebRTCSessionManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,57 +79,113 @@ async def async_setup_entry(
 
     _LOGGER.debug("Creating new Wyze camera component")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     camera_service = await client.camera_service
-    camera_devices = await camera_service.get_cameras()
+    # Update the camera devices to get their current state, unless they were
+    # restored on a warm start and are updated once their entities exist
+    camera_devices = await inventory.async_entity_devices(
+        camera_service, inventory.cameras
+    )
 
     # Create a camera entity for each camera device
-    cameras = []
-    for device in camera_devices:
-        # Update the device to get its zones
-        device = await camera_service.update(device)
-        cameras.extend([WyzeCamera(camera_service, device)])
-
-    for camera in cameras:
-        # Pre-seed the ICE server config by fetching it during setup, so the frontend can collect ICE servers before the offer
+    snapshots = WyzeSnapshotCache(hass, _scale_snapshot)
+    fan_out = config_entry.options.get(WEBRTC_FAN_OUT, DEFAULT_WEBRTC_FAN_OUT)
+    cameras = [
+        WyzeCamera(camera_service, device, snapshots, fan_out)
+        for device in camera_devices
+    ]
+
+    _LOGGER.debug("Wyze camera component setup complete")
+    async_add_entities(cameras, True)
+
+    # Pre-seed the ICE server config in the background, so the frontend can collect
+    # ICE servers before the offer without holding up the rest of the platform.
+    timeout = config_entry.options.get(
+        WEBRTC_PRESEED_TIMEOUT, DEFAULT_WEBRTC_PRESEED_TIMEOUT
+    )
+    config_entry.async_create_background_task(
+        hass,
+        async_preseed_webrtc_configs(cameras, timeout),
+        "wyzeapi_webrtc_preseed",
+    )
+
+
+def _scale_snapshot(image: bytes, width: int, height: int) -> bytes:
+    """Scale a JPEG snapshot as close to a size as turbojpeg allows."""
+    return scale_jpeg_camera_image(Image("image/jpeg", image), width, height)
+
+
+async def async_preseed_webrtc_configs(
+    cameras: list["WyzeCamera"], timeout: float
+) -> None:
+    """Fetch the WebRTC configuration of every camera concurrently.
+
+    Fetches still running when the deadline passes are cancelled; those cameras
+    keep reporting their configuration as not ready until an offer fetches one.
+    """
+
+    async def _fetch(camera: WyzeCamera) -> None:
         try:
             await camera.config_fetch()
         except Exception as e:
-            # Don't block startup if the config fetch fails, but log the error
+            # Don't fail the other cameras if one fetch fails, but log the error
             _LOGGER.warning(
                 "Error fetching WebRTC session configuration for camera %s: %s",
                 camera.name,
                 e,
             )
 
-    _LOGGER.debug("Wyze camera component setup complete")
-    async_add_entities(cameras, True)
+    try:
+        async with asyncio.timeout(timeout):
+            await asyncio.gather(*(_fetch(camera) for camera in cameras))
+    except TimeoutError:
+        _LOGGER.warning(
+            "WebRTC session configuration pre-seeding did not finish within %s "
+            "seconds, remaining cameras will fetch it on their first stream",
+            timeout,
+        )
 
 
 class WyzeCamera(CameraEntity):
     """Representation of a Wyze Camera."""
 
-    def __init__(self, camera_service: CameraService, camera: Camera):
-        """Initialize the camera."""
+    def __init__(
+        self,
+        camera_service: CameraService,
+        camera: Camera,
+        snapshots: WyzeSnapshotCache,
+        fan_out: bool = False,
+    ):
+        """Initialize the camera.
+
+        With `fan_out` the camera is streamed through go2rtc, which serves every
+        viewer from one upstream KVS session instead of one session per viewer.
+        Without a go2rtc provider the camera streams natively as it would
+        without `fan_out`.
+        """
         super().__init__()
         self._camera_service = camera_service
         self._camera = camera
+        self._snapshots = snapshots
         self.name = camera.nickname
         self._attr_unique_id = camera.mac
         self.brand = "Wyze"
         self.model = camera.product_model
         self.supported_features = CameraEntityFeature.STREAM
         self._webrtc_provider = None
-        self.sessions: dict[str, WyzeCameraWebRTCSession] = {}
-        self._pending_candidates: dict[str, list[RTCIceCandidateInit]] = {}
-        # Always holds an in-flight Task[dict] for the next config fetch.
-        # _async_get_webrtc_client_configuration reads the result when ready;
-        # async_handle_async_webrtc_offer awaits it to guarantee a fresh config.
-        self._cached_config: dict | None = None
-        self._config_task: asyncio.Task | None = None
+        self.sessions = WyzeWebRTCSessionManager(camera.nickname)
+        self._fan_out = fan_out
+        self._fan_out_source: tuple[float, str] | None = None
+        # Frontend sessions streaming through the go2rtc provider
+        self._fan_out_sessions: set[str] = set()
+        # Keeps an unused signaling URL and ICE servers ready for the next offer
+        self._stream_info = WyzeStreamInfoPrefetcher(
+            lambda: self._camera_service.get_stream_info(self._camera), camera.nickname
+        )
 
     async def config_fetch(self) -> None:
-        """Fetch the WebRTC session configuration for this camera and cache it for future use."""
-        self._cached_config = await self._camera_service.get_stream_info(self._camera)
+        """Fetch the WebRTC session configuration for this camera and keep it ready."""
+        await self._stream_info.async_refresh()
         _LOGGER.debug(
             "Initial fetch of WebRTC session configuration complete for camera %s",
             self.name,
@@ -131,35 +215,56 @@ class WyzeCamera(CameraEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the camera whenever there is an update."""
         self._camera = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Listen for camera updates."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._camera.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._camera, self.handle_camera_update)
         )
+        self.sessions.async_start()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop prefetching stream info and close every WebRTC session."""
+        self._stream_info.async_stop()
+        self.sessions.async_stop()
+
+    async def async_refresh_providers(self, *, write_state: bool = True) -> None:
+        """Pick the go2rtc provider with fan-out, or stream natively without one."""
+        if not self._fan_out:
+            await super().async_refresh_providers(write_state=write_state)
+            return
+        old_provider = self._webrtc_provider
+        # Let Home Assistant pick a provider over the offer handling below, as
+        # if this camera had no native WebRTC
+        self._supports_native_async_webrtc = False
+        await super().async_refresh_providers(write_state=False)
+        if self._webrtc_provider is None:
+            self._supports_native_async_webrtc = True
+            self._invalidate_camera_capabilities_cache()
+        if write_state and self._webrtc_provider != old_provider:
+            self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool:
         """Return True if the camera is currently on."""
         return self._camera.on
 
+    @user_command
     async def async_turn_on(self) -> None:
         """Turn the camera on."""
         await self._camera_service.turn_on(self._camera)
 
+    @user_command
     async def async_turn_off(self) -> None:
         """Turn the camera off."""
         await self._camera_service.turn_off(self._camera)
 
+    @user_command
     async def async_disable_motion_detection(self) -> None:
         """Disable motion detection."""
         await self._camera_service.turn_off_motion_detection(self._camera)
 
+    @user_command
     async def async_enable_motion_detection(self) -> None:
         """Enable motion detection."""
         await self._camera_service.turn_on_motion_detection(self._camera)
@@ -174,20 +279,42 @@ class WyzeCamera(CameraEntity):
         # Return None so HA omits/marks the attribute as unknown instead of crashing.
         return None
 
+    @user_command
+    async def stream_source(self) -> str | None:
+        """Return the go2rtc source of the camera when streaming through go2rtc.
+
+        go2rtc keeps one upstream connection per source and only replaces it
+        when the source changes, so a source is handed out until shortly before
+        its signed URL expires. Viewers joining before then share the upstream.
+        """
+        if self._webrtc_provider is None:
+            return None
+        if self._fan_out_source is not None:
+            expires_at, source = self._fan_out_source
+            if time.monotonic() < expires_at:
+                return source
+        config = await self._stream_info.async_take()
+        source = go2rtc_source(config)
+        self._fan_out_source = (
+            time.monotonic() + usable_lifetime(config),
+            source,
+        )
+        return source
+
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
-        """Return bytes of camera image.
-        Currently not implemented"""
-        return None
+        """Return the latest snapshot the Wyze cloud has of the camera."""
+        return await self._snapshots.async_image(self._camera, width, height)
 
     def _async_get_webrtc_client_configuration(self) -> WebRTCClientConfiguration:
         """Return the WebRTC client configuration for this camera, including ICE servers."""
-        # This shouldn't happen, but throw an error if we don't have a config ready yet
-        if self._cached_config is None:
-            raise HomeAssistantError("WebRTC session configuration not available yet")
-
-        config = self._cached_config
+        # The config is pre-seeded in the background after setup, so it may not
+        # have arrived yet for this camera
+        if (config := self._stream_info.latest) is None:
+            raise HomeAssistantError(
+                f"WebRTC session configuration for camera {self.name} is not ready yet"
+            )
 
         ice_servers = []
         for server in config.get("ice_servers", []):
@@ -208,30 +335,33 @@ class WyzeCamera(CameraEntity):
             configuration=configuration, data_channel="data"
         )
 
+    @user_command
     async def async_handle_async_webrtc_offer(
         self, offer_sdp: str, session_id: str, send_message: WebRTCSendMessage
     ) -> None:
         """Handle an incoming WebRTC offer from the frontend."""
+        if self._webrtc_provider is not None:
+            self._fan_out_sessions.add(session_id)
+            await super().async_handle_async_webrtc_offer(
+                offer_sdp, session_id, send_message
+            )
+            return
         _LOGGER.debug(
             "Handling WebRTC offer for camera %s with session ID %s",
             self.name,
             session_id,
         )
 
-        # Always fetch a truly fresh config so the signaling URL and ICE servers
-        # are never stale — KVS signed URLs are single-use and short-lived.
-        config = await self._camera_service.get_stream_info(self._camera)
-
-        # Update cached config with the new ICE servers
-        self._cached_config = config
+        # KVS signed URLs are single-use and short-lived, so every offer takes
+        # a prefetched config that was never used and hasn't expired
+        config = await self._stream_info.async_take()
         _LOGGER.debug("Fresh config for offer on camera %s: %s", self.name, config)
 
-        self.sessions[session_id] = WyzeCameraWebRTCSession(
-            session_id, self, send_message, config
-        )
-        await self.sessions[session_id].send_offer(offer_sdp)
+        session = WyzeCameraWebRTCSession(session_id, self, send_message, config)
+        self.sessions.async_add(session_id, session)
+        await session.send_offer(offer_sdp)
 
-        pending = self._pending_candidates.pop(session_id, None)
+        pending = self.sessions.async_pop_candidates(session_id)
         if pending:
             _LOGGER.debug(
                 "Flushing %d buffered ICE candidates for camera %s session %s",
@@ -240,14 +370,17 @@ class WyzeCamera(CameraEntity):
                 session_id,
             )
             for cand in pending:
-                await self.sessions[session_id].send_candidate(cand)
+                await session.send_candidate(cand)
 
     async def async_on_webrtc_candidate(
         self, session_id: str, candidate: RTCIceCandidateInit
     ) -> None:
         """Handle an incoming ICE candidate for a WebRTC session."""
-        if session_id not in self.sessions:
-            self._pending_candidates.setdefault(session_id, []).append(candidate)
+        if self._webrtc_provider is not None:
+            await super().async_on_webrtc_candidate(session_id, candidate)
+            return
+        if (session := self.sessions.get(session_id)) is None:
+            self.sessions.async_buffer_candidate(session_id, candidate)
             _LOGGER.debug(
                 "Buffered ICE candidate for camera %s session %s (session not ready yet)",
                 self.name,
@@ -255,16 +388,20 @@ class WyzeCamera(CameraEntity):
             )
             return
 
-        await self.sessions[session_id].send_candidate(candidate)
+        await session.send_candidate(candidate)
 
     def close_webrtc_session(self, session_id: str) -> None:
         """Close a WebRTC session and clean up resources."""
+        if self._webrtc_provider is not None:
+            super().close_webrtc_session(session_id)
+            self._fan_out_sessions.discard(session_id)
+            if not self._fan_out_sessions:
+                # go2rtc drops the upstream with its last viewer, and the
+                # signed URL it used can't be used again
+                self._fan_out_source = None
+            return
         _LOGGER.debug("Closing WebRTC session %s", session_id)
-        self._pending_candidates.pop(session_id, None)
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
-            session.close_connection()
-            del self.sessions[session_id]
+        self.sessions.async_close(session_id)
 
 
 class WyzeCameraWebRTCSession:
@@ -282,12 +419,12 @@ class WyzeCameraWebRTCSession:
         self.websocket = None  # This will hold the WebSocket connection
         self.camera_service = None
         self.callback = callback
-        self.close = None
         self.lock = asyncio.Lock()
         self.task = None
         self.config = config
         self.sdp_offer = None
         self.sdp_answer = None
+        self._closed = False
         # Set once connect() succeeds; send_candidate waits on this instead of reconnecting
         self._connected = asyncio.Event()
 
@@ -295,26 +432,22 @@ class WyzeCameraWebRTCSession:
         """Establish the WebSocket connection to the KVS signaling URL.
         This is called lazily from send_offer() to ensure we have the latest config
         and don't connect too early before the offer is ready."""
-        # The signaling_url from get_stream_info() is often *double*-percent-encoded
-        # (e.g. "%253A" instead of "%3A"). We must NOT fully URL-decode it because
-        # that can change SigV4 canonical encoding and make KVS reject the handshake.
-        # Instead, only "undouble" percent-escapes by converting "%25xx" -> "%xx",
-        # leaving "%3A", "%2F", etc. intact.
-        signaling_url = self.config["signaling_url"]
-        for _ in range(3):
-            if "%25" not in signaling_url:
-                break
-            signaling_url = signaling_url.replace("%25", "%")
         self.websocket = await websocket_connect(
-            signaling_url, ssl=get_default_context(), logger=_LOGGER
+            signaling_url(self.config), ssl=get_default_context(), logger=_LOGGER
         )
+        if self._closed:
+            # Closed by the session manager while connecting
+            await self.websocket.close()
+            raise ConnectionError("WebRTC session was closed")
         _LOGGER.debug(
             "WebSocket connection established for camera %s with session ID %s",
             self.camera.name,
             self.session_id,
         )
         self._connected.set()
-        asyncio.create_task(self.run_loop())
+        self.task = self.camera.sessions.async_create_task(
+            self.run_loop(), f"wyzeapi_webrtc_{self.session_id}"
+        )
 
     async def send_offer(self, offer_sdp: str):
         """Send an SDP offer to the Kinesis Video Streams signaling channel."""
@@ -326,23 +459,15 @@ class WyzeCameraWebRTCSession:
             raise ConnectionError("WebSocket connection not established")
         # Create an offer for Kinesis
         self.sdp_offer = offer_sdp
-        offer = {"type": "offer", "sdp": offer_sdp}
-        payload = {
-            "action": "SDP_OFFER",
-            "recipientClientId": "ada06f08-87f4-4e13-b699-e82db8517ae5",
-            "messagePayload": base64.b64encode(
-                json.dumps(offer, separators=(",", ":")).encode()
-            ).decode(),
-            "correlationId": str(uuid.uuid4()),
-        }
-        str_payload = json.dumps(payload)
-        _LOGGER.debug(
-            "Sending SDP offer for camera %s with session ID %s, %s",
-            self.camera.name,
-            self.session_id,
-            str_payload,
-        )
-        await self.websocket.send(str_payload)
+        message = encode_offer(offer_sdp, str(uuid.uuid4()))
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Sending SDP offer for camera %s with session ID %s, %s",
+                self.camera.name,
+                self.session_id,
+                message,
+            )
+        await self.websocket.send(message)
 
     async def send_candidate(self, candidate: RTCIceCandidateInit):
         """Send an ICE candidate to the Kinesis Video Streams signaling channel."""
@@ -356,36 +481,22 @@ class WyzeCameraWebRTCSession:
             ) from exc
         if self.websocket is None:
             raise ConnectionError("WebSocket connection not established")
-        candidate_dict = asdict(candidate)
-        candidate_payload = {
-            "candidate": candidate_dict["candidate"],
-            "sdpMid": candidate_dict["sdp_mid"],
-            "sdpMLineIndex": candidate_dict["sdp_m_line_index"],
-            "usernameFragment": candidate_dict["user_fragment"],
-        }
-        match = re.search(r"ufrag (\w{4})", candidate_payload["candidate"])
-        if match is not None:
-            candidate_payload["usernameFragment"] = match.group(1)
-        payload = {
-            "action": "ICE_CANDIDATE",
-            "recipientClientId": "ada06f08-87f4-4e13-b699-e82db8517ae5",
-            "messagePayload": base64.b64encode(
-                json.dumps(candidate_payload, separators=(",", ":")).encode()
-            ).decode(),
-        }
-        str_payload = json.dumps(payload)
-        _LOGGER.debug(
-            "Sending ICE candidate for camera %s with session ID %s: %s",
-            self.camera.name,
-            self.session_id,
-            str_payload,
-        )
-        await self.websocket.send(str_payload)
+        message = encode_candidate(candidate)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Sending ICE candidate for camera %s with session ID %s: %s",
+                self.camera.name,
+                self.session_id,
+                message,
+            )
+        await self.websocket.send(message)
 
     def close_connection(self):
         """Close the WebSocket connection to the Kinesis Video Streams signaling channel."""
-        if self.close is not None:
-            self.close()
+        self._closed = True
+        # run_loop closes the websocket when it is cancelled
+        if self.task is not None:
+            self.task.cancel()
 
     def force_correct_sdp_answer(self) -> None:
         """Force the sdp response to have the valid answer.
@@ -427,21 +538,15 @@ class WyzeCameraWebRTCSession:
         if self.websocket is None:
             raise ConnectionError("WebSocket connection not established")
 
-        loop = asyncio.get_running_loop()
-
-        def close():
-            if self.websocket is not None:
-                return loop.create_task(self.websocket.close())
-            return None
-
-        self.close = close
         _LOGGER.debug(
             "run_loop starting for camera %s session %s",
             self.camera.name,
             self.session_id,
         )
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
         try:
             async for message in self.websocket:
+                self.camera.sessions.async_touch(self.session_id)
                 if len(message) == 0:
                     _LOGGER.debug(
                         "Received empty message (type=%s) for camera %s session %s",
@@ -450,15 +555,16 @@ class WyzeCameraWebRTCSession:
                         self.session_id,
                     )
                     continue
-                _LOGGER.debug(
-                    "Received message for camera %s with session ID %s: %s",
-                    self.camera.name,
-                    self.session_id,
-                    message,
-                )
+                if debug:
+                    _LOGGER.debug(
+                        "Received message for camera %s with session ID %s: %s",
+                        self.camera.name,
+                        self.session_id,
+                        message,
+                    )
                 try:
-                    data = json.loads(message)
-                except json.JSONDecodeError as e:
+                    data = decode_message(message)
+                except ValueError as e:
                     _LOGGER.error(
                         "Failed to decode JSON message for camera %s with session ID %s: %s",
                         self.camera.name,
@@ -468,28 +574,9 @@ class WyzeCameraWebRTCSession:
                     continue
                 match data.get("messageType"):
                     case "ICE_CANDIDATE":
-                        # Decode messagePayload (base64 JSON) → RTCIceCandidateInit → WebRTCCandidate
-                        # KVS uses camelCase keys; map them to RTCIceCandidateInit's snake_case fields
-                        candidate_str = base64.b64decode(
-                            data["messagePayload"]
-                        ).decode()
-                        candidate_data = json.loads(candidate_str)
-                        rtccandidate = RTCIceCandidateInit(
-                            candidate=candidate_data["candidate"],
-                            sdp_mid=candidate_data.get("sdpMid"),
-                            sdp_m_line_index=candidate_data.get("sdpMLineIndex"),
-                            user_fragment=candidate_data.get("usernameFragment"),
-                        )
-                        self.callback(WebRTCCandidate(candidate=rtccandidate))
+                        self.callback(WebRTCCandidate(candidate=decode_candidate(data)))
                     case "SDP_ANSWER":
-                        # Decode messagePayload (base64 JSON with "type"/"sdp" keys) → extract sdp string
-                        answer_str = base64.b64decode(data["messagePayload"]).decode()
-                        try:
-                            answer_obj = json.loads(answer_str)
-                            sdp = answer_obj.get("sdp", answer_str)
-                        except json.JSONDecodeError:
-                            sdp = answer_str
-                        self.sdp_answer = sdp
+                        self.sdp_answer = decode_answer(data)
                         self.force_correct_sdp_answer()
                         self.callback(WebRTCAnswer(answer=self.sdp_answer))
                     case "STATUS_RESPONSE" | "GO_AWAY" | "RECONNECT_ICE_SERVER":
@@ -514,6 +601,9 @@ class WyzeCameraWebRTCSession:
                 e,
                 exc_info=True,
             )
+        finally:
+            await self.websocket.close()
+            self.camera.sessions.async_discard(self.session_id, self)
         _LOGGER.debug(
             "run_loop exited for camera %s session %s",
             self.camera.name,
@@ -37,7 +37,10 @@ from wyzeapy.services.thermostat_service import (
 )
 from .token_manager import token_exception_handler
 
-from .const import DOMAIN, CONF_CLIENT
+from .const import DOMAIN, CONF_CLIENT, INVENTORY
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
+from .scheduler import async_device_commanded, async_track_device_updates
 
 _LOGGER = logging.getLogger(__name__)
 ATTRIBUTION = "Data provided by Wyze"
@@ -61,14 +64,15 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi thermostat component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
 
     thermostat_service = await client.thermostat_service
     thermostats = [
         WyzeThermostat(thermostat_service, thermostat)
-        for thermostat in await thermostat_service.get_thermostats()
+        for thermostat in inventory.thermostats
     ]
 
-    async_add_entities(thermostats, True)
+    async_add_entities(thermostats, inventory.update_before_add)
 
 
 class WyzeThermostat(ClimateEntity):
@@ -203,6 +207,7 @@ class WyzeThermostat(ClimateEntity):
             return HVACAction.OFF
 
     @token_exception_handler
+    @user_command
     async def async_set_temperature(self, **kwargs) -> None:
         target_temp_low = kwargs["target_temp_low"]
         target_temp_high = kwargs["target_temp_high"]
@@ -232,12 +237,14 @@ class WyzeThermostat(ClimateEntity):
             raise HomeAssistantError(err) from err
         else:
             self._server_out_of_sync = True
+            async_device_commanded(self, self._thermostat_service, self._thermostat)
             self.async_schedule_update_ha_state()
 
     async def async_set_humidity(self, humidity: int) -> None:
         raise NotImplementedError
 
     @token_exception_handler
+    @user_command
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         try:
             if fan_mode == FAN_ON:
@@ -256,9 +263,11 @@ class WyzeThermostat(ClimateEntity):
             raise HomeAssistantError(err) from err
         else:
             self._server_out_of_sync = True
+            async_device_commanded(self, self._thermostat_service, self._thermostat)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
         try:
             if hvac_mode == HVACMode.OFF:
@@ -287,12 +296,14 @@ class WyzeThermostat(ClimateEntity):
             raise HomeAssistantError(err) from err
         else:
             self._server_out_of_sync = True
+            async_device_commanded(self, self._thermostat_service, self._thermostat)
             self.async_schedule_update_ha_state()
 
     async def async_set_swing_mode(self, swing_mode: str) -> None:
         raise NotImplementedError
 
     @token_exception_handler
+    @user_command
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         try:
             if preset_mode == PRESET_SLEEP:
@@ -312,6 +323,7 @@ class WyzeThermostat(ClimateEntity):
             raise HomeAssistantError(err) from err
         else:
             self._server_out_of_sync = True
+            async_device_commanded(self, self._thermostat_service, self._thermostat)
             self.async_schedule_update_ha_state()
 
     async def async_turn_aux_heat_on(self) -> None:
@@ -382,10 +394,13 @@ class WyzeThermostat(ClimateEntity):
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to update events."""
-        self._thermostat.callback_function = self.async_update_callback
-        self._thermostat_service.register_updater(self._thermostat, 30)
-        await self._thermostat_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self,
+                self._thermostat_service,
+                self._thermostat,
+                30,
+                self.async_update_callback,
+            )
+        )
         return await super().async_added_to_hass()
-
-    async def async_will_remove_from_hass(self) -> None:
-        self._thermostat_service.unregister_updater(self._thermostat)
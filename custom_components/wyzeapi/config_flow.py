@@ -18,9 +18,19 @@ from .const import (
     REFRESH_TOKEN,
     REFRESH_TIME,
     BULB_LOCAL_CONTROL,
+    BATCH_POLLING,
+    BLE_PASSIVE_UPDATES,
+    BLE_PERSISTENT_CONNECTION,
+    DEFAULT_BATCH_POLLING,
+    DEFAULT_BLE_PASSIVE_UPDATES,
+    DEFAULT_BLE_PERSISTENT_CONNECTION,
     DEFAULT_LOCAL_CONTROL,
+    DEFAULT_WEBRTC_FAN_OUT,
+    DEFAULT_WEBRTC_PRESEED_TIMEOUT,
     KEY_ID,
     API_KEY,
+    WEBRTC_FAN_OUT,
+    WEBRTC_PRESEED_TIMEOUT,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -168,7 +178,37 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     default=self.config_entry.options.get(
                         BULB_LOCAL_CONTROL, DEFAULT_LOCAL_CONTROL
                     ),
-                ): bool
+                ): bool,
+                vol.Optional(
+                    WEBRTC_PRESEED_TIMEOUT,
+                    default=self.config_entry.options.get(
+                        WEBRTC_PRESEED_TIMEOUT, DEFAULT_WEBRTC_PRESEED_TIMEOUT
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+                vol.Optional(
+                    WEBRTC_FAN_OUT,
+                    default=self.config_entry.options.get(
+                        WEBRTC_FAN_OUT, DEFAULT_WEBRTC_FAN_OUT
+                    ),
+                ): bool,
+                vol.Optional(
+                    BATCH_POLLING,
+                    default=self.config_entry.options.get(
+                        BATCH_POLLING, DEFAULT_BATCH_POLLING
+                    ),
+                ): bool,
+                vol.Optional(
+                    BLE_PERSISTENT_CONNECTION,
+                    default=self.config_entry.options.get(
+                        BLE_PERSISTENT_CONNECTION, DEFAULT_BLE_PERSISTENT_CONNECTION
+                    ),
+                ): bool,
+                vol.Optional(
+                    BLE_PASSIVE_UPDATES,
+                    default=self.config_entry.options.get(
+                        BLE_PASSIVE_UPDATES, DEFAULT_BLE_PASSIVE_UPDATES
+                    ),
+                ): bool,
             }
         )
         return self.async_show_form(step_id="init", data_schema=data_schema)
@@ -2,6 +2,11 @@
 
 DOMAIN = "wyzeapi"
 CONF_CLIENT = "wyzeapi_client"
+INVENTORY = "inventory"
+POLL_SCHEDULER = "poll_scheduler"
+RATE_LIMITER = "rate_limiter"
+BLE_SCHEDULER = "ble_scheduler"
+DEVICE_INDEX = "device_index"
 
 ACCESS_TOKEN = "access_token"
 REFRESH_TOKEN = "refresh_token"
@@ -10,18 +15,27 @@ KEY_ID = "key_id"
 API_KEY = "api_key"
 
 WYZE_NOTIFICATION_TOGGLE = f"{DOMAIN}.wyze.notification.toggle"
+# Suffix of the entry id identifying the "Wyze API" service device
+WYZE_API_DEVICE_SUFFIX = "-api"
 
-LOCK_UPDATED = f"{DOMAIN}.lock_updated"
-CAMERA_UPDATED = f"{DOMAIN}.camera_updated"
-LIGHT_UPDATED = f"{DOMAIN}.light_updated"
 COVER_UPDATED = f"{DOMAIN}.cover_updated"
-AIR_PURIFIER_UPDATED = f"{DOMAIN}.air_purifier_updated"
 RESET_BUTTON_PRESSED = f"{DOMAIN}.reset_button_pressed"
+DEVICE_POLLED = f"{DOMAIN}.device_polled"
 # EVENT NAMES
 WYZE_CAMERA_EVENT = "wyze_camera_event"
 
 BULB_LOCAL_CONTROL = "bulb_local_control"
 DEFAULT_LOCAL_CONTROL = True
+WEBRTC_PRESEED_TIMEOUT = "webrtc_preseed_timeout"
+DEFAULT_WEBRTC_PRESEED_TIMEOUT = 30
+WEBRTC_FAN_OUT = "webrtc_fan_out"
+DEFAULT_WEBRTC_FAN_OUT = False
+BATCH_POLLING = "batch_polling"
+DEFAULT_BATCH_POLLING = False
+BLE_PERSISTENT_CONNECTION = "ble_persistent_connection"
+DEFAULT_BLE_PERSISTENT_CONNECTION = False
+BLE_PASSIVE_UPDATES = "ble_passive_updates"
+DEFAULT_BLE_PASSIVE_UPDATES = False
 
 # Yunding (YD) is the provider for Wyze Lock Bolt
 YDBLE_LOCK_STATE_UUID = "00002220-0000-6b63-6f6c-2e6b636f6f6c"
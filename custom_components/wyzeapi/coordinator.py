@@ -1,53 +1,275 @@
 import asyncio
 import binascii
+from collections import deque
+import contextlib
+from dataclasses import dataclass
+from enum import IntEnum
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Dict
+from collections.abc import AsyncIterator
+from typing import Any, Dict
 
 from bleak import BleakClient
-from bleak.exc import BleakCharacteristicNotFoundError
+from bleak.exc import BleakCharacteristicNotFoundError, BleakError
 from bleak_retry_connector import establish_connection
 
 from homeassistant.components import bluetooth
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import PlatformNotReady
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from wyzeapy.services.lock_service import LockService, Lock
 
+from .ble_scheduler import BlePriority, WyzeBleScheduler
 from .const import YDBLE_LOCK_STATE_UUID, YDBLE_UART_RX_UUID, YDBLE_UART_TX_UUID
 from .token_manager import token_exception_handler
 from .ydble_utils import (
-    decrypt_ecb,
+    L1FrameDecoder,
+    ecb_cipher,
     pack_l1,
     pack_l2_dict,
     pack_l2_lock_unlock,
-    parse_l1,
     parse_l2_dict,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# A persistent connection is closed after this long without polls, commands or
+# state notifications, e.g. when every entity of the lock is disabled
+PERSISTENT_IDLE_TIMEOUT = 600
+# With passive updates polls only catch up on missed advertisements
+PASSIVE_UPDATE_INTERVAL = timedelta(hours=6)
+# Reads triggered by advertisement changes start at least this many seconds
+# apart, a change in between is read once the interval has passed
+ADVERTISEMENT_READ_INTERVAL = 60
+# Advertisements sampled to tell whether they change on nearly every broadcast
+ADVERTISEMENT_CHURN_SAMPLE = 20
+# The lock doesn't say when a challenge expires, so a prefetched one is only
+# used for this long and never across connections
+CHALLENGE_TTL = 30
+# A failed exchange is retried on a fresh connection after RETRY_BACKOFF
+# seconds, doubling for every further attempt
+COMMAND_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+
+
+class LockBoltStage(IntEnum):
+    """Stages of an exchange with a Lock Bolt, named after what they wait for."""
+
+    CONNECT = 0
+    CHALLENGE_ACK = 1
+    CHALLENGE = 2
+    COMMAND_ACK = 3
+    RESULT = 4
+    STATE = 5
+    DONE = 6
+
+
+# Seconds the lock gets to complete each stage, the result waits for the motor
+STAGE_TIMEOUTS = {
+    LockBoltStage.CHALLENGE_ACK: 3,
+    LockBoltStage.CHALLENGE: 3,
+    LockBoltStage.COMMAND_ACK: 3,
+    LockBoltStage.RESULT: 10,
+    LockBoltStage.STATE: 5,
+}
+
+
+class LockBoltExchange:
+    """State machine of one challenge and command exchange with a Lock Bolt.
+
+    The exchange requests a challenge, answers it with the encrypted command
+    and waits for the lock to report the result and its new state. Without a
+    command it stops once the challenge arrived, so that a later exchange can
+    skip straight to the command. Every stage has its own timeout and the time
+    spent in it is recorded.
+    """
+
+    def __init__(self, lock: Lock, command: str | None) -> None:
+        """Initialize the exchange."""
+        self.lock = lock
+        self.command = command
+        self.stage = LockBoltStage.CONNECT
+        self.challenge: bytes | None = None
+        # Milliseconds spent in each completed stage
+        self.timings: Dict[str, float] = {}
+        self._decoder = L1FrameDecoder()
+        self._advanced = asyncio.Event()
+        self._marked_at = time.monotonic()
+        self._challenge_seq_no: int | None = None
+        self._result_seq_no: int | None = None
+        self._state_received = False
+
+    async def async_run(
+        self, client: BleakClient, challenge: bytes | None = None
+    ) -> bytes | None:
+        """Run the exchange and return the challenge when it has no command."""
+        self._advance(LockBoltStage.CHALLENGE_ACK)
+        if challenge is None:
+            await self._write(client, 0, 1, pack_l2_dict(0x91, 0, {10: b"\x27"}))
+            await self._async_wait_past(LockBoltStage.CHALLENGE)
+            await self._write(client, 0x08, self._challenge_seq_no, b"")
+            if self.command is None:
+                self.stage = LockBoltStage.DONE
+                return self.challenge
+            challenge = self.challenge
+        else:
+            self.stage = LockBoltStage.COMMAND_ACK
+
+        l2_content = pack_l2_lock_unlock(
+            self.lock.ble_id, self.lock.ble_token, challenge, self.command
+        )
+        await self._write(client, 0, 2, l2_content)
+        await self._async_wait_past(LockBoltStage.RESULT)
+        await self._write(client, 0x08, self._result_seq_no, b"")
+        with contextlib.suppress(TimeoutError):
+            # The result already confirmed the command, polls catch up on state
+            await self._async_wait_past(LockBoltStage.STATE)
+        return None
+
+    def feed(self, data: bytes) -> None:
+        """Handle a notification of the lock's UART."""
+        # Notifications may hold part of a frame or several frames
+        for l2_data, l1_flags, seq_no in self._decoder.feed(data):
+            self._handle_frame(l2_data, l1_flags, seq_no)
+
+    def handle_state(self) -> None:
+        """Handle a notification of the lock's new state."""
+        if self.stage is LockBoltStage.STATE:
+            self._advance(LockBoltStage.DONE)
+        elif self.command and self.stage >= LockBoltStage.COMMAND_ACK:
+            # Arrived ahead of the result
+            self._state_received = True
+
+    def _handle_frame(self, l2_data: bytes, l1_flags: int, seq_no: int) -> None:
+        if self.stage is LockBoltStage.CHALLENGE_ACK:
+            if seq_no == 1 and l1_flags == 0x48:
+                self._advance(LockBoltStage.CHALLENGE)
+                return
+        if self.stage is LockBoltStage.CHALLENGE:
+            if l1_flags == 0x40:
+                cmd, l2_flags, l2_dict = parse_l2_dict(l2_data)
+                if cmd == 0x86 and 0xD2 in l2_dict:
+                    self.challenge = bytes(l2_dict[0xD2])
+                    self._challenge_seq_no = seq_no
+                    self._advance(LockBoltStage.COMMAND_ACK)
+                    return
+        if self.stage is LockBoltStage.COMMAND_ACK:
+            if seq_no == 2 and l1_flags == 0x48:
+                self._advance(LockBoltStage.RESULT)
+                return
+        if self.stage is LockBoltStage.RESULT:
+            if l1_flags == 0x40:
+                cmd, l2_flags, l2_dict = parse_l2_dict(l2_data)
+                if cmd == 0x04:
+                    self._result_seq_no = seq_no
+                    self._advance(LockBoltStage.STATE)
+                    if self._state_received:
+                        self._advance(LockBoltStage.DONE)
+                    return
+        _LOGGER.warning(
+            f"Unexpected message: stage={self.stage.name}"
+            f" flags={l1_flags:01x}, seq_no={seq_no:02x},"
+            f" l2_data={binascii.hexlify(l2_data)}"
+        )
+
+    def _advance(self, stage: LockBoltStage) -> None:
+        now = time.monotonic()
+        self.timings[self.stage.name.lower()] = round((now - self._marked_at) * 1000, 1)
+        self._marked_at = now
+        self.stage = stage
+        self._advanced.set()
+
+    async def _async_wait_past(self, stage: LockBoltStage) -> None:
+        while self.stage <= stage:
+            self._advanced.clear()
+            try:
+                async with asyncio.timeout(STAGE_TIMEOUTS[self.stage]):
+                    await self._advanced.wait()
+            except TimeoutError as err:
+                raise TimeoutError(
+                    f"{self.lock.nickname} sent no {self.stage.name.lower()}"
+                ) from err
+
+    @staticmethod
+    async def _write(client: BleakClient, flags: int, seq_no: int, data: bytes):
+        req = pack_l1(flags, seq_no, data)
+        await client.write_gatt_char(YDBLE_UART_TX_UUID, req, response=False)
+
+
+@dataclass
+class _QueuedCommand:
+    """A lock, unlock or challenge prefetch waiting for its turn."""
+
+    command: str | None
+    future: asyncio.Future[None]
+
 
 class WyzeLockBoltCoordinator(DataUpdateCoordinator):
     """Manages fetching data from BLE periodically."""
 
     def __init__(
-        self, hass: HomeAssistant, lock_service: LockService, lock: Lock
+        self,
+        hass: HomeAssistant,
+        lock_service: LockService,
+        lock: Lock,
+        persistent_connection: bool = False,
+        ble_scheduler: WyzeBleScheduler | None = None,
+        passive_updates: bool = False,
     ) -> None:
-        """Initialize the coordinator."""
+        """Initialize the coordinator.
+
+        With `persistent_connection` the BLE connection is kept open between
+        polls and commands, and state changes arrive as notifications. Locks
+        sharing a `ble_scheduler` share the connection slots of its scanners,
+        and a connection is only kept open while its scanner has a slot to
+        spare.
+        With `passive_updates` the lock is mostly read when its advertisement
+        changes, see async_watch_advertisements.
+        """
         super().__init__(
             hass,
             _LOGGER,
             name="Wyze Lock State Updater",
-            update_interval=timedelta(seconds=300),
+            update_interval=(
+                PASSIVE_UPDATE_INTERVAL if passive_updates else timedelta(seconds=300)
+            ),
         )
         self._lock_service = lock_service
         self._lock = lock
         # The `mac` in the original response should be UUID.
         # The actual MAC address should be retrieved from another API.
         self._uuid = lock.mac
+        # State notifications are encrypted with the end of the UUID
+        self._state_cipher = ecb_cipher(self._uuid[-16:].lower())
         self._mac = None
         self._bleak_client = None
+        self._scanner_source: str | None = None
+        self._ble_scheduler = ble_scheduler or WyzeBleScheduler(hass)
+        # Scanner whose slot the lock holds, for as long as operations run or
+        # a connection is open, and the operations using it
+        self._slot: str | None = None
+        self._slot_users = 0
+        self._persistent_connection = persistent_connection
+        self._notifying_client: BleakClient | None = None
+        self._cancel_idle_timer: CALLBACK_TYPE | None = None
+        # Serializes polls and command exchanges on the BLE connection
+        self._connection_lock = asyncio.Lock()
+        self._commands: deque[_QueuedCommand] = deque()
+        self._command_worker: asyncio.Task | None = None
+        self._exchange: LockBoltExchange | None = None
+        self._challenge: tuple[bytes, float, BleakClient] | None = None
+        self._cancel_challenge_expiry: CALLBACK_TYPE | None = None
+        self._advertised: tuple | None = None
+        self._advertisement_read_at = float("-inf")
+        self._cancel_advertisement_read: CALLBACK_TYPE | None = None
+        # Advertisements received and changed in the current churn sample
+        self._advertisements = 0
+        self._advertisement_changes = 0
+        self._advertisement_churn_logged = False
+        # Milliseconds spent in each stage of the last prefetch and command
+        self.stage_timings: Dict[str, Dict] = {}
         self._current_command = None
         # Initialize data to prevent errors during setup
         self.data = {"state": None, "timestamp": None}
@@ -55,16 +277,44 @@ class WyzeLockBoltCoordinator(DataUpdateCoordinator):
     @token_exception_handler
     async def update_lock_info(self):
         self._lock = await self._lock_service.update(self._lock)
+        self._set_ble_address()
+
+    @property
+    def lock_info(self) -> dict[str, Any]:
+        """Return what update_lock_info resolved from the cloud."""
+        return {
+            "raw_dict": self._lock.raw_dict,
+            "ble_id": self._lock.ble_id,
+            "ble_token": self._lock.ble_token,
+        }
+
+    def restore_lock_info(self, lock_info: dict[str, Any]) -> None:
+        """Restore what an earlier update_lock_info resolved from the cloud."""
+        self._lock.raw_dict = lock_info["raw_dict"]
+        self._lock.ble_id = lock_info["ble_id"]
+        self._lock.ble_token = lock_info["ble_token"]
+        self._lock.available = self._lock.raw_dict.get("onoff_line") == 1
+        self._set_ble_address()
+
+    def _set_ble_address(self) -> None:
         mac = self._lock.raw_dict["hardware_info"]["mac"]
         # The mac is stored reverse ordered and no colon, e.g. mac="ab8967452301"
         self._mac = ":".join(mac[i - 2 : i] for i in range(12, 0, -2)).upper()
 
     async def _async_update_data(self):
         """Fetch the latest data from BLE device."""
-        # Skip if running a command
-        if self._current_command:
+        # Skip if running a command or holding the connection for one
+        if self._commands or self._challenge:
             return self.data
 
+        # Slot first and then the lock, like commands, so a command queued
+        # meanwhile never waits for a poll that is still waiting for its slot
+        async with self._async_slot(BlePriority.POLL), self._connection_lock:
+            if self._commands or self._challenge:
+                return self.data
+            return await self._async_read_state()
+
+    async def _async_read_state(self):
         client = await self._get_ble_client()
         if client is None:
             raise UpdateFailed(
@@ -79,126 +329,390 @@ class WyzeLockBoltCoordinator(DataUpdateCoordinator):
                 f"Characteristic {YDBLE_LOCK_STATE_UUID} not found on device {self._lock.nickname}. "
                 "Device may be locked, have firmware issues, or require pairing."
             ) from e
-        finally:
+        except BleakError as e:
+            if not self._persistent_connection:
+                raise
+            # The kept connection went stale, read again over a fresh one
+            _LOGGER.debug("Reconnecting stale BLE connection: %s", e)
             await self._disconnect()
+            client = await self._get_ble_client()
+            if client is None:
+                raise UpdateFailed(f"Lost BLE device {self._lock.nickname}") from e
+            return self._parse_state(await client.read_gatt_char(YDBLE_LOCK_STATE_UUID))
+        finally:
+            if not self._persistent_connection or not self._can_keep_connection():
+                await self._disconnect()
 
-    async def lock_unlock(self, command="lock"):
-        if self._current_command:
-            self.async_update_listeners()
-            raise Exception(f"Waiting for {self._current_command} command to complete")
-        self._current_command = command
-        self.async_update_listeners()
-        client = await self._get_ble_client()
-        if client is None:
-            raise Exception(
-                f"Could not find BLE device {self._lock.nickname} with address {self._mac}. Device may not be in range."
+    @callback
+    def async_watch_advertisements(self) -> CALLBACK_TYPE:
+        """Read the lock whenever its advertisement changes.
+
+        Advertisements are received passively, without connecting. Their
+        payload isn't decoded, so any change of the manufacturer or service
+        data is taken as a changed lock state or event counter. Reads start
+        at least ADVERTISEMENT_READ_INTERVAL seconds apart.
+        """
+        return bluetooth.async_register_callback(
+            self.hass,
+            self._handle_advertisement,
+            bluetooth.BluetoothCallbackMatcher(address=self._mac),
+            bluetooth.BluetoothScanningMode.PASSIVE,
+        )
+
+    @callback
+    def _handle_advertisement(
+        self,
+        service_info: bluetooth.BluetoothServiceInfoBleak,
+        change: bluetooth.BluetoothChange,
+    ):
+        advertised = (
+            tuple(sorted(service_info.manufacturer_data.items())),
+            tuple(sorted(service_info.service_data.items())),
+        )
+        changed = self._advertised is not None and advertised != self._advertised
+        self._advertised = advertised
+        self._sample_advertisement(changed)
+        if changed:
+            _LOGGER.debug("Advertisement of %s changed", self._lock.nickname)
+            self._read_for_advertisement()
+
+    @callback
+    def _read_for_advertisement(self) -> None:
+        if self._cancel_advertisement_read is not None:
+            # A read is already scheduled and will see this change as well
+            return
+        now = time.monotonic()
+        wait = self._advertisement_read_at + ADVERTISEMENT_READ_INTERVAL - now
+        if wait > 0:
+            self._cancel_advertisement_read = async_call_later(
+                self.hass, wait, self._async_advertisement_read_due
             )
+            return
+        self._advertisement_read_at = now
+        # Debounced, a burst of changes results in at most two reads
+        self.hass.async_create_task(self.async_request_refresh())
 
-        # disconnect in 10 seconds in case of error
-        asyncio.create_task(self._disconnect(delay=10))
+    @callback
+    def _async_advertisement_read_due(self, _now) -> None:
+        self._cancel_advertisement_read = None
+        self._read_for_advertisement()
 
-        context = {"command": command, "stage": 0}
+    @callback
+    def _sample_advertisement(self, changed: bool) -> None:
+        self._advertisements += 1
+        self._advertisement_changes += changed
+        if self._advertisements < ADVERTISEMENT_CHURN_SAMPLE:
+            return
+        if (
+            self._advertisement_changes > ADVERTISEMENT_CHURN_SAMPLE / 2
+            and not self._advertisement_churn_logged
+        ):
+            # Such a lock is read every ADVERTISEMENT_READ_INTERVAL seconds
+            _LOGGER.warning(
+                "The advertisement of %s changes on %s of the last %s broadcasts, "
+                "so it is read far more often than polling would. Consider "
+                "turning off updates on Bluetooth advertisement changes",
+                self._lock.nickname,
+                self._advertisement_changes,
+                self._advertisements,
+            )
+            self._advertisement_churn_logged = True
+        self._advertisements = self._advertisement_changes = 0
 
-        async def _handle_uart_rx_context(sender, data):
-            await self._handle_uart_rx(sender, data, client, context)
+    async def lock_unlock(self, command="lock"):
+        """Run a lock or unlock command after the commands queued before it.
 
-        await client.start_notify(YDBLE_UART_RX_UUID, _handle_uart_rx_context)
-        await client.start_notify(YDBLE_LOCK_STATE_UUID, self._handle_state)
-        await self._request_challenge(client)
+        A command matching the last queued or running one is merged into it,
+        so repeated requests end up as a single exchange with the lock.
+        """
+        await self._async_queue(command)
 
-    async def _request_challenge(self, client: BleakClient):
-        l2_content = pack_l2_dict(0x91, 0, {10: b"\x27"})
-        req = pack_l1(0, 1, l2_content)
-        await client.write_gatt_char(YDBLE_UART_TX_UUID, req, response=False)
+    async def async_prefetch_challenge(self):
+        """Request a challenge for a lock or unlock command that is likely soon.
 
-    async def _send_lock_unlock(self, client: BleakClient, challenge, command):
-        l2_content = pack_l2_lock_unlock(
-            self._lock.ble_id, self._lock.ble_token, challenge, command
+        A command sent while the challenge is valid skips the challenge
+        exchange and only writes the command itself.
+        """
+        if self._commands or self._challenge:
+            return
+        await self._async_queue(None)
+
+    async def _async_queue(self, command: str | None):
+        if self._commands and self._commands[-1].command == command:
+            queued = self._commands[-1]
+        else:
+            queued = _QueuedCommand(command, asyncio.get_running_loop().create_future())
+            self._commands.append(queued)
+        if self._command_worker is None or self._command_worker.done():
+            self._command_worker = asyncio.create_task(self._async_run_commands())
+        # Merged callers share the future, don't let one of them cancel it
+        await asyncio.shield(queued.future)
+
+    async def _async_run_commands(self):
+        try:
+            await self._async_run_queued()
+        finally:
+            self._abort_commands()
+
+    @callback
+    def _abort_commands(self):
+        """Fail the queued commands, don't leave callers waiting on them."""
+        if not self._commands:
+            return
+        while self._commands:
+            queued = self._commands.popleft()
+            queued.future.set_exception(
+                HomeAssistantError(
+                    f"{queued.command or 'Challenge prefetch'} of {self._lock.nickname} was aborted"
+                )
+            )
+        self._current_command = None
+        self.async_update_listeners()
+
+    async def _async_run_queued(self):
+        async with self._async_slot(BlePriority.COMMAND), self._connection_lock:
+            while self._commands:
+                queued = self._commands[0]
+                if queued.command:
+                    self._current_command = queued.command
+                    self.async_update_listeners()
+                try:
+                    await self._async_run_exchange(queued.command)
+                except Exception as err:
+                    queued.future.set_exception(err)
+                else:
+                    queued.future.set_result(None)
+                self._commands.popleft()
+
+            if (
+                self._persistent_connection or self._challenge
+            ) and self._can_keep_connection():
+                self._current_command = None
+                self.async_update_listeners()
+            else:
+                await self._disconnect()
+
+    async def _async_run_exchange(self, command: str | None):
+        for attempt in range(COMMAND_ATTEMPTS):
+            exchange = LockBoltExchange(self._lock, command)
+            self.stage_timings["command" if command else "prefetch"] = exchange.timings
+            try:
+                client = await self._get_ble_client()
+                if client is None:
+                    raise HomeAssistantError(
+                        f"Could not find BLE device {self._lock.nickname} with address {self._mac}. Device may not be in range."
+                    )
+                await self._start_notify(client)
+                self._exchange = exchange
+                challenge = await exchange.async_run(
+                    client, self._take_challenge(client) if command else None
+                )
+            except (BleakError, TimeoutError, HomeAssistantError) as err:
+                if attempt == COMMAND_ATTEMPTS - 1:
+                    raise HomeAssistantError(
+                        f"{command or 'Challenge prefetch'} of {self._lock.nickname} failed: {err}"
+                    ) from err
+                _LOGGER.debug(
+                    "Retrying %s of %s: %s",
+                    command or "challenge prefetch",
+                    self._lock.nickname,
+                    err,
+                )
+                await self._close_connection()
+                await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+            else:
+                _LOGGER.debug(
+                    "%s of %s took %s ms per stage",
+                    command or "Challenge prefetch",
+                    self._lock.nickname,
+                    exchange.timings,
+                )
+                if challenge is not None:
+                    self._store_challenge(challenge, client)
+                return
+            finally:
+                self._exchange = None
+
+    def _store_challenge(self, challenge: bytes, client: BleakClient):
+        self._challenge = (challenge, time.monotonic(), client)
+        self._cancel_challenge_expiry = async_call_later(
+            self.hass, CHALLENGE_TTL, self._async_challenge_expired
         )
-        req = pack_l1(0, 2, l2_content)
-        await client.write_gatt_char(YDBLE_UART_TX_UUID, req, response=False)
 
-    async def _send_ack(self, client: BleakClient, seq_no: int):
-        req = pack_l1(0x08, seq_no, b"")
-        await client.write_gatt_char(YDBLE_UART_TX_UUID, req, response=False)
+    def _take_challenge(self, client: BleakClient) -> bytes | None:
+        if self._challenge is None:
+            return None
+        challenge, fetched_at, challenge_client = self._challenge
+        self._drop_challenge()
+        if (
+            challenge_client is not client
+            or not client.is_connected
+            or time.monotonic() - fetched_at > CHALLENGE_TTL
+        ):
+            return None
+        return challenge
+
+    def _drop_challenge(self):
+        self._challenge = None
+        if self._cancel_challenge_expiry:
+            self._cancel_challenge_expiry()
+            self._cancel_challenge_expiry = None
+
+    async def _async_challenge_expired(self, _now):
+        self._cancel_challenge_expiry = None
+        self._challenge = None
+        if not self._persistent_connection and not self._commands:
+            async with self._connection_lock:
+                await self._disconnect()
+
+    async def _start_notify(self, client: BleakClient):
+        if self._notifying_client is client:
+            return
+        await client.start_notify(YDBLE_UART_RX_UUID, self._handle_uart_rx)
+        await client.start_notify(YDBLE_LOCK_STATE_UUID, self._handle_state)
+        self._notifying_client = client
 
     async def _handle_state(self, sender, data: bytearray):
+        self._reset_idle_timer()
         self.data = self._parse_state(data)
-        self._current_command = None
+        if self._exchange is not None:
+            self._exchange.handle_state()
         self.async_update_listeners()
 
     def _parse_state(self, state_data):
-        data = decrypt_ecb(self._uuid[-16:].lower(), state_data)
+        data = self._state_cipher.decrypt(state_data)
         result = {
             "state": data[0],
             "timestamp": datetime.fromtimestamp(int.from_bytes(data[1:5])),
         }
         return result
 
-    async def _handle_uart_rx(
-        self, sender, data: bytearray, client: BleakClient, context: Dict
-    ):
-        # Process for unfinished data
-        if "l1_unfinished" in context:
-            data = context["l1_unfinished"] + data
-            del context["l1_unfinished"]
-        l2_data, l1_flags, seq_no, remain = parse_l1(data)
-        if remain:
-            context["l1_unfinished"] = data
+    async def _handle_uart_rx(self, sender, data: bytearray):
+        if self._exchange is None:
+            _LOGGER.debug("Ignoring UART message outside of a command")
             return
+        self._exchange.feed(data)
 
-        # Process messages
-        if context["stage"] == 0:
-            # Ack for request chanllenge
-            if seq_no == 1 and l1_flags == 0x48:
-                context["stage"] = 1
-                return
-        if context["stage"] == 1:
-            if l1_flags == 0x40:
-                # Process L2 dict
-                cmd, l2_flags, l2_dict = parse_l2_dict(l2_data)
-                if cmd == 0x86 and 0xD2 in l2_dict:
-                    # Got generated chanllenge
-                    challenge = l2_dict[0xD2]
-                    await self._send_ack(client, seq_no=seq_no)
-                    await self._send_lock_unlock(client, challenge, context["command"])
-                    context["stage"] = 2
-                    return
-        if context["stage"] == 2:
-            # Ack for send_lock_unlock
-            if seq_no == 2 and l1_flags == 0x48:
-                context["stage"] = 3
-                return
-        if context["stage"] == 3:
-            if l1_flags == 0x40:
-                cmd, l2_flags, l2_dict = parse_l2_dict(l2_data)
-                if cmd == 0x04:
-                    await self._send_ack(client, seq_no=seq_no)
-                    return
-        _LOGGER.warning(
-            f"Unexpected message: stage={context['stage']}"
-            f" flags={l1_flags:01x}, seq_no={seq_no:02x},"
-            f" l2_data={binascii.hexlify(l2_data)}"
-        )
+    @contextlib.asynccontextmanager
+    async def _async_slot(self, priority: BlePriority) -> AsyncIterator[None]:
+        """Hold a scanner slot, or share the one of the open connection."""
+        self._slot_users += 1
+        try:
+            if self._slot is None:
+                source = self._slot_source()
+                await self._ble_scheduler.async_acquire(source, priority)
+                if self._slot is None:
+                    self._slot = source
+                else:
+                    # Another operation of this lock got one meanwhile
+                    self._ble_scheduler.release(source)
+            yield
+        finally:
+            self._slot_users -= 1
+            self._release_slot()
+
+    @callback
+    def _release_slot(self) -> None:
+        if self._slot_users or self._slot is None:
+            return
+        if self._bleak_client and self._bleak_client.is_connected:
+            return
+        self._ble_scheduler.release(self._slot)
+        self._slot = None
+
+    def _can_keep_connection(self) -> bool:
+        # A kept connection keeps its slot, so leave one free for other locks
+        # and connect per operation when the scanner is at its cap
+        return self._ble_scheduler.async_has_spare_slot(self._slot)
+
+    def _slot_source(self) -> str | None:
+        if self._bleak_client and self._bleak_client.is_connected:
+            return self._scanner_source
+        if not self._mac:
+            return None
+        if (scanner_device := self._ble_scheduler.async_best_device(self._mac)) is None:
+            return None
+        return scanner_device.scanner.source
 
     async def _get_ble_client(self) -> BleakClient | None:
         if not self._bleak_client or not self._bleak_client.is_connected:
             if not self._mac:
                 raise PlatformNotReady("Not initialized")
-            ble_device = bluetooth.async_ble_device_from_address(
-                self.hass, self._mac, connectable=True
-            )
-            if ble_device is None:
+            scanner_device = self._ble_scheduler.async_best_device(self._mac)
+            if scanner_device is None:
                 return None
 
+            ble_device = scanner_device.ble_device
+            self._scanner_source = scanner_device.scanner.source
             self._bleak_client = await establish_connection(
-                BleakClient, ble_device, ble_device.address
+                BleakClient,
+                ble_device,
+                ble_device.address,
+                disconnected_callback=self._handle_disconnected,
             )
+            if self._persistent_connection:
+                # Pushed state replaces polling while the connection is up
+                await self._start_notify(self._bleak_client)
+        if self._persistent_connection:
+            self._reset_idle_timer()
         return self._bleak_client
 
-    async def _disconnect(self, delay=0):
-        await asyncio.sleep(delay)
+    @callback
+    def _handle_disconnected(self, client: BleakClient):
+        if client is not self._bleak_client:
+            return
+        self._notifying_client = None
+        self._release_slot()
+        if self._persistent_connection and self._cancel_idle_timer:
+            # Dropped by the lock or the adapter rather than by us, reconnect
+            _LOGGER.debug("BLE connection to %s lost, reconnecting", self._mac)
+            self._cancel_idle_timer()
+            self._cancel_idle_timer = None
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _reset_idle_timer(self):
+        if not self._persistent_connection:
+            return
+        if self._cancel_idle_timer:
+            self._cancel_idle_timer()
+        self._cancel_idle_timer = async_call_later(
+            self.hass, PERSISTENT_IDLE_TIMEOUT, self._async_idle_timeout
+        )
+
+    async def _async_idle_timeout(self, _now):
+        self._cancel_idle_timer = None
+        if self._commands:
+            self._reset_idle_timer()
+            return
+        _LOGGER.debug("Closing idle BLE connection to %s", self._mac)
+        async with self._connection_lock:
+            await self._disconnect()
+
+    async def _close_connection(self):
+        self._drop_challenge()
+        if self._cancel_idle_timer:
+            self._cancel_idle_timer()
+            self._cancel_idle_timer = None
+        self._notifying_client = None
         if self._bleak_client and self._bleak_client.is_connected:
             await self._bleak_client.disconnect()
+        self._release_slot()
+
+    async def _disconnect(self):
+        await self._close_connection()
         self._current_command = None
         self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Close the BLE connection when the config entry is unloaded."""
+        await super().async_shutdown()
+        if self._cancel_advertisement_read is not None:
+            self._cancel_advertisement_read()
+            self._cancel_advertisement_read = None
+        if self._command_worker is not None:
+            self._command_worker.cancel()
+            await asyncio.gather(self._command_worker, return_exceptions=True)
+        # A worker cancelled before it started never reached its cleanup
+        self._abort_commands()
+        await self._disconnect()
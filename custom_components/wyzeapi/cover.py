@@ -13,13 +13,15 @@ import homeassistant.components.cover
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ATTRIBUTION
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers import device_registry as dr
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.components.cover import CoverDeviceClass, CoverEntityFeature
 
 
-from .const import CAMERA_UPDATED, CONF_CLIENT, DOMAIN
+from .const import CONF_CLIENT, DOMAIN, INVENTORY
+from .device_index import async_track_device
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -43,14 +45,15 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi cover component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     camera_service = await client.camera_service
-    cameras: List[Camera] = await camera_service.get_cameras()
+    cameras: List[Camera] = inventory.cameras
     garages = []
     for camera in cameras:
         if camera.device_params["dongle_product_model"] == "HL_CGDC":
             garages.append(WyzeGarageDoor(camera_service, camera))
 
-    async_add_entities(garages, True)
+    async_add_entities(garages, inventory.update_before_add)
 
 
 class WyzeGarageDoor(homeassistant.components.cover.CoverEntity, ABC):
@@ -91,6 +94,7 @@ class WyzeGarageDoor(homeassistant.components.cover.CoverEntity, ABC):
         return False
 
     @token_exception_handler
+    @user_command
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
         try:
@@ -104,6 +108,7 @@ class WyzeGarageDoor(homeassistant.components.cover.CoverEntity, ABC):
             self.async_write_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_close_cover(self, **kwargs):
         """Close the cover."""
         try:
@@ -138,15 +143,10 @@ class WyzeGarageDoor(homeassistant.components.cover.CoverEntity, ABC):
 
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._camera.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._camera, self.handle_camera_update)
         )
 
     @callback
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the cover whenever there is an update"""
         self._camera = camera
-        self.async_write_ha_state()
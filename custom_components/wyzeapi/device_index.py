@@ -0,0 +1,82 @@
+"""Device to entity index for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import Entity
+from wyzeapy.types import Device
+
+from .const import DEVICE_INDEX, DOMAIN
+
+
+class WyzeDeviceIndex:
+    """The entities showing each Wyze device of a config entry, by device mac.
+
+    One entity per device is subscribed to its polls. The other entities of the
+    device, such as the sirens, switches and sensors of a camera, register here
+    instead. An update is applied to every registered entity before all of
+    their states are written in one pass, rather than each entity receiving its
+    own dispatcher signal and writing its state on its own.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self._entities: dict[str, dict[Entity, Callable[[Any], None]]] = {}
+
+    @callback
+    def async_register(
+        self, mac: str, entity: Entity, update_callback: Callable[[Any], None]
+    ) -> CALLBACK_TYPE:
+        """Hand updates of a device to an entity and return an unsubscribe.
+
+        The callback only applies the device to the entity, the index writes
+        the entity's state afterwards.
+        """
+        entities = self._entities.setdefault(mac, {})
+        entities[entity] = update_callback
+
+        @callback
+        def _unregister() -> None:
+            entities.pop(entity, None)
+            if not entities and self._entities.get(mac) is entities:
+                del self._entities[mac]
+
+        return _unregister
+
+    @callback
+    def async_device_updated(self, source: Entity | None, device: Device) -> None:
+        """Apply a device update to its entities and write their states.
+
+        `source` is the entity that received the update, if any, it already
+        holds the device and is written together with the others.
+        """
+        entities = self._entities.get(device.mac, {})
+        for update_callback in list(entities.values()):
+            update_callback(device)
+        if source is not None:
+            source.async_write_ha_state()
+        for entity in list(entities):
+            entity.async_write_ha_state()
+
+
+def _entity_index(entity: Entity) -> WyzeDeviceIndex:
+    """Return the device index of the config entry an entity belongs to."""
+    entry_id = entity.platform.config_entry.entry_id
+    return entity.hass.data[DOMAIN][entry_id][DEVICE_INDEX]
+
+
+@callback
+def async_track_device(
+    entity: Entity, device: Device, update_callback: Callable[[Any], None]
+) -> CALLBACK_TYPE:
+    """Subscribe an entity to the updates of a device polled by another entity."""
+    return _entity_index(entity).async_register(device.mac, entity, update_callback)
+
+
+@callback
+def async_device_updated(entity: Entity, device: Device) -> None:
+    """Send a device an entity was just updated with to the device's entities."""
+    _entity_index(entity).async_device_updated(entity, device)
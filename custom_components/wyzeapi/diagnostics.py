@@ -0,0 +1,38 @@
+"""Diagnostics support for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import BLE_SCHEDULER, DOMAIN, POLL_SCHEDULER, RATE_LIMITER
+from .rate_limiter import WyzeRateLimiter
+from .scheduler import WyzePollScheduler
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    scheduler: WyzePollScheduler = entry_data[POLL_SCHEDULER]
+    rate_limiter: WyzeRateLimiter = entry_data[RATE_LIMITER]
+    return {
+        "options": dict(config_entry.options),
+        "api_requests": {
+            "remaining_hourly_budget": rate_limiter.remaining_budget,
+            "queue_depth": rate_limiter.queue_depth,
+        },
+        "polling": scheduler.async_diagnostics(),
+        "bluetooth_slots": (
+            ble_scheduler.diagnostics()
+            if (ble_scheduler := entry_data.get(BLE_SCHEDULER))
+            else {}
+        ),
+        "lock_bolt_stage_timings_ms": {
+            mac: coordinator.stage_timings
+            for mac, coordinator in entry_data.get("coordinators", {}).items()
+        },
+    }
@@ -17,14 +17,17 @@ from homeassistant.components.fan import FanEntity, FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers import device_registry as dr
 from homeassistant.util.percentage import (
     ordered_list_item_to_percentage,
     percentage_to_ordered_list_item,
 )
 
-from .const import AIR_PURIFIER_UPDATED, CONF_CLIENT, DOMAIN
+from .const import CONF_CLIENT, DOMAIN, INVENTORY
+from .device_index import async_device_updated
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
+from .scheduler import async_device_commanded, async_track_device_updates
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -52,14 +55,15 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi fan component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     air_purifier_service = await client.air_purifier_service
 
     fans = [
         WyzeAirPurifierFan(air_purifier_service, air_purifier)
-        for air_purifier in await air_purifier_service.get_air_purifiers()
+        for air_purifier in inventory.air_purifiers
     ]
 
-    async_add_entities(fans, True)
+    async_add_entities(fans, inventory.update_before_add)
 
 
 class WyzeAirPurifierFan(FanEntity):
@@ -143,6 +147,7 @@ class WyzeAirPurifierFan(FanEntity):
         return len(ORDERED_NAMED_FAN_SPEEDS)
 
     @token_exception_handler
+    @user_command
     async def async_turn_on(
         self,
         percentage: int | None = None,
@@ -166,9 +171,11 @@ class WyzeAirPurifierFan(FanEntity):
         else:
             self._air_purifier.on = True
             self._just_updated = True
+            async_device_commanded(self, self._air_purifier_service, self._air_purifier)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the fan."""
         try:
@@ -180,9 +187,11 @@ class WyzeAirPurifierFan(FanEntity):
         else:
             self._air_purifier.on = False
             self._just_updated = True
+            async_device_commanded(self, self._air_purifier_service, self._air_purifier)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_set_percentage(self, percentage: int) -> None:
         """Set the speed percentage of the fan."""
         if percentage == 0:
@@ -203,9 +212,11 @@ class WyzeAirPurifierFan(FanEntity):
             self._air_purifier.on = True
             self._air_purifier.fan_mode = fan_mode
             self._just_updated = True
+            async_device_commanded(self, self._air_purifier_service, self._air_purifier)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode of the fan."""
         if preset_mode not in PRESET_MODES:
@@ -225,6 +236,7 @@ class WyzeAirPurifierFan(FanEntity):
             self._air_purifier.on = True
             self._air_purifier.fan_mode = preset_mode
             self._just_updated = True
+            async_device_commanded(self, self._air_purifier_service, self._air_purifier)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
@@ -241,25 +253,17 @@ class WyzeAirPurifierFan(FanEntity):
     def async_update_callback(self, air_purifier: AirPurifier) -> None:
         """Update the fan state."""
         self._air_purifier = air_purifier
-        self._dispatch_update()
-        self.async_schedule_update_ha_state()
-
-    @callback
-    def _dispatch_update(self) -> None:
-        """Notify sibling air purifier entities of device updates."""
-        async_dispatcher_send(
-            self.hass,
-            f"{AIR_PURIFIER_UPDATED}-{self._air_purifier.mac}",
-            self._air_purifier,
-        )
+        async_device_updated(self, air_purifier)
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to update events."""
-        self._air_purifier.callback_function = self.async_update_callback
-        self._air_purifier_service.register_updater(self._air_purifier, 30)
-        await self._air_purifier_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self,
+                self._air_purifier_service,
+                self._air_purifier,
+                30,
+                self.async_update_callback,
+            )
+        )
         return await super().async_added_to_hass()
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Unregister updater on removal."""
-        self._air_purifier_service.unregister_updater(self._air_purifier)
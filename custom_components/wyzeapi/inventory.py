@@ -0,0 +1,228 @@
+"""Shared device inventory for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+from typing import Any, TypeVar
+
+from wyzeapy import Wyzeapy
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.air_purifier_service import AirPurifier
+from wyzeapy.services.bulb_service import Bulb
+from wyzeapy.services.camera_service import Camera
+from wyzeapy.services.irrigation_service import Irrigation, Zone
+from wyzeapy.services.lock_service import Lock
+from wyzeapy.services.sensor_service import Sensor
+from wyzeapy.services.switch_service import Switch
+from wyzeapy.services.thermostat_service import Thermostat
+from wyzeapy.services.wall_switch_service import WallSwitch
+from wyzeapy.types import Device
+
+from .rate_limiter import RequestPriority, request_priority
+
+_LOGGER = logging.getLogger(__name__)
+MAX_CONCURRENT_HYDRATIONS = 8
+
+_DeviceT = TypeVar("_DeviceT", bound=Device)
+
+
+@dataclass
+class WyzeDeviceInventory:
+    """Snapshot of the devices on a Wyze account.
+
+    The snapshot is taken once when the config entry is set up and stored in
+    ``hass.data[DOMAIN][entry_id]`` so every platform can build its entities
+    from the same device lists instead of asking the cloud again.
+    """
+
+    cameras: list[Camera] = field(default_factory=list)
+    bulbs: list[Bulb] = field(default_factory=list)
+    switches: list[Switch] = field(default_factory=list)
+    wall_switches: list[WallSwitch] = field(default_factory=list)
+    locks: list[Lock] = field(default_factory=list)
+    sensors: list[Sensor] = field(default_factory=list)
+    thermostats: list[Thermostat] = field(default_factory=list)
+    irrigations: list[Irrigation] = field(default_factory=list)
+    air_purifiers: list[AirPurifier] = field(default_factory=list)
+    unique_device_ids: set[str] = field(default_factory=set)
+    object_list: list[dict[str, Any]] = field(default_factory=list, repr=False)
+    # Zones of every hydrated irrigation controller, which its entities follow
+    irrigation_zones: dict[str, list[dict[str, Any]]] = field(
+        default_factory=dict, repr=False
+    )
+    _restored: bool = field(default=False, init=False, repr=False)
+    # Devices restored on a warm start, hydrated after their entities exist
+    _deferred: set[str] = field(default_factory=set, init=False, repr=False)
+    _hydration_tasks: dict[tuple[str, str], asyncio.Task[Any]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _hydration_semaphore: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(MAX_CONCURRENT_HYDRATIONS),
+        init=False,
+        repr=False,
+    )
+
+    @classmethod
+    async def async_fetch(
+        cls, client: Wyzeapy, object_list: list[dict[str, Any]] | None = None
+    ) -> WyzeDeviceInventory:
+        """Fetch the device list once and split it per service.
+
+        When a cached ``object_list`` is given the snapshot is rebuilt from it
+        without asking the cloud.
+        """
+        camera_service = await client.camera_service
+        bulb_service = await client.bulb_service
+        switch_service = await client.switch_service
+        wall_switch_service = await client.wall_switch_service
+        lock_service = await client.lock_service
+        sensor_service = await client.sensor_service
+        thermostat_service = await client.thermostat_service
+        irrigation_service = await client.irrigation_service
+        air_purifier_service = await client.air_purifier_service
+
+        # get_object_list() caches the device list on the shared BaseService,
+        # so the per-service getters below are served from that single call.
+        # Seeding that cache with a stored list serves them without any call.
+        if object_list is None:
+            devices = await camera_service.get_object_list()
+        else:
+            devices = BaseService._devices = [Device(raw) for raw in object_list]
+
+        inventory = cls(
+            cameras=await camera_service.get_cameras(),
+            bulbs=await bulb_service.get_bulbs(),
+            switches=await switch_service.get_switches(),
+            wall_switches=await wall_switch_service.get_switches(),
+            locks=await lock_service.get_locks(),
+            sensors=await sensor_service.get_sensors(),
+            thermostats=await thermostat_service.get_thermostats(),
+            irrigations=await irrigation_service.get_irrigations(),
+            air_purifiers=await air_purifier_service.get_air_purifiers(),
+            unique_device_ids={device.mac for device in devices},
+            object_list=[device.raw_dict for device in devices],
+        )
+        _LOGGER.debug("Fetched Wyze device inventory with %s devices", len(devices))
+        return inventory
+
+    def refresh_from(self, inventory: WyzeDeviceInventory) -> None:
+        """Copy the device params of a newer snapshot of the same devices."""
+        params = {
+            raw["mac"]: raw.get("device_params", {}) for raw in inventory.object_list
+        }
+        for devices in (
+            self.cameras,
+            self.bulbs,
+            self.switches,
+            self.wall_switches,
+            self.locks,
+            self.sensors,
+            self.thermostats,
+            self.irrigations,
+            self.air_purifiers,
+        ):
+            for device in devices:
+                if device.mac in params:
+                    device.device_params = params[device.mac]
+        self.object_list = inventory.object_list
+
+    @property
+    def update_before_add(self) -> bool:
+        """Return whether entities have to update before they are added.
+
+        On a warm start entities are built from the stored device list, and
+        the poll scheduler and ``async_hydrate_deferred`` update them after.
+        """
+        return not self._restored
+
+    def restore(self, irrigation_zones: dict[str, list[dict[str, Any]]]) -> None:
+        """Restore the state stored on an earlier start.
+
+        Cameras need no hydrated state to create their entities, irrigation
+        controllers only need their zones. Restored devices are hydrated by
+        ``async_hydrate_deferred`` once their entities exist.
+        """
+        self._restored = True
+        self._deferred = {camera.mac for camera in self.cameras}
+        for irrigation in self.irrigations:
+            if (zones := irrigation_zones.get(irrigation.mac)) is not None:
+                irrigation.zones = [Zone(zone) for zone in zones]
+                self.irrigation_zones[irrigation.mac] = zones
+                self._deferred.add(irrigation.mac)
+
+    async def async_entity_devices(
+        self, service: BaseService, devices: list[_DeviceT]
+    ) -> list[_DeviceT]:
+        """Return the devices ready to create entities from.
+
+        Devices restored on a warm start are returned as they are, the others
+        are hydrated first.
+        """
+        await self.async_hydrate(
+            service, [device for device in devices if device.mac not in self._deferred]
+        )
+        return devices
+
+    async def async_hydrate_deferred(self, client: Wyzeapy) -> list[Device]:
+        """Hydrate the restored devices and return those that were updated."""
+        camera_service = await client.camera_service
+        irrigation_service = await client.irrigation_service
+        jobs: list[tuple[BaseService, Device]] = [
+            (service, device)
+            for service, devices in (
+                (camera_service, self.cameras),
+                (irrigation_service, self.irrigations),
+            )
+            for device in devices
+            if device.mac in self._deferred
+        ]
+        self._deferred = set()
+        results = await asyncio.gather(
+            *(self.async_hydrate(service, [device]) for service, device in jobs),
+            return_exceptions=True,
+        )
+        hydrated = []
+        for (_, device), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Unable to update %s: %s", device.nickname, result)
+            else:
+                hydrated.append(device)
+        return hydrated
+
+    async def async_hydrate(
+        self, service: BaseService, devices: list[_DeviceT]
+    ) -> list[_DeviceT]:
+        """Return the devices after a full ``service.update`` of each one.
+
+        Updates run concurrently, bounded by MAX_CONCURRENT_HYDRATIONS, and each
+        device is only updated once per setup even when several platforms ask
+        for it.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for device in devices:
+            key = (type(service).__name__, device.mac)
+            if (task := self._hydration_tasks.get(key)) is None:
+                task = loop.create_task(self._async_hydrate_device(service, device))
+                self._hydration_tasks[key] = task
+            tasks.append(task)
+
+        # Shield the shared tasks so a platform that is cancelled mid-setup does
+        # not cancel the hydration other platforms are waiting on.
+        return list(await asyncio.gather(*(asyncio.shield(task) for task in tasks)))
+
+    async def _async_hydrate_device(
+        self, service: BaseService, device: _DeviceT
+    ) -> _DeviceT:
+        """Update a single device while holding a hydration slot."""
+        async with self._hydration_semaphore:
+            with request_priority(RequestPriority.SETUP):
+                device = await service.update(device)
+        if isinstance(device, Irrigation):
+            # Copied, as entities change the quickrun duration of their zone
+            self.irrigation_zones[device.mac] = [
+                dict(vars(zone)) for zone in device.zones
+            ]
+        return device
@@ -0,0 +1,97 @@
+"""Kinesis Video Streams signaling codec for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from typing import Any
+
+from webrtc_models import RTCIceCandidateInit
+
+from .stream_info import KVS_RECIPIENT_CLIENT_ID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+_UFRAG = re.compile(r"ufrag (\w{4})")
+
+# Everything but the payload is known up front, and base64 and uuids need no
+# escaping, so envelopes are formatted instead of being JSON encoded again
+_OFFER_ENVELOPE = (
+    '{"action":"SDP_OFFER","recipientClientId":"%s",'
+    '"messagePayload":"%%s","correlationId":"%%s"}' % KVS_RECIPIENT_CLIENT_ID
+)
+_CANDIDATE_ENVELOPE = (
+    '{"action":"ICE_CANDIDATE","recipientClientId":"%s",'
+    '"messagePayload":"%%s"}' % KVS_RECIPIENT_CLIENT_ID
+)
+
+
+def _encode_payload(payload: dict[str, Any]) -> str:
+    return base64.b64encode(_dumps(payload)).decode()
+
+
+def encode_offer(sdp: str, correlation_id: str) -> str:
+    """Return the signaling message sending an SDP offer."""
+    return _OFFER_ENVELOPE % (
+        _encode_payload({"type": "offer", "sdp": sdp}),
+        correlation_id,
+    )
+
+
+def encode_candidate(candidate: RTCIceCandidateInit) -> str:
+    """Return the signaling message sending an ICE candidate."""
+    user_fragment = candidate.user_fragment
+    if (match := _UFRAG.search(candidate.candidate)) is not None:
+        user_fragment = match.group(1)
+    return _CANDIDATE_ENVELOPE % _encode_payload(
+        {
+            "candidate": candidate.candidate,
+            "sdpMid": candidate.sdp_mid,
+            "sdpMLineIndex": candidate.sdp_m_line_index,
+            "usernameFragment": user_fragment,
+        }
+    )
+
+
+def decode_message(message: str | bytes) -> dict[str, Any]:
+    """Return a received signaling message, raising ValueError if it isn't JSON."""
+    return _loads(message)
+
+
+def decode_candidate(data: dict[str, Any]) -> RTCIceCandidateInit:
+    """Return the ICE candidate of an ICE_CANDIDATE message."""
+    # KVS uses camelCase keys; map them to RTCIceCandidateInit's snake_case fields
+    payload = _loads(base64.b64decode(data["messagePayload"]))
+    return RTCIceCandidateInit(
+        candidate=payload["candidate"],
+        sdp_mid=payload.get("sdpMid"),
+        sdp_m_line_index=payload.get("sdpMLineIndex"),
+        user_fragment=payload.get("usernameFragment"),
+    )
+
+
+def decode_answer(data: dict[str, Any]) -> str:
+    """Return the SDP of an SDP_ANSWER message."""
+    # The payload is JSON with "type"/"sdp" keys, but some cameras send bare SDP
+    raw = base64.b64decode(data["messagePayload"])
+    if not raw.startswith(b"{"):
+        return raw.decode()
+    try:
+        payload = _loads(raw)
+    except ValueError:
+        return raw.decode()
+    return payload.get("sdp", raw.decode())
@@ -1,5 +1,6 @@
 """Platform for light integration."""
 
+import asyncio
 from collections.abc import Callable
 from datetime import timedelta
 import logging
@@ -26,19 +27,19 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.dispatcher import (
-    async_dispatcher_connect,
-    async_dispatcher_send,
-)
 import homeassistant.util.color as color_util
 
 from .const import (
     BULB_LOCAL_CONTROL,
-    CAMERA_UPDATED,
     CONF_CLIENT,
     DOMAIN,
-    LIGHT_UPDATED,
+    INVENTORY,
 )
+from .batch import async_set_property_lists
+from .device_index import async_device_updated, async_track_device
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
+from .scheduler import async_device_commanded, async_track_device_updates
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -49,6 +50,10 @@ EFFECT_SUN_MATCH = "sun match"
 EFFECT_SHADOW = "shadow"
 EFFECT_LEAP = "leap"
 EFFECT_FLICKER = "flicker"
+# Commands for a bulb arriving within this many seconds are sent as one
+COMMAND_COALESCE_WINDOW = 0.25
+# Commands for different bulbs arriving within this many seconds share a round trip
+COMMAND_BATCH_WINDOW = 0.02
 
 
 @token_exception_handler
@@ -61,16 +66,18 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi light component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     camera_service = await client.camera_service
 
     bulb_service = await client.bulb_service
 
+    command_batcher = WyzeLightCommandBatcher(bulb_service)
     lights = [
-        WyzeLight(bulb_service, light, config_entry)
-        for light in await bulb_service.get_bulbs()
+        WyzeLight(bulb_service, light, config_entry, command_batcher)
+        for light in inventory.bulbs
     ]
 
-    for camera in await camera_service.get_cameras():
+    for camera in inventory.cameras:
         if camera.product_model == "HL_BC":
             # Wyze Bulb Cam has integrated light
             lights.append(WyzeCamerafloodlight(camera, camera_service, "bulbcam"))
@@ -93,7 +100,123 @@ async def async_setup_entry(
         ):  # Battery cam pro (integrated spotlight)
             lights.append(WyzeCamerafloodlight(camera, camera_service, "spotlight"))
 
-    async_add_entities(lights, True)
+    async_add_entities(lights, inventory.update_before_add)
+
+
+class WyzeLightCommandBatcher:
+    """Sends the commands of bulbs switched together in one round trip.
+
+    Scenes and light groups call every bulb at once. Classic bulbs are switched
+    through the bulk device_list endpoint, so their commands are merged into one
+    grouped request, while mesh bulbs and light strips are sent in parallel.
+    """
+
+    def __init__(self, bulb_service: BulbService) -> None:
+        """Initialize the command batcher."""
+        self._bulb_service = bulb_service
+        self._pending: list[
+            tuple[Bulb, list[dict[str, str]], Callable[[], Any], asyncio.Future[None]]
+        ] = []
+        self._flush_task: asyncio.Task[None] | None = None
+
+    async def async_turn_on(
+        self, bulb: Bulb, local_control: bool, options: list[dict[str, str]]
+    ) -> None:
+        """Turn a bulb on together with the other bulbs commanded now."""
+        await self._async_queue(
+            bulb,
+            [create_pid_pair(PropertyIDs.ON, "1"), *options],
+            lambda: self._bulb_service.turn_on(bulb, local_control, options),
+        )
+
+    async def async_turn_off(self, bulb: Bulb, local_control: bool) -> None:
+        """Turn a bulb off together with the other bulbs commanded now."""
+        await self._async_queue(
+            bulb,
+            [create_pid_pair(PropertyIDs.ON, "0")],
+            lambda: self._bulb_service.turn_off(bulb, local_control),
+        )
+
+    async def _async_queue(
+        self,
+        bulb: Bulb,
+        plist: list[dict[str, str]],
+        send: Callable[[], Any],
+    ) -> None:
+        """Queue a command and wait until it was sent."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((bulb, plist, send, future))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._async_flush())
+        await future
+
+    async def _async_flush(self) -> None:
+        """Send everything queued during the batch window."""
+        await asyncio.sleep(COMMAND_BATCH_WINDOW)
+        pending, self._pending, self._flush_task = self._pending, [], None
+
+        grouped = [
+            command for command in pending if command[0].type is DeviceTypes.LIGHT
+        ]
+        single = [
+            command for command in pending if command[0].type is not DeviceTypes.LIGHT
+        ]
+        await asyncio.gather(
+            self._async_send(
+                lambda: async_set_property_lists(
+                    self._bulb_service,
+                    [(bulb, plist) for bulb, plist, _, _ in grouped],
+                ),
+                [future for _, _, _, future in grouped],
+            ),
+            *(self._async_send(send, [future]) for _, _, send, future in single),
+        )
+
+    @staticmethod
+    async def _async_send(
+        send: Callable[[], Any], futures: list[asyncio.Future[None]]
+    ) -> None:
+        """Send a request and hand its outcome to the waiting commands."""
+        if not futures:
+            return
+        try:
+            await send()
+        except Exception as err:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(err)
+        else:
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+
+class _PendingCommand:
+    """A bulb command that collects changes until it is sent."""
+
+    def __init__(self) -> None:
+        """Initialize the pending command."""
+        self.on = True
+        self.options: dict[str, dict[str, str]] = {}
+        self.local_control = True
+        self.task: asyncio.Task[None] | None = None
+
+    def merge_turn_on(self, options: list[dict[str, str]], local_control: bool) -> None:
+        """Add a turn on, replacing earlier values of the same property."""
+        if not self.on:
+            self.on = True
+            self.local_control = True
+        for option in options:
+            self.options[option["pid"]] = option
+        # Effects on mesh bulbs need the cloud, so one cloud call wins
+        self.local_control = self.local_control and local_control
+
+    def merge_turn_off(self, local_control: bool) -> None:
+        """Replace everything collected so far with a turn off."""
+        self.on = False
+        self.options = {}
+        self.local_control = local_control
 
 
 class WyzeLight(LightEntity):
@@ -102,7 +225,13 @@ class WyzeLight(LightEntity):
     _just_updated = False
     _attr_should_poll = False
 
-    def __init__(self, bulb_service: BulbService, bulb: Bulb, config_entry) -> None:
+    def __init__(
+        self,
+        bulb_service: BulbService,
+        bulb: Bulb,
+        config_entry,
+        command_batcher: WyzeLightCommandBatcher,
+    ) -> None:
         """Initialize a Wyze Bulb."""
         self._bulb = bulb
         self._device_type = DeviceTypes(self._bulb.product_type)
@@ -116,6 +245,9 @@ class WyzeLight(LightEntity):
             raise AttributeError("Device type not supported")
 
         self._bulb_service = bulb_service
+        self._command_batcher = command_batcher
+        self._pending_command: _PendingCommand | None = None
+        self._command_lock = asyncio.Lock()
         self._attr_min_color_temp_kelvin = (
             1800
             if self._device_type in [DeviceTypes.MESH_LIGHT, DeviceTypes.LIGHTSTRIP]
@@ -143,6 +275,7 @@ class WyzeLight(LightEntity):
         }
 
     @token_exception_handler
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the light."""
         options = []
@@ -235,32 +368,71 @@ class WyzeLight(LightEntity):
                     self._bulb.effects = "3"
 
         _LOGGER.debug("Turning on light")
+        # Show the new state right away, the request itself may wait for more
+        # changes to the same bulb so they are sent together
+        self._bulb.on = True
+        self.async_write_ha_state()
         try:
-            await self._bulb_service.turn_on(self._bulb, self._local_control, options)
+            await self._async_send_coalesced(
+                lambda pending: pending.merge_turn_on(options, self._local_control)
+            )
         except (AccessTokenError, ParameterError, UnknownApiError) as err:
             raise HomeAssistantError(f"Wyze returned an error: {err.args}") from err
         except ClientConnectionError as err:
             raise HomeAssistantError(err) from err
         else:
-            self._bulb.on = True
             self._just_updated = True
+            async_device_commanded(self, self._bulb_service, self._bulb)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
         self._local_control = self._config_entry.options.get(BULB_LOCAL_CONTROL)
+        self._bulb.on = False
+        self.async_write_ha_state()
         try:
-            await self._bulb_service.turn_off(self._bulb, self._local_control)
+            # Turning off overrides a turn on that has not been sent yet
+            await self._async_send_coalesced(
+                lambda pending: pending.merge_turn_off(self._local_control)
+            )
         except (AccessTokenError, ParameterError, UnknownApiError) as err:
             raise HomeAssistantError(f"Wyze returned an error: {err.args}") from err
         except ClientConnectionError as err:
             raise HomeAssistantError(err) from err
         else:
-            self._bulb.on = False
             self._just_updated = True
+            async_device_commanded(self, self._bulb_service, self._bulb)
             self.async_schedule_update_ha_state()
 
+    async def _async_send_coalesced(
+        self, merge: Callable[[_PendingCommand], None]
+    ) -> None:
+        """Merge a command into the one waiting to be sent and wait for it."""
+        if (pending := self._pending_command) is None:
+            pending = self._pending_command = _PendingCommand()
+            pending.task = asyncio.get_running_loop().create_task(
+                self._async_send_pending(pending)
+            )
+        merge(pending)
+        # A cancelled caller must not cancel the request other callers wait on
+        await asyncio.shield(pending.task)
+
+    async def _async_send_pending(self, pending: _PendingCommand) -> None:
+        """Send a pending command once the coalescing window has passed."""
+        await asyncio.sleep(COMMAND_COALESCE_WINDOW)
+        self._pending_command = None
+        async with self._command_lock:
+            if pending.on:
+                await self._command_batcher.async_turn_on(
+                    self._bulb, pending.local_control, list(pending.options.values())
+                )
+            else:
+                await self._command_batcher.async_turn_off(
+                    self._bulb, pending.local_control
+                )
+
     @property
     def supported_color_modes(self):
         """Return the supported color modes."""
@@ -360,20 +532,17 @@ class WyzeLight(LightEntity):
         """Update the bulb's state."""
         self._bulb = bulb
         self._local_control = self._config_entry.options.get(BULB_LOCAL_CONTROL)
-        async_dispatcher_send(self.hass, f"{LIGHT_UPDATED}-{self._bulb.mac}", bulb)
-        self.async_schedule_update_ha_state()
+        async_device_updated(self, bulb)
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to update events."""
-        self._bulb.callback_function = self.async_update_callback
-        self._bulb_service.register_updater(self._bulb, 30)
-        await self._bulb_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self, self._bulb_service, self._bulb, 30, self.async_update_callback
+            )
+        )
         return await super().async_added_to_hass()
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Unregister the updater."""
-        self._bulb_service.unregister_updater(self._bulb)
-
 
 class WyzeCamerafloodlight(LightEntity):
     """Representation of a Wyze Camera floodlight."""
@@ -393,6 +562,7 @@ class WyzeCamerafloodlight(LightEntity):
         self._is_on = self._device.floodlight
 
     @token_exception_handler
+    @user_command
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the floodlight on."""
         try:
@@ -404,9 +574,11 @@ class WyzeCamerafloodlight(LightEntity):
         else:
             self._is_on = True
             self._just_updated = True
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_turn_off(self, **kwargs):
         """Turn the floodlight off."""
         try:
@@ -418,6 +590,7 @@ class WyzeCamerafloodlight(LightEntity):
         else:
             self._is_on = False
             self._just_updated = True
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
     @property
@@ -458,16 +631,11 @@ class WyzeCamerafloodlight(LightEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the camera object whenever there is an update."""
         self._device = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Add listener on startup."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._device.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._device, self.handle_camera_update)
         )
 
     @property
@@ -17,12 +17,15 @@ import homeassistant.components.lock
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ATTRIBUTION
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import device_registry as dr
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import CONF_CLIENT, DOMAIN, LOCK_UPDATED
+from .const import CONF_CLIENT, DOMAIN, INVENTORY
+from .device_index import async_device_updated
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
+from .scheduler import async_device_commanded, async_track_device_updates
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -48,9 +51,10 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi lock component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     lock_service = await client.lock_service
 
-    all_locks = await lock_service.get_locks()
+    all_locks = inventory.locks
 
     locks = [
         WyzeLock(lock_service, lock)
@@ -113,6 +117,7 @@ class WyzeLock(homeassistant.components.lock.LockEntity, ABC):
         return False
 
     @token_exception_handler
+    @user_command
     async def async_lock(self, **kwargs):
         _LOGGER.debug("Turning on lock")
         try:
@@ -123,9 +128,11 @@ class WyzeLock(homeassistant.components.lock.LockEntity, ABC):
             raise HomeAssistantError(err) from err
         else:
             self._lock.unlocked = False
+            async_device_commanded(self, self._lock_service, self._lock)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_unlock(self, **kwargs):
         try:
             await self._lock_service.unlock(self._lock)
@@ -135,6 +142,7 @@ class WyzeLock(homeassistant.components.lock.LockEntity, ABC):
             raise HomeAssistantError(err) from err
         else:
             self._lock.unlocked = True
+            async_device_commanded(self, self._lock_service, self._lock)
             self.async_schedule_update_ha_state()
 
     @property
@@ -198,23 +206,17 @@ class WyzeLock(homeassistant.components.lock.LockEntity, ABC):
     def async_update_callback(self, lock: Lock):
         """Update the switch's state."""
         self._lock = lock
-        async_dispatcher_send(
-            self.hass,
-            f"{LOCK_UPDATED}-{self._lock.mac}",
-            lock,
-        )
-        self.async_schedule_update_ha_state()
+        async_device_updated(self, lock)
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to update events."""
-        self._lock.callback_function = self.async_update_callback
-        self._lock_service.register_updater(self._lock, 10)
-        await self._lock_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self, self._lock_service, self._lock, 10, self.async_update_callback
+            )
+        )
         return await super().async_added_to_hass()
 
-    async def async_will_remove_from_hass(self) -> None:
-        self._lock_service.unregister_updater(self._lock)
-
 
 class WyzeLockBolt(CoordinatorEntity, homeassistant.components.lock.LockEntity):
     def __init__(self, coordinator):
@@ -253,9 +255,11 @@ class WyzeLockBolt(CoordinatorEntity, homeassistant.components.lock.LockEntity):
             return None
         return self.coordinator.data["state"] == 1
 
+    @user_command
     async def async_lock(self, **kwargs):
         return await self.coordinator.lock_unlock(command="lock")
 
+    @user_command
     async def async_unlock(self, **kwargs):
         return await self.coordinator.lock_unlock(command="unlock")
 
@@ -11,7 +11,9 @@ from homeassistant.helpers import device_registry as dr
 from wyzeapy import Wyzeapy
 from wyzeapy.services.irrigation_service import IrrigationService, Irrigation, Zone
 
-from .const import DOMAIN, CONF_CLIENT
+from .const import DOMAIN, CONF_CLIENT, INVENTORY
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,16 +28,17 @@ async def async_setup_entry(
     """Set up the WyzeApi number platform."""
     _LOGGER.debug("Creating new WyzeApi number component")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     irrigation_service = await client.irrigation_service
 
-    # Get all irrigation devices
-    irrigation_devices = await irrigation_service.get_irrigations()
+    # Get all irrigation devices, updated or restored to get their zones
+    irrigation_devices = await inventory.async_entity_devices(
+        irrigation_service, inventory.irrigations
+    )
 
     # Create a number entity for each zone in each irrigation device
     entities = []
     for device in irrigation_devices:
-        # Update the device to get its zones
-        device = await irrigation_service.update(device)
         for zone in device.zones:
             if zone.enabled:
                 entities.append(
@@ -115,6 +118,7 @@ class WyzeIrrigationQuickrunDuration(RestoreNumber):
         """Return the icon for the quickrun duration number."""
         return "mdi:timer"
 
+    @user_command
     async def async_set_native_value(self, value: float) -> None:
         """Set the value in minutes."""
         # Convert minutes to seconds for the API
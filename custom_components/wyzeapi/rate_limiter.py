@@ -0,0 +1,200 @@
+"""Wyze API rate limiting for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextvars import ContextVar
+from enum import Enum
+import contextlib
+import functools
+import logging
+import time
+from typing import Any, ParamSpec, TypeVar
+
+from wyzeapy import Wyzeapy
+
+_LOGGER = logging.getLogger(__name__)
+
+REQUESTS_PER_SECOND = 1.0
+BURST_SIZE = 10
+HOURLY_BUDGET = 3000
+
+_HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+class RequestPriority(Enum):
+    """Who a Wyze API request is sent for."""
+
+    # A user acting on an entity
+    COMMAND = "command"
+    # Entities being set up, once per start
+    SETUP = "setup"
+    # Anything in the background
+    POLL = "poll"
+
+
+# Requests are polls unless they come from an entity action marked with
+# user_command, so background updates never pass for user commands.
+REQUEST_PRIORITY: ContextVar[RequestPriority] = ContextVar(
+    "wyzeapi_request_priority", default=RequestPriority.POLL
+)
+
+
+@contextlib.contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send the Wyze API requests made in the block with a priority."""
+    token = REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        REQUEST_PRIORITY.reset(token)
+
+
+def user_command(
+    func: Callable[_P, Awaitable[_R]],
+) -> Callable[_P, Awaitable[_R]]:
+    """Send the Wyze API requests of an entity action as user commands."""
+
+    @functools.wraps(func)
+    async def command(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+        with request_priority(RequestPriority.COMMAND):
+            return await func(*args, **kwargs)
+
+    return command
+
+
+class WyzeRateLimiter:
+    """Token bucket shared by every Wyze API request of a config entry.
+
+    Polls wait for a token, refilled at REQUESTS_PER_SECOND up to BURST_SIZE,
+    and stop once HOURLY_BUDGET requests were sent in the last hour. User
+    commands and setup are never held back so Home Assistant stays in control
+    and starts quickly, but they use up the tokens that are left and count
+    against the budget, which slows the polls after them down.
+    """
+
+    def __init__(
+        self,
+        rate: float = REQUESTS_PER_SECOND,
+        burst: int = BURST_SIZE,
+        hourly_budget: int = HOURLY_BUDGET,
+    ) -> None:
+        """Initialize the rate limiter."""
+        self._rate = rate
+        self._burst = burst
+        self._hourly_budget = hourly_budget
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._sent: deque[float] = deque()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+        self._setting_up = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting to be sent."""
+        return sum(not future.done() for future in self._waiters)
+
+    @property
+    def remaining_budget(self) -> int:
+        """Return how many requests are left in the hourly budget."""
+        self._expire_sent(time.monotonic())
+        return max(self._hourly_budget - len(self._sent), 0)
+
+    @contextlib.contextmanager
+    def setting_up(self) -> Iterator[None]:
+        """Send every request right away while the platforms are set up.
+
+        Platforms update their entities before adding them, and those updates
+        must not queue at the poll rate. Unlike a SETUP priority, this doesn't
+        leak into the timers and tasks the platforms start along the way.
+        """
+        self._setting_up = True
+        try:
+            yield
+        finally:
+            self._setting_up = False
+
+    def attach(self, client: Wyzeapy) -> None:
+        """Route every request of a Wyzeapy client through the limiter."""
+        # All wyzeapy services share the client's auth lib for their requests
+        auth_lib = client._auth_lib
+        for name in _HTTP_METHODS:
+            setattr(auth_lib, name, self._limited(getattr(auth_lib, name)))
+
+    def _limited(
+        self, request: Callable[..., Awaitable[dict[Any, Any]]]
+    ) -> Callable[..., Awaitable[dict[Any, Any]]]:
+        @functools.wraps(request)
+        async def limited_request(*args: Any, **kwargs: Any) -> dict[Any, Any]:
+            await self.acquire()
+            return await request(*args, **kwargs)
+
+        return limited_request
+
+    async def acquire(self) -> None:
+        """Wait until a request with the current priority may be sent."""
+        if self._setting_up or REQUEST_PRIORITY.get() is not RequestPriority.POLL:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = max(self._tokens - 1, 0)
+            self._sent.append(now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._release()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            raise
+
+    def _release(self) -> None:
+        """Let queued polls through while tokens and budget allow it."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        self._refill(now)
+        self._expire_sent(now)
+
+        while self._waiters:
+            future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self._rate
+                break
+            if len(self._sent) >= self._hourly_budget:
+                delay = self._sent[0] + 3600 - now
+                _LOGGER.debug("Hourly Wyze API budget spent, holding back polls")
+                break
+            self._waiters.popleft()
+            self._tokens -= 1
+            self._sent.append(now)
+            future.set_result(None)
+        else:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._refilled_at) * self._rate
+        )
+        self._refilled_at = now
+
+    def _expire_sent(self, now: float) -> None:
+        """Forget requests sent more than an hour ago."""
+        while self._sent and self._sent[0] <= now - 3600:
+            self._sent.popleft()
@@ -0,0 +1,284 @@
+"""Polling scheduler for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
+from homeassistant.helpers.entity import Entity
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.types import Device
+
+from .batch import async_batched_service
+from .const import (
+    BATCH_POLLING,
+    DEFAULT_BATCH_POLLING,
+    DEVICE_POLLED,
+    DOMAIN,
+    POLL_SCHEDULER,
+)
+from .rate_limiter import REQUEST_PRIORITY, RequestPriority
+
+_LOGGER = logging.getLogger(__name__)
+
+# Adaptive intervals stay between these multiples of the interval entities ask for
+MIN_INTERVAL_FACTOR = 0.5
+MAX_INTERVAL_FACTOR = 8
+# Growth of the interval for every poll that finds the device unchanged
+BACKOFF_FACTOR = 1.25
+
+# Fractional part of the golden ratio. Stepping a job's phase by it for every new
+# job keeps first polls evenly spread over the interval however many jobs exist.
+_PHASE_STEP = 0.6180339887
+
+
+class _PollJob:
+    """A single device poll shared by every entity of that device."""
+
+    def __init__(self, service: BaseService, device: Device, signal: str) -> None:
+        """Initialize the poll job."""
+        self.service = service
+        self.device = device
+        self.signal = signal
+        self.intervals: list[int] = []
+        self.current_interval = 0.0
+        self.due = 0.0
+        self.changed_at = time.monotonic()
+        # Polls failed in a row, only the first of them is logged as a warning
+        self.failures = 0
+
+    @property
+    def base_interval(self) -> int:
+        """Return the shortest interval any subscriber asked for."""
+        return min(self.intervals)
+
+    @property
+    def floor(self) -> float:
+        """Return the shortest interval the job is polled at."""
+        return self.base_interval * MIN_INTERVAL_FACTOR
+
+    @property
+    def ceiling(self) -> float:
+        """Return the longest interval the job is polled at."""
+        return self.base_interval * MAX_INTERVAL_FACTOR
+
+    @property
+    def interval(self) -> float:
+        """Return the interval the job is currently polled at."""
+        return min(max(self.current_interval, self.floor), self.ceiling)
+
+
+class WyzePollScheduler:
+    """Polls each Wyze device once per interval for a config entry.
+
+    Entities register the device they show together with the interval they
+    want. Registrations for the same device and service share one poll, the
+    polls are spread over their interval instead of firing together, and each
+    result is sent to the subscribed entities over the dispatcher.
+
+    With batch polling enabled, every device of a service type that is due
+    within the current cycle is polled together, so their property lists can be
+    fetched with a handful of batched requests.
+
+    Intervals adapt to the device: every poll that finds it unchanged backs off
+    toward a ceiling, as does every poll that fails, while a changed state or
+    a command from Home Assistant tightens polling toward a floor.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._config_entry = config_entry
+        self._jobs: dict[tuple[str, str], _PollJob] = {}
+        self._wakeup = asyncio.Event()
+        self._phase = 0.0
+        self._batch_polling: bool = config_entry.options.get(
+            BATCH_POLLING, DEFAULT_BATCH_POLLING
+        )
+
+    @callback
+    def async_start(self) -> None:
+        """Start polling in a task tied to the config entry."""
+        self._config_entry.async_create_background_task(
+            self._hass, self._async_run(), "wyzeapi_poll_scheduler"
+        )
+
+    @callback
+    def async_register(
+        self,
+        service: BaseService,
+        device: Device,
+        interval: int,
+        update_callback: Callable[[Any], None],
+    ) -> CALLBACK_TYPE:
+        """Poll a device every `interval` seconds and return an unsubscribe."""
+        key = (type(service).__name__, device.mac)
+        if (job := self._jobs.get(key)) is None:
+            job = _PollJob(service, device, f"{DEVICE_POLLED}-{key[0]}-{key[1]}")
+            job.current_interval = interval
+            self._phase = (self._phase + _PHASE_STEP) % 1
+            job.due = time.monotonic() + interval * self._phase
+            self._jobs[key] = job
+        job.intervals.append(interval)
+        job.current_interval = min(job.current_interval, interval)
+        self._wakeup.set()
+
+        disconnect = async_dispatcher_connect(self._hass, job.signal, update_callback)
+
+        @callback
+        def _unregister() -> None:
+            disconnect()
+            job.intervals.remove(interval)
+            if not job.intervals:
+                self._jobs.pop(key, None)
+
+        return _unregister
+
+    @callback
+    def async_device_commanded(self, service: BaseService, device: Device) -> None:
+        """Poll a device that was just commanded at its floor interval."""
+        if (job := self._jobs.get((type(service).__name__, device.mac))) is None:
+            return
+        job.current_interval = job.floor
+        job.due = min(job.due, time.monotonic() + job.floor)
+        self._wakeup.set()
+
+    @callback
+    def async_diagnostics(self) -> list[dict[str, Any]]:
+        """Return the current poll interval of every device."""
+        now = time.monotonic()
+        return [
+            {
+                "service": service_name,
+                "mac": mac,
+                "base_interval": job.base_interval,
+                "interval": round(job.interval, 1),
+                "next_poll_in": round(max(job.due - now, 0), 1),
+                "unchanged_for": round(now - job.changed_at),
+                "failures": job.failures,
+            }
+            for (service_name, mac), job in self._jobs.items()
+        ]
+
+    async def _async_run(self) -> None:
+        """Poll whichever job is due next, forever."""
+        # Polls wait for the rate limiter, whichever task started the scheduler
+        REQUEST_PRIORITY.set(RequestPriority.POLL)
+        while True:
+            self._wakeup.clear()
+            job = min(self._jobs.values(), key=lambda job: job.due, default=None)
+            delay = None if job is None else job.due - time.monotonic()
+            if delay is None or delay > 0:
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout(delay):
+                        await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            jobs = self._batch_for(job, now) if self._batch_polling else [job]
+            service = job.service
+            if len(jobs) > 1:
+                service = await async_batched_service(
+                    service, [batched_job.device for batched_job in jobs]
+                )
+            for batched_job in jobs:
+                await self._async_poll(batched_job, service)
+                self._reschedule(batched_job, now)
+
+    def _batch_for(self, job: _PollJob, now: float) -> list[_PollJob]:
+        """Return the jobs of the same service type due within this cycle."""
+        service_type = type(job.service)
+        return [
+            other
+            for other in self._jobs.values()
+            if type(other.service) is service_type and other.due <= now + job.interval
+        ]
+
+    @staticmethod
+    def _reschedule(job: _PollJob, now: float) -> None:
+        """Move a job that is being polled now to its next due time."""
+        job.due = min(job.due, now) + job.interval
+        if job.due < now:
+            # Polls are running behind, don't try to catch up in a burst
+            job.due = now + job.interval
+
+    async def _async_poll(self, job: _PollJob, service: Any) -> None:
+        """Update the job's device and send it to the subscribers."""
+        state = _polled_state(job.device)
+        try:
+            job.device = await service.update(job.device)
+        except Exception as err:
+            job.failures += 1
+            _LOGGER.log(
+                logging.WARNING if job.failures == 1 else logging.DEBUG,
+                "Error polling Wyze device %s (%s in a row): %s",
+                job.device.mac,
+                job.failures,
+                err,
+            )
+            job.current_interval = min(job.interval * BACKOFF_FACTOR, job.ceiling)
+            return
+
+        if job.failures:
+            _LOGGER.info(
+                "Polling Wyze device %s works again after %s errors",
+                job.device.mac,
+                job.failures,
+            )
+            job.failures = 0
+        if _polled_state(job.device) != state:
+            job.changed_at = time.monotonic()
+            job.current_interval = max(job.interval / 2, job.floor)
+        else:
+            job.current_interval = min(job.interval * BACKOFF_FACTOR, job.ceiling)
+        async_dispatcher_send(self._hass, job.signal, job.device)
+
+
+def _polled_state(device: Device) -> dict[str, Any]:
+    """Return the scalar attributes of a device that a poll can change."""
+    return {
+        name: value
+        for name, value in vars(device).items()
+        if isinstance(value, (bool, int, float, str)) or value is None
+    }
+
+
+def _entity_scheduler(entity: Entity) -> WyzePollScheduler:
+    """Return the poll scheduler of the config entry an entity belongs to."""
+    entry_id = entity.platform.config_entry.entry_id
+    return entity.hass.data[DOMAIN][entry_id][POLL_SCHEDULER]
+
+
+@callback
+def async_track_device_updates(
+    entity: Entity,
+    service: BaseService,
+    device: Device,
+    interval: int,
+    update_callback: Callable[[Any], None],
+) -> CALLBACK_TYPE:
+    """Subscribe an entity to the polls of a device on its config entry."""
+    return _entity_scheduler(entity).async_register(
+        service, device, interval, update_callback
+    )
+
+
+@callback
+def async_device_commanded(
+    entity: Entity, service: BaseService, device: Device
+) -> None:
+    """Tell the scheduler an entity just sent a command to a device."""
+    if entity.platform is None:
+        # Not added to Home Assistant, so nothing is polling the device yet
+        return
+    _entity_scheduler(entity).async_device_commanded(service, device)
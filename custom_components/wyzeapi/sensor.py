@@ -37,13 +37,17 @@ from homeassistant.helpers.event import (
 )
 
 from .const import (
-    AIR_PURIFIER_UPDATED,
-    CAMERA_UPDATED,
     CONF_CLIENT,
     DOMAIN,
-    LOCK_UPDATED,
+    INVENTORY,
+    RATE_LIMITER,
     RESET_BUTTON_PRESSED,
+    WYZE_API_DEVICE_SUFFIX,
 )
+from .device_index import async_track_device
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import WyzeRateLimiter
+from .scheduler import async_track_device_updates
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -67,15 +71,13 @@ async def async_setup_entry(
     """
     _LOGGER.debug("""Creating new WyzeApi sensor component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
 
-    # Get the list of locks so that we can create lock and keypad battery sensors
-    lock_service = await client.lock_service
-    camera_service = await client.camera_service
     switch_usage_service = await client.switch_usage_service
     irrigation_service = await client.irrigation_service
-    air_purifier_service = await client.air_purifier_service
 
-    locks = await lock_service.get_locks()
+    # Use the list of locks so that we can create lock and keypad battery sensors
+    locks = inventory.locks
     sensors = []
     for lock in locks:
         sensors.append(WyzeLockBatterySensor(lock, WyzeLockBatterySensor.LOCK_BATTERY))
@@ -83,7 +85,7 @@ async def async_setup_entry(
             WyzeLockBatterySensor(lock, WyzeLockBatterySensor.KEYPAD_BATTERY)
         )
 
-    cameras = await camera_service.get_cameras()
+    cameras = inventory.cameras
     sensors.extend(
         [
             WyzeCameraBatterySensor(camera)
@@ -92,24 +94,24 @@ async def async_setup_entry(
         ]
     )
 
-    plugs = await switch_usage_service.get_switches()
+    plugs = inventory.switches
     for plug in plugs:
         if plug.product_model in OUTDOOR_PLUGS:
             sensors.append(WyzePlugEnergySensor(plug, switch_usage_service))
             sensors.append(WyzePlugDailyEnergySensor(plug))
 
-    air_purifiers = await air_purifier_service.get_air_purifiers()
+    air_purifiers = inventory.air_purifiers
     for air_purifier in air_purifiers:
         sensors.append(WyzeAirPurifierAQISensor(air_purifier))
         sensors.append(WyzeAirPurifierHourlyMaxAQISensor(air_purifier))
 
-    # Get all irrigation devices
-    irrigation_devices = await irrigation_service.get_irrigations()
+    # Get all irrigation devices, updated or restored to get their properties
+    irrigation_devices = await inventory.async_entity_devices(
+        irrigation_service, inventory.irrigations
+    )
 
     # Create sensor entities for each irrigation device
     for device in irrigation_devices:
-        # Update the device to get its properties
-        device = await irrigation_service.update(device)
         sensors.extend(
             [
                 WyzeIrrigationRSSI(irrigation_service, device),
@@ -118,7 +120,17 @@ async def async_setup_entry(
             ]
         )
 
-    async_add_entities(sensors, True)
+    rate_limiter: WyzeRateLimiter = hass.data[DOMAIN][config_entry.entry_id][
+        RATE_LIMITER
+    ]
+    sensors.extend(
+        [
+            WyzeApiBudgetSensor(config_entry, rate_limiter),
+            WyzeApiQueueDepthSensor(config_entry, rate_limiter),
+        ]
+    )
+
+    async_add_entities(sensors, inventory.update_before_add)
 
 
 class WyzeLockBatterySensor(SensorEntity):
@@ -161,16 +173,11 @@ class WyzeLockBatterySensor(SensorEntity):
             if self.enabled is False:
                 self.enabled = True
             self._available = True
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Add listener on startup."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{LOCK_UPDATED}-{self._lock.mac}",
-                self.handle_lock_update,
-            )
+            async_track_device(self, self._lock, self.handle_lock_update)
         )
 
     @property
@@ -249,16 +256,11 @@ class WyzeCameraBatterySensor(SensorEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Handle camera updates."""
         self._camera = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Add listener on startup."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._camera.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._camera, self.handle_camera_update)
         )
 
     @property
@@ -423,11 +425,15 @@ class WyzePlugEnergySensor(RestoreSensor):
             self._attr_native_value = state.native_value
         else:
             self._attr_native_value = 0
-        self._switch.callback_function = self.async_update_callback
-        self._switch_usage_service.register_updater(
-            self._switch, 120
-        )  # Every 2 minutes seems to work fine, probably could be longer
-        await self._switch_usage_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self,
+                self._switch_usage_service,
+                self._switch,
+                120,  # Every 2 minutes seems to work fine, probably could be longer
+                self.async_update_callback,
+            )
+        )
 
         self.async_on_remove(
             async_dispatcher_connect(
@@ -437,10 +443,6 @@ class WyzePlugEnergySensor(RestoreSensor):
             )
         )
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Remove updater."""
-        self._switch_usage_service.unregister_updater(self._switch)
-
 
 class WyzePlugDailyEnergySensor(RestoreSensor):
     """Respresents an Outdoor Plug Daily Energy Sensor."""
@@ -553,15 +555,17 @@ class WyzeIrrigationBaseSensor(SensorEntity):
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to updates."""
-        self._device.callback_function = self.async_update_callback
-        self._irrigation_service.register_updater(self._device, 30)
-        await self._irrigation_service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self,
+                self._irrigation_service,
+                self._device,
+                30,
+                self.async_update_callback,
+            )
+        )
         return await super().async_added_to_hass()
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Clean up when removed."""
-        self._irrigation_service.unregister_updater(self._device)
-
 
 class WyzeIrrigationRSSI(WyzeIrrigationBaseSensor):
     """Representation of a Wyze Irrigation RSSI sensor."""
@@ -687,15 +691,12 @@ class WyzeAirPurifierAirQualitySensor(SensorEntity):
     def handle_air_purifier_update(self, air_purifier: AirPurifier) -> None:
         """Handle air purifier updates."""
         self._air_purifier = air_purifier
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Add listener on startup."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{AIR_PURIFIER_UPDATED}-{self._air_purifier.mac}",
-                self.handle_air_purifier_update,
+            async_track_device(
+                self, self._air_purifier, self.handle_air_purifier_update
             )
         )
 
@@ -769,3 +770,49 @@ class WyzeAirPurifierHourlyMaxAQISensor(WyzeAirPurifierAirQualitySensor):
         if offset is not None:
             value += offset
         return value.isoformat()
+
+
+class WyzeApiLimiterSensor(SensorEntity):
+    """Base class for the Wyze API rate limiter diagnostic sensors."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _key: str
+
+    def __init__(
+        self, config_entry: ConfigEntry, rate_limiter: WyzeRateLimiter
+    ) -> None:
+        """Initialize a rate limiter sensor."""
+        self._rate_limiter = rate_limiter
+        self._attr_unique_id = f"{config_entry.entry_id}-{self._key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id + WYZE_API_DEVICE_SUFFIX)},
+            name="Wyze API",
+            manufacturer="WyzeLabs",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+
+class WyzeApiBudgetSensor(WyzeApiLimiterSensor):
+    """Requests left in the hourly Wyze API budget."""
+
+    _key = "api_budget_remaining"
+    _attr_name = "Hourly request budget remaining"
+    _attr_icon = "mdi:gauge"
+
+    async def async_update(self) -> None:
+        """Read the remaining budget from the rate limiter."""
+        self._attr_native_value = self._rate_limiter.remaining_budget
+
+
+class WyzeApiQueueDepthSensor(WyzeApiLimiterSensor):
+    """Wyze API requests waiting for the rate limiter."""
+
+    _key = "api_queue_depth"
+    _attr_name = "Queued requests"
+    _attr_icon = "mdi:tray-full"
+
+    async def async_update(self) -> None:
+        """Read the queue depth from the rate limiter."""
+        self._attr_native_value = self._rate_limiter.queue_depth
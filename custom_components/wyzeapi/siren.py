@@ -17,9 +17,11 @@ from homeassistant.components.siren import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
-from .const import CAMERA_UPDATED, CONF_CLIENT, DOMAIN
+from .const import CONF_CLIENT, DOMAIN, INVENTORY
+from .device_index import async_track_device
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -43,14 +45,15 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi siren component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     camera_service = await client.camera_service
     sirens = []
-    for camera in await camera_service.get_cameras():
+    for camera in inventory.cameras:
         # The campan v1, v2 camera, and video doorbell pro don't have sirens
         if camera.product_model not in ["WYZECP1_JEF", "WYZEC1-JZ", "GW_BE1"]:
             sirens.append(WyzeCameraSiren(camera, camera_service))
 
-    async_add_entities(sirens, True)
+    async_add_entities(sirens, inventory.update_before_add)
 
 
 class WyzeCameraSiren(SirenEntity):
@@ -68,6 +71,7 @@ class WyzeCameraSiren(SirenEntity):
         )
 
     @token_exception_handler
+    @user_command
     async def async_turn_on(self, **kwargs) -> None:
         """Turn the siren on."""
         try:
@@ -82,6 +86,7 @@ class WyzeCameraSiren(SirenEntity):
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_turn_off(self, **kwargs):
         """Turn the siren off."""
         try:
@@ -130,13 +135,8 @@ class WyzeCameraSiren(SirenEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the camera object whenever there is an update"""
         self._device = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._device.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._device, self.handle_camera_update)
         )
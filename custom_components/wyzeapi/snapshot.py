@@ -0,0 +1,132 @@
+"""Camera snapshots for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+import logging
+import time
+
+from aiohttp import ClientError
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from wyzeapy.services.camera_service import Camera
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_TTL = 60
+# Full images and resized variants of every camera of a config entry together
+MAX_SNAPSHOTS = 64
+FETCH_TIMEOUT = 10
+
+# file_list type of an event's screenshot, type 2 is its video
+_SCREENSHOT = 1
+
+
+def snapshot_url(camera: Camera) -> str | None:
+    """Return the URL of the newest still image the cloud has of a camera.
+
+    That is either the screenshot of the camera's last event or the thumbnail
+    the Wyze app shows in its device list, whichever was taken last.
+    """
+    candidates = []
+    thumbnails = (camera.device_params or {}).get("camera_thumbnails") or {}
+    if url := thumbnails.get("thumbnails_url"):
+        candidates.append((thumbnails.get("thumbnails_ts") or 0, url))
+    if (event := camera.last_event) is not None:
+        for resource in event.file_list:
+            if resource.get("type") == _SCREENSHOT and resource.get("url"):
+                candidates.append((event.event_ts, resource["url"]))
+    return max(candidates, default=(0, None))[1]
+
+
+class WyzeSnapshotCache:
+    """Bounded cache of camera snapshots shared by a config entry's cameras.
+
+    Images are kept for SNAPSHOT_TTL seconds, or until the cloud has a newer one,
+    and the least recently used are dropped beyond MAX_SNAPSHOTS. Requests for
+    a camera that is already being fetched wait for that fetch, and resized
+    variants are scaled from the cached full image, so any number of viewers
+    costs one download per camera per TTL.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        scale: Callable[[bytes, int, int], bytes],
+        ttl: float = SNAPSHOT_TTL,
+        max_size: int = MAX_SNAPSHOTS,
+    ) -> None:
+        """Initialize the cache.
+
+        `scale` resizes a JPEG image to a width and height, it runs in the
+        executor.
+        """
+        self._hass = hass
+        self._scale = scale
+        self._ttl = ttl
+        self._max_size = max_size
+        self._images: OrderedDict[
+            tuple[str, int | None, int | None], tuple[float, str, bytes]
+        ] = OrderedDict()
+        self._fetches: dict[
+            tuple[str, int | None, int | None], asyncio.Future[bytes | None]
+        ] = {}
+
+    async def async_image(
+        self, camera: Camera, width: int | None = None, height: int | None = None
+    ) -> bytes | None:
+        """Return the latest snapshot of a camera, resized if asked to."""
+        if width is None or height is None:
+            width = height = None
+        if (url := snapshot_url(camera)) is None:
+            return None
+
+        key = (camera.mac, width, height)
+        if (cached := self._images.get(key)) is not None:
+            fetched_at, cached_url, image = cached
+            if cached_url == url and time.monotonic() - fetched_at < self._ttl:
+                self._images.move_to_end(key)
+                return image
+
+        if (fetch := self._fetches.get(key)) is None:
+            fetch = self._fetches[key] = self._hass.async_create_task(
+                self._async_fetch(key, camera, url)
+            )
+            fetch.add_done_callback(lambda _: self._fetches.pop(key, None))
+        # A viewer going away must not cancel the fetch the others wait for
+        return await asyncio.shield(fetch)
+
+    async def _async_fetch(
+        self,
+        key: tuple[str, int | None, int | None],
+        camera: Camera,
+        url: str,
+    ) -> bytes | None:
+        _, width, height = key
+        if width is None or height is None:
+            image = await self._async_download(camera, url)
+        elif (image := await self.async_image(camera)) is not None:
+            image = await self._hass.async_add_executor_job(
+                self._scale, image, width, height
+            )
+        if image is None:
+            return None
+
+        self._images[key] = (time.monotonic(), url, image)
+        self._images.move_to_end(key)
+        while len(self._images) > self._max_size:
+            self._images.popitem(last=False)
+        return image
+
+    async def _async_download(self, camera: Camera, url: str) -> bytes | None:
+        session = async_get_clientsession(self._hass)
+        try:
+            async with asyncio.timeout(FETCH_TIMEOUT):
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    return await response.read()
+        except (ClientError, TimeoutError) as e:
+            _LOGGER.debug("Unable to fetch a snapshot of %s: %s", camera.nickname, e)
+            return None
@@ -0,0 +1,165 @@
+"""Camera stream info prefetching for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+import logging
+import time
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from .rate_limiter import RequestPriority, request_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lifetime of a signed signaling URL that doesn't say how long it is valid
+DEFAULT_URL_LIFETIME = 300
+# Stream info is replaced this long before its signaling URL expires, or
+# halfway through the lifetime of URLs valid for less than twice as long
+REFRESH_MARGIN = 30
+# Prefetching pauses once no stream started for this long
+PREFETCH_IDLE_TIMEOUT = 900
+# Client id of the camera on its KVS signaling channel
+KVS_RECIPIENT_CLIENT_ID = "ada06f08-87f4-4e13-b699-e82db8517ae5"
+
+
+def signaling_url(config: dict[str, Any]) -> str:
+    """Return the signaling URL of a stream info, ready to connect to."""
+    # The signaling_url from get_stream_info() is often *double*-percent-encoded
+    # (e.g. "%253A" instead of "%3A"). We must NOT fully URL-decode it because
+    # that can change SigV4 canonical encoding and make KVS reject the handshake.
+    # Instead, only "undouble" percent-escapes by converting "%25xx" -> "%xx",
+    # leaving "%3A", "%2F", etc. intact.
+    url = config["signaling_url"]
+    for _ in range(3):
+        if "%25" not in url:
+            break
+        url = url.replace("%25", "%")
+    return url
+
+
+def go2rtc_source(config: dict[str, Any]) -> str:
+    """Return a go2rtc stream source connecting to the KVS channel of a stream info."""
+    ice_servers = [
+        {
+            "urls": server["url"],
+            "username": server["username"],
+            "credential": server["credential"],
+        }
+        for server in config.get("ice_servers", [])
+    ]
+    return (
+        f"webrtc:{signaling_url(config)}#format=kinesis"
+        f"#client_id={KVS_RECIPIENT_CLIENT_ID}"
+        f"#ice_servers={json.dumps(ice_servers, separators=(',', ':'))}"
+    )
+
+
+def signaling_url_lifetime(config: dict[str, Any]) -> float:
+    """Return for how many seconds the signaling URL of a stream info is valid."""
+    # The URL is often double-percent-encoded, which only affects the values
+    query = urlsplit(config.get("signaling_url") or "").query
+    try:
+        return float(parse_qs(query)["X-Amz-Expires"][0])
+    except (KeyError, ValueError):
+        return DEFAULT_URL_LIFETIME
+
+
+def usable_lifetime(config: dict[str, Any]) -> float:
+    """Return for how many seconds a stream info can still be handed out."""
+    lifetime = signaling_url_lifetime(config)
+    return lifetime - min(REFRESH_MARGIN, lifetime / 2)
+
+
+class WyzeStreamInfoPrefetcher:
+    """Keeps an unused stream info ready for the next stream of a camera.
+
+    Stream starts would otherwise wait for a get_stream_info round trip, but
+    its signed signaling URL is single use and short lived. The prefetcher
+    holds one that was never handed out, replaces it REFRESH_MARGIN seconds
+    before it expires, and fetches the next one as soon as it is taken. When
+    nothing was taken for PREFETCH_IDLE_TIMEOUT seconds it stops replacing
+    them until the next take.
+    """
+
+    def __init__(
+        self, fetch: Callable[[], Awaitable[dict[str, Any]]], name: str
+    ) -> None:
+        """Initialize the prefetcher."""
+        self._fetch = fetch
+        self._name = name
+        # The newest stream info, whether it was handed out or not
+        self.latest: dict[str, Any] | None = None
+        self._ready: dict[str, Any] | None = None
+        self._expires_at = 0.0
+        self._used_at = 0.0
+        self._fetch_task: asyncio.Task[None] | None = None
+        self._refresh_timer: asyncio.TimerHandle | None = None
+
+    async def async_refresh(self) -> None:
+        """Fetch a stream info and keep it ready."""
+        self._used_at = time.monotonic()
+        await asyncio.shield(self._async_next())
+
+    async def async_take(self) -> dict[str, Any]:
+        """Return a stream info that was never handed out before.
+
+        Without one ready, one is fetched for the caller as a user command
+        instead of waiting for a prefetch queued behind polls.
+        """
+        self._used_at = time.monotonic()
+        if self._ready is not None and time.monotonic() < self._expires_at:
+            config, self._ready = self._ready, None
+        else:
+            with request_priority(RequestPriority.COMMAND):
+                config = self.latest = await self._fetch()
+        self._async_next()
+        return config
+
+    def async_stop(self) -> None:
+        """Stop refreshing and drop the stream info that is ready."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+            self._fetch_task = None
+        self._ready = None
+
+    def _async_next(self) -> asyncio.Task[None]:
+        """Return the running fetch, starting one if there is none."""
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._async_fetch())
+            self._fetch_task.add_done_callback(self._fetch_done)
+        return self._fetch_task
+
+    async def _async_fetch(self) -> None:
+        # Prefetches are background requests, whoever started them
+        with request_priority(RequestPriority.POLL):
+            config = await self._fetch()
+        lifetime = usable_lifetime(config)
+        self.latest = self._ready = config
+        self._expires_at = time.monotonic() + lifetime
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = asyncio.get_running_loop().call_later(
+            lifetime, self._async_refresh_due
+        )
+
+    def _async_refresh_due(self) -> None:
+        """Replace the ready stream info, unless no stream started in a while."""
+        self._refresh_timer = None
+        if time.monotonic() - self._used_at > PREFETCH_IDLE_TIMEOUT:
+            _LOGGER.debug(
+                "No stream of %s started lately, pausing prefetch", self._name
+            )
+            self._ready = None
+            return
+        self._async_next()
+
+    def _fetch_done(self, task: asyncio.Task[None]) -> None:
+        """Log a failed fetch nobody was waiting for."""
+        if not task.cancelled() and (error := task.exception()) is not None:
+            _LOGGER.debug("Unable to prefetch stream info of %s: %s", self._name, error)
@@ -29,20 +29,19 @@ from homeassistant.helpers import (
     entity_registry as er,
     issue_registry as ir,
 )
-from homeassistant.helpers.dispatcher import (
-    async_dispatcher_connect,
-    async_dispatcher_send,
-)
 from homeassistant.helpers.issue_registry import IssueSeverity
 
 from .const import (
-    CAMERA_UPDATED,
     CONF_CLIENT,
     DOMAIN,
-    LIGHT_UPDATED,
+    INVENTORY,
     WYZE_CAMERA_EVENT,
     WYZE_NOTIFICATION_TOGGLE,
 )
+from .device_index import async_device_updated, async_track_device
+from .inventory import WyzeDeviceInventory
+from .rate_limiter import user_command
+from .scheduler import async_device_commanded, async_track_device_updates
 from .token_manager import token_exception_handler
 
 _LOGGER = logging.getLogger(__name__)
@@ -79,6 +78,7 @@ async def async_setup_entry(
 
     _LOGGER.debug("""Creating new WyzeApi light component""")
     client: Wyzeapy = hass.data[DOMAIN][config_entry.entry_id][CONF_CLIENT]
+    inventory: WyzeDeviceInventory = hass.data[DOMAIN][config_entry.entry_id][INVENTORY]
     switch_service = await client.switch_service
     wall_switch_service = await client.wall_switch_service
     camera_service = await client.camera_service
@@ -90,7 +90,7 @@ async def async_setup_entry(
     devices = []
     device_registry = dr.async_get(hass)
 
-    base_switches = await switch_service.get_switches()
+    base_switches = inventory.switches
     # The outdoor plug has a dummy switch that doesn't control anything
     # on the device. So we add non-outdoor plug switches and then
     # the switches for each individual outlet on the outdoor plug.
@@ -106,11 +106,10 @@ async def async_setup_entry(
             switches.append(WyzeSwitch(switch_service, switch))
 
     switches.extend(
-        WyzeSwitch(wall_switch_service, switch)
-        for switch in await wall_switch_service.get_switches()
+        WyzeSwitch(wall_switch_service, switch) for switch in inventory.wall_switches
     )
 
-    camera_switches = await camera_service.get_cameras()
+    camera_switches = inventory.cameras
     for switch in camera_switches:
         # Notification toggle switch
         if switch.product_model not in NOTIFICATION_SWITCH_UNSUPPORTED:
@@ -126,7 +125,7 @@ async def async_setup_entry(
 
     switches.append(WyzeNotifications(client))
 
-    bulb_switches = await bulb_service.get_bulbs()
+    bulb_switches = inventory.bulbs
     switches.extend(
         WzyeLightstripSwitch(bulb_service, bulb)
         for bulb in bulb_switches
@@ -245,6 +244,7 @@ class WyzeNotifications(SwitchEntity):
             "model": "WyzeNotificationToggle",
         }
 
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         try:
@@ -258,6 +258,7 @@ class WyzeNotifications(SwitchEntity):
             self._just_updated = True
             self.async_schedule_update_ha_state()
 
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
         try:
@@ -343,6 +344,7 @@ class WyzeSwitch(SwitchEntity):
         }
 
     @token_exception_handler
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         try:
@@ -354,9 +356,11 @@ class WyzeSwitch(SwitchEntity):
         else:
             self._device.on = True
             self._just_updated = True
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
     @token_exception_handler
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
         try:
@@ -368,6 +372,7 @@ class WyzeSwitch(SwitchEntity):
         else:
             self._device.on = False
             self._just_updated = True
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
     @property
@@ -423,12 +428,7 @@ class WyzeSwitch(SwitchEntity):
     def async_update_callback(self, switch: Switch):
         """Update the switch's state."""
         self._device = switch
-        async_dispatcher_send(
-            self.hass,
-            f"{CAMERA_UPDATED}-{switch.mac}",
-            switch,
-        )
-        self.async_schedule_update_ha_state()
+        async_device_updated(self, switch)
         # if the switch is from a camera, lets check for new events
         if isinstance(switch, Camera):
             if (
@@ -464,15 +464,13 @@ class WyzeSwitch(SwitchEntity):
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to update events."""
-        self._device.callback_function = self.async_update_callback
-        self._service.register_updater(self._device, 30)
-        await self._service.start_update_manager()
+        self.async_on_remove(
+            async_track_device_updates(
+                self, self._service, self._device, 30, self.async_update_callback
+            )
+        )
         return await super().async_added_to_hass()
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Unregister updated on removal."""
-        self._service.unregister_updater(self._device)
-
 
 class WyzeCameraNotificationSwitch(SwitchEntity):
     """Representation of a Wyze Camera Notification Switch."""
@@ -499,6 +497,7 @@ class WyzeCameraNotificationSwitch(SwitchEntity):
         """No polling needed."""
         return False
 
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         try:
@@ -509,8 +508,10 @@ class WyzeCameraNotificationSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.notify = True
+            async_device_commanded(self, self._service, self._device)
             self.async_write_ha_state()
 
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
         try:
@@ -521,6 +522,7 @@ class WyzeCameraNotificationSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.notify = False
+            async_device_commanded(self, self._service, self._device)
             self.async_write_ha_state()
 
     @property
@@ -547,16 +549,11 @@ class WyzeCameraNotificationSwitch(SwitchEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the switch whenever there is an update."""
         self._device = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Listen for camera updates."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._device.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._device, self.handle_camera_update)
         )
 
 
@@ -585,6 +582,7 @@ class WyzeCameraMotionSwitch(SwitchEntity):
         """No polling needed."""
         return False
 
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         try:
@@ -595,8 +593,10 @@ class WyzeCameraMotionSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.motion = True
+            async_device_commanded(self, self._service, self._device)
             self.async_write_ha_state()
 
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
         try:
@@ -607,6 +607,7 @@ class WyzeCameraMotionSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.motion = False
+            async_device_commanded(self, self._service, self._device)
             self.async_write_ha_state()
 
     @property
@@ -633,16 +634,11 @@ class WyzeCameraMotionSwitch(SwitchEntity):
     def handle_camera_update(self, camera: Camera) -> None:
         """Update the switch whenever there is an update."""
         self._device = camera
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Listen for camera updates."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{CAMERA_UPDATED}-{self._device.mac}",
-                self.handle_camera_update,
-            )
+            async_track_device(self, self._device, self.handle_camera_update)
         )
 
 
@@ -669,6 +665,7 @@ class WzyeLightstripSwitch(SwitchEntity):
         """No polling needed."""
         return False
 
+    @user_command
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on the switch."""
         try:
@@ -679,8 +676,10 @@ class WzyeLightstripSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.music_mode = True
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
+    @user_command
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the switch."""
         try:
@@ -691,6 +690,7 @@ class WzyeLightstripSwitch(SwitchEntity):
             raise HomeAssistantError(err) from err
         else:
             self._device.music_mode = False
+            async_device_commanded(self, self._service, self._device)
             self.async_schedule_update_ha_state()
 
     @property
@@ -717,14 +717,9 @@ class WzyeLightstripSwitch(SwitchEntity):
     def handle_light_update(self, bulb: Bulb) -> None:
         """Update the switch whenever there is an update."""
         self._device = bulb
-        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Listen for light updates."""
         self.async_on_remove(
-            async_dispatcher_connect(
-                self.hass,
-                f"{LIGHT_UPDATED}-{self._device.mac}",
-                self.handle_light_update,
-            )
+            async_track_device(self, self._device, self.handle_light_update)
         )
@@ -0,0 +1,154 @@
+"""WebRTC session tracking for the Wyze Home Assistant Integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_SESSIONS_PER_CAMERA = 4
+# Sessions are closed after this long without signaling traffic
+SESSION_IDLE_TIMEOUT = 600
+# and after this long no matter what
+SESSION_MAX_AGE = 4 * 3600
+# Candidates for a session that never got its offer are dropped after this long
+PENDING_CANDIDATE_TIMEOUT = 60
+CLEANUP_INTERVAL = 60
+
+
+class WebRTCSession(Protocol):
+    """What the manager needs of a session."""
+
+    def close_connection(self) -> None:
+        """Close the session's signaling connection."""
+
+
+@dataclass
+class _TrackedSession:
+    session: WebRTCSession
+    started_at: float = field(default_factory=time.monotonic)
+    active_at: float = field(default_factory=time.monotonic)
+
+
+class WyzeWebRTCSessionManager:
+    """The WebRTC sessions of one camera and the tasks that serve them.
+
+    The frontend doesn't always close the sessions it opens, so sessions are
+    closed once there are more than MAX_SESSIONS_PER_CAMERA, once they were idle
+    for SESSION_IDLE_TIMEOUT seconds or once they are SESSION_MAX_AGE seconds
+    old. Tasks are tracked, and all of it is torn down with the camera entity.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_sessions: int = MAX_SESSIONS_PER_CAMERA,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        max_age: float = SESSION_MAX_AGE,
+    ) -> None:
+        """Initialize the session manager."""
+        self._name = name
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._max_age = max_age
+        self._sessions: dict[str, _TrackedSession] = {}
+        self._pending_candidates: dict[str, tuple[float, list[Any]]] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._cleanup_timer: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        """Return the number of open sessions."""
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> WebRTCSession | None:
+        """Return an open session."""
+        if (tracked := self._sessions.get(session_id)) is None:
+            return None
+        return tracked.session
+
+    def async_add(self, session_id: str, session: WebRTCSession) -> None:
+        """Track a new session, closing the oldest ones beyond the cap."""
+        self._sessions[session_id] = _TrackedSession(session)
+        while len(self._sessions) > self._max_sessions:
+            oldest = min(self._sessions, key=lambda key: self._sessions[key].started_at)
+            _LOGGER.debug(
+                "Too many WebRTC sessions for %s, closing %s", self._name, oldest
+            )
+            self.async_close(oldest)
+
+    def async_touch(self, session_id: str) -> None:
+        """Note signaling traffic of a session."""
+        if (tracked := self._sessions.get(session_id)) is not None:
+            tracked.active_at = time.monotonic()
+
+    def async_close(self, session_id: str) -> None:
+        """Close a session and drop its buffered candidates."""
+        self._pending_candidates.pop(session_id, None)
+        if (tracked := self._sessions.pop(session_id, None)) is not None:
+            tracked.session.close_connection()
+
+    def async_discard(self, session_id: str, session: WebRTCSession) -> None:
+        """Forget a session whose connection ended on its own."""
+        if (tracked := self._sessions.get(session_id)) is not None:
+            if tracked.session is session:
+                del self._sessions[session_id]
+
+    def async_buffer_candidate(self, session_id: str, candidate: Any) -> None:
+        """Keep a candidate that arrived before its session was opened."""
+        _, candidates = self._pending_candidates.setdefault(
+            session_id, (time.monotonic(), [])
+        )
+        candidates.append(candidate)
+
+    def async_pop_candidates(self, session_id: str) -> list[Any]:
+        """Return and forget the candidates buffered for a session."""
+        _, candidates = self._pending_candidates.pop(session_id, (0, []))
+        return candidates
+
+    def async_create_task(
+        self, coro: Coroutine[Any, Any, Any], name: str
+    ) -> asyncio.Task[Any]:
+        """Run a task that is cancelled when the manager stops."""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def async_start(self) -> None:
+        """Start closing expired sessions periodically."""
+        self._cleanup_timer = asyncio.get_running_loop().call_later(
+            CLEANUP_INTERVAL, self._async_cleanup
+        )
+
+    def async_stop(self) -> None:
+        """Close every session and cancel every task."""
+        if self._cleanup_timer is not None:
+            self._cleanup_timer.cancel()
+            self._cleanup_timer = None
+        for session_id in list(self._sessions):
+            self.async_close(session_id)
+        self._pending_candidates.clear()
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _async_cleanup(self) -> None:
+        """Close expired sessions and drop stale candidates."""
+        now = time.monotonic()
+        for session_id, tracked in list(self._sessions.items()):
+            if (
+                now - tracked.active_at > self._idle_timeout
+                or now - tracked.started_at > self._max_age
+            ):
+                _LOGGER.debug(
+                    "Closing expired WebRTC session %s of %s", session_id, self._name
+                )
+                self.async_close(session_id)
+        for session_id, (created_at, _) in list(self._pending_candidates.items()):
+            if now - created_at > PENDING_CANDIDATE_TIMEOUT:
+                del self._pending_candidates[session_id]
+        self.async_start()
@@ -0,0 +1,93 @@
+# SPDX-FileCopyrightText: 2026 Katie Mulliken <katie@mulliken.net>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Micro-benchmark of the KVS signaling codec during ICE gathering bursts.
+
+Run from the repository root: python -m scripts.benchmark_kvs_codec
+"""
+
+import base64
+from dataclasses import asdict
+import json
+import re
+import timeit
+
+from webrtc_models import RTCIceCandidateInit
+
+from custom_components.wyzeapi.kvs_codec import (
+    decode_candidate,
+    decode_message,
+    encode_candidate,
+)
+
+NUMBER = 2000
+# Candidates a browser gathers for one stream with a few interfaces and TURN
+BURST = [
+    RTCIceCandidateInit(
+        candidate=(
+            f"candidate:{index} 1 udp {2122260223 - index} 192.168.1.{index} "
+            f"{50000 + index} typ host generation 0 ufrag AbCd network-id 1"
+        ),
+        sdp_mid="0",
+        sdp_m_line_index=0,
+    )
+    for index in range(16)
+]
+
+
+def _encode_before(candidate: RTCIceCandidateInit) -> str:
+    """Encode a candidate the way send_candidate used to."""
+    candidate_dict = asdict(candidate)
+    payload = {
+        "candidate": candidate_dict["candidate"],
+        "sdpMid": candidate_dict["sdp_mid"],
+        "sdpMLineIndex": candidate_dict["sdp_m_line_index"],
+        "usernameFragment": candidate_dict["user_fragment"],
+    }
+    match = re.search(r"ufrag (\w{4})", payload["candidate"])
+    if match is not None:
+        payload["usernameFragment"] = match.group(1)
+    return json.dumps(
+        {
+            "action": "ICE_CANDIDATE",
+            "recipientClientId": "client",
+            "messagePayload": base64.b64encode(
+                json.dumps(payload, separators=(",", ":")).encode()
+            ).decode(),
+        }
+    )
+
+
+def _decode_before(message: str) -> RTCIceCandidateInit:
+    """Decode a candidate the way run_loop used to."""
+    data = json.loads(message)
+    candidate_data = json.loads(base64.b64decode(data["messagePayload"]).decode())
+    return RTCIceCandidateInit(
+        candidate=candidate_data["candidate"],
+        sdp_mid=candidate_data.get("sdpMid"),
+        sdp_m_line_index=candidate_data.get("sdpMLineIndex"),
+        user_fragment=candidate_data.get("usernameFragment"),
+    )
+
+
+def _report(label: str, func) -> None:
+    seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+    print(f"{label + ':':<20} {NUMBER * len(BURST) / seconds:>10,.0f} candidates/s")
+
+
+def main() -> None:
+    """Print candidate throughput of the old and new encoders and decoders."""
+    received = [
+        json.dumps({"messageType": "ICE_CANDIDATE", **json.loads(message)})
+        for message in map(encode_candidate, BURST)
+    ]
+
+    _report("encode, before", lambda: [_encode_before(c) for c in BURST])
+    _report("encode", lambda: [encode_candidate(c) for c in BURST])
+    _report("decode, before", lambda: [_decode_before(m) for m in received])
+    _report("decode", lambda: [decode_candidate(decode_message(m)) for m in received])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2026 Katie Mulliken <katie@mulliken.net>
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""Micro-benchmark of the Lock Bolt BLE framing and crypto helpers.
+
+Run from the repository root: python -m scripts.benchmark_ydble
+"""
+
+import timeit
+
+from Crypto.Cipher import AES
+
+from custom_components.wyzeapi.ydble_utils import (
+    ecb_cipher,
+    pack_l1,
+    pack_l2_dict,
+    pack_l2_lock_unlock,
+    parse_l1,
+    parse_l2_dict,
+)
+
+NUMBER = 20000
+KEY = "0123456789abcdef"
+BLE_TOKEN = KEY * 2
+
+
+def _report(name: str, label: str, func, unit: str, size: int) -> None:
+    seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+    print(
+        f"{name:>16} {label + ':':<21} {NUMBER / seconds:>10,.0f} {unit}/s ({size} bytes)"
+    )
+
+
+def main() -> None:
+    """Print framing and crypto throughput for typical and large frames."""
+    for name, content in (
+        ("challenge", {10: b"\x27"}),
+        ("challenge reply", {0xD2: bytes(16), 0x01: bytes(4)}),
+        ("large", {key: bytes(64) for key in range(8)}),
+    ):
+        frame = pack_l1(0x40, 1, pack_l2_dict(0x86, 0, content))
+
+        def encode(content=content):
+            pack_l1(0x40, 1, pack_l2_dict(0x86, 0, content))
+
+        def decode(frame=frame):
+            parse_l2_dict(parse_l1(frame)[0])
+
+        _report(name, "encode", encode, "frames", len(frame))
+        _report(name, "decode", decode, "frames", len(frame))
+
+    state = ecb_cipher(KEY).encrypt(bytes(16))
+    cipher = ecb_cipher(KEY)
+    # What every state notification used to cost, for comparison
+    _report(
+        "state",
+        "decrypt, new cipher",
+        lambda: AES.new(KEY.encode(), AES.MODE_ECB).decrypt(state),
+        "states",
+        len(state),
+    )
+    _report(
+        "state",
+        "decrypt, kept cipher",
+        lambda: cipher.decrypt(state),
+        "states",
+        len(state),
+    )
+    _report(
+        "lock command",
+        "encode",
+        lambda: pack_l2_lock_unlock(7, BLE_TOKEN, bytes(16), "lock"),
+        "commands",
+        38,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,9 @@ from wyzeapy.exceptions import AccessTokenError, ParameterError, UnknownApiError
 
 from custom_components.wyzeapi import PLATFORMS
 from custom_components.wyzeapi import fan as fan_module
-from custom_components.wyzeapi.const import CONF_CLIENT, DOMAIN
+from custom_components.wyzeapi.const import CONF_CLIENT, DOMAIN, INVENTORY
 from custom_components.wyzeapi.fan import WyzeAirPurifierFan
+from custom_components.wyzeapi.inventory import WyzeDeviceInventory
 
 
 @pytest.fixture
@@ -36,9 +37,6 @@ def service() -> SimpleNamespace:
     """Return a mocked air purifier service."""
     return SimpleNamespace(
         get_air_purifiers=AsyncMock(return_value=[]),
-        register_updater=Mock(),
-        unregister_updater=Mock(),
-        start_update_manager=AsyncMock(),
         turn_on=AsyncMock(),
         turn_off=AsyncMock(),
         set_fan_mode=AsyncMock(),
@@ -66,14 +64,16 @@ async def test_setup_entry_adds_air_purifier_fans(
     service: SimpleNamespace,
     air_purifier: SimpleNamespace,
 ) -> None:
-    """The real fan platform setup creates purifier entities."""
-    service.get_air_purifiers.return_value = [air_purifier]
+    """The real fan platform setup creates purifier entities from the inventory."""
     service_future = asyncio.Future()
     service_future.set_result(service)
     client = SimpleNamespace(air_purifier_service=service_future)
+    inventory = WyzeDeviceInventory(air_purifiers=[air_purifier])
     config_entry = SimpleNamespace(entry_id="entry-id")
     hass = SimpleNamespace(
-        data={DOMAIN: {config_entry.entry_id: {CONF_CLIENT: client}}}
+        data={
+            DOMAIN: {config_entry.entry_id: {CONF_CLIENT: client, INVENTORY: inventory}}
+        }
     )
     async_add_entities = Mock()
 
@@ -83,7 +83,7 @@ async def test_setup_entry_adds_air_purifier_fans(
     assert update_before_add is True
     assert len(entities) == 1
     assert isinstance(entities[0], WyzeAirPurifierFan)
-    service.get_air_purifiers.assert_awaited_once_with()
+    service.get_air_purifiers.assert_not_awaited()
 
 
 def test_state_and_device_information(
@@ -149,20 +149,23 @@ async def test_turn_off_updates_optimistic_state(
 
 @pytest.mark.asyncio
 async def test_updater_lifecycle(
+    monkeypatch: pytest.MonkeyPatch,
     entity: WyzeAirPurifierFan,
     service: SimpleNamespace,
     air_purifier: SimpleNamespace,
 ) -> None:
-    """The fan owns updater registration and manager startup."""
-    await entity.async_added_to_hass()
+    """The fan subscribes to the entry's poll scheduler until it is removed."""
+    unsubscribe = Mock()
+    track = Mock(return_value=unsubscribe)
+    monkeypatch.setattr(fan_module, "async_track_device_updates", track)
+    entity.async_on_remove = Mock()
 
-    assert air_purifier.callback_function == entity.async_update_callback
-    service.register_updater.assert_called_once_with(air_purifier, 30)
-    service.start_update_manager.assert_awaited_once_with()
-
-    await entity.async_will_remove_from_hass()
+    await entity.async_added_to_hass()
 
-    service.unregister_updater.assert_called_once_with(air_purifier)
+    track.assert_called_once_with(
+        entity, service, air_purifier, 30, entity.async_update_callback
+    )
+    entity.async_on_remove.assert_called_once_with(unsubscribe)
 
 
 @pytest.mark.asyncio
@@ -204,24 +207,18 @@ async def test_rejects_unknown_preset(
     service.set_fan_mode.assert_not_awaited()
 
 
-def test_update_callback_dispatches_to_sibling_entities(
+def test_update_callback_updates_sibling_entities(
     entity: WyzeAirPurifierFan,
     air_purifier: SimpleNamespace,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
-    """Library callbacks update the fan and notify AQI sensors."""
+    """Library callbacks update the fan and hand the device to AQI sensors."""
     updated = SimpleNamespace(**vars(air_purifier))
     updated.fan_mode = "turbo"
-    entity.hass = Mock()
-    dispatcher_send = Mock()
-    monkeypatch.setattr(fan_module, "async_dispatcher_send", dispatcher_send)
+    device_updated = Mock()
+    monkeypatch.setattr(fan_module, "async_device_updated", device_updated)
 
     entity.async_update_callback(updated)
 
     assert entity.percentage == 100
-    dispatcher_send.assert_called_once_with(
-        entity.hass,
-        "wyzeapi.air_purifier_updated-AA:BB:CC:DD:EE:FF",
-        updated,
-    )
-    entity.async_schedule_update_ha_state.assert_called_once_with()
+    device_updated.assert_called_once_with(entity, updated)
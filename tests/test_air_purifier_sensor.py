@@ -70,21 +70,19 @@ def test_missing_hourly_timestamps(air_purifier: SimpleNamespace) -> None:
     assert sensor.extra_state_attributes["sampled_until"] is None
 
 
-def test_dispatcher_update_replaces_model(air_purifier: SimpleNamespace) -> None:
-    """Dispatcher callbacks replace cached data and write Home Assistant state."""
+def test_device_update_replaces_model(air_purifier: SimpleNamespace) -> None:
+    """Device updates replace cached data."""
     sensor = WyzeAirPurifierAQISensor(air_purifier)
-    sensor.async_write_ha_state = Mock()
     updated = SimpleNamespace(**vars(air_purifier))
     updated.aqi = 73
 
     sensor.handle_air_purifier_update(updated)
 
     assert sensor.native_value == 73
-    sensor.async_write_ha_state.assert_called_once_with()
 
 
 @pytest.mark.asyncio
-async def test_sensor_subscribes_to_air_purifier_dispatcher(
+async def test_sensor_subscribes_to_air_purifier_updates(
     air_purifier: SimpleNamespace,
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -93,14 +91,12 @@ async def test_sensor_subscribes_to_air_purifier_dispatcher(
     sensor.hass = Mock()
     sensor.async_on_remove = Mock()
     unsubscribe = Mock()
-    dispatcher_connect = Mock(return_value=unsubscribe)
-    monkeypatch.setattr(sensor_module, "async_dispatcher_connect", dispatcher_connect)
+    track_device = Mock(return_value=unsubscribe)
+    monkeypatch.setattr(sensor_module, "async_track_device", track_device)
 
     await sensor.async_added_to_hass()
 
-    dispatcher_connect.assert_called_once_with(
-        sensor.hass,
-        "wyzeapi.air_purifier_updated-AA:BB:CC:DD:EE:FF",
-        sensor.handle_air_purifier_update,
+    track_device.assert_called_once_with(
+        sensor, air_purifier, sensor.handle_air_purifier_update
     )
     sensor.async_on_remove.assert_called_once_with(unsubscribe)
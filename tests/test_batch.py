@@ -0,0 +1,114 @@
+"""Tests for batched device polling."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from wyzeapy.services.switch_service import SwitchService, SwitchUsageService
+from wyzeapy.types import PropertyIDs
+
+from custom_components.wyzeapi import batch as batch_module
+from custom_components.wyzeapi.batch import (
+    BatchedService,
+    async_batched_service,
+    async_fetch_property_lists,
+)
+
+
+def _auth_lib(*responses: dict) -> SimpleNamespace:
+    """Return an auth lib answering posts with the given responses."""
+    return SimpleNamespace(
+        refresh_if_should=AsyncMock(),
+        token=SimpleNamespace(access_token="token"),
+        post=AsyncMock(side_effect=responses),
+    )
+
+
+def _response(*devices: tuple[str, str]) -> dict:
+    """Return a batched property list response with power states."""
+    return {
+        "code": "1",
+        "data": {
+            "device_list": [
+                {
+                    "device_mac": mac,
+                    "device_property_list": [
+                        {"pid": PropertyIDs.ON.value, "value": on},
+                        {"pid": "P-unknown", "value": "x"},
+                    ],
+                }
+                for mac, on in devices
+            ]
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetch_chunks_devices_into_batched_requests(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Devices are requested in chunks and parsed per mac."""
+    monkeypatch.setattr(batch_module, "MAX_BATCH_SIZE", 2)
+    auth_lib = _auth_lib(_response(("A", "1"), ("B", "0")), _response(("C", "1")))
+    service = SimpleNamespace(_auth_lib=auth_lib)
+    devices = [SimpleNamespace(mac=mac) for mac in "ABC"]
+
+    property_lists = await async_fetch_property_lists(service, devices)
+
+    assert auth_lib.post.await_count == 2
+    assert auth_lib.post.await_args_list[0].kwargs["json"]["device_list"] == [
+        "A",
+        "B",
+    ]
+    assert property_lists == {
+        "A": [(PropertyIDs.ON, "1")],
+        "B": [(PropertyIDs.ON, "0")],
+        "C": [(PropertyIDs.ON, "1")],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batched_service_runs_wyzeapy_update_logic() -> None:
+    """Devices are parsed by the wrapped service from the batched response."""
+    service = SwitchService(_auth_lib())
+    service.get_updated_params = AsyncMock(return_value={"ip": "10.0.0.2"})
+    service._get_property_list = AsyncMock(return_value=[(PropertyIDs.ON, "0")])
+    batched = BatchedService(service, {"A": [(PropertyIDs.ON, "1")]})
+    cached = SimpleNamespace(mac="A", on=False, available=False)
+    missing = SimpleNamespace(mac="B", on=True, available=False)
+
+    await batched.update(cached)
+    await batched.update(missing)
+
+    assert cached.on is True
+    assert cached.device_params == {"ip": "10.0.0.2"}
+    assert missing.on is False
+    service._get_property_list.assert_awaited_once_with(missing)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_single_requests() -> None:
+    """A failing batched request leaves every device on its own request."""
+    service = SwitchService(_auth_lib(RuntimeError("offline")))
+
+    batched = await async_batched_service(service, [SimpleNamespace(mac="A")])
+
+    assert isinstance(batched, BatchedService)
+    assert batched._property_lists == {}
+
+
+@pytest.mark.asyncio
+async def test_unbatched_services_are_returned_as_is() -> None:
+    """Services without property-list updates are not wrapped."""
+    service = Mock()
+
+    assert await async_batched_service(service, []) is service
+
+
+@pytest.mark.asyncio
+async def test_switch_usage_service_is_not_batched() -> None:
+    """Subclasses of batched services keep their own update logic."""
+    service = SwitchUsageService(_auth_lib())
+
+    assert await async_batched_service(service, [SimpleNamespace(mac="A")]) is service
+    service._auth_lib.post.assert_not_awaited()
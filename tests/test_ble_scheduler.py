@@ -0,0 +1,89 @@
+"""Tests for the shared Bluetooth connection scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.wyzeapi import ble_scheduler as ble_scheduler_module
+from custom_components.wyzeapi.ble_scheduler import BlePriority, WyzeBleScheduler
+
+
+def _scanner_device(source: str, rssi: int) -> SimpleNamespace:
+    """Return a lock as heard by one scanner."""
+    return SimpleNamespace(
+        scanner=SimpleNamespace(source=source),
+        ble_device=SimpleNamespace(address="AA:BB"),
+        advertisement=SimpleNamespace(rssi=rssi),
+    )
+
+
+def test_best_device_is_the_loudest_scanner(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The scanner hearing the lock with the best RSSI is used."""
+    heard = [_scanner_device("hci0", -90), _scanner_device("proxy", -55)]
+    monkeypatch.setattr(
+        ble_scheduler_module.bluetooth,
+        "async_scanner_devices_by_address",
+        Mock(return_value=heard),
+    )
+    scheduler = WyzeBleScheduler(Mock())
+
+    assert scheduler.async_best_device("AA:BB").scanner.source == "proxy"
+
+    ble_scheduler_module.bluetooth.async_scanner_devices_by_address.return_value = []
+    assert scheduler.async_best_device("AA:BB") is None
+
+
+@pytest.mark.asyncio
+async def test_slots_are_capped_and_commands_go_first(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Waiting commands overtake waiting polls once a slot frees up."""
+    monkeypatch.setattr(ble_scheduler_module, "POLL_SPACING", 0)
+    scheduler = WyzeBleScheduler(Mock())
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def operation(name: str, priority: BlePriority) -> None:
+        async with scheduler.async_slot("hci0", priority):
+            order.append(name)
+            await release.wait()
+
+    busy = [
+        asyncio.create_task(operation(f"busy{i}", BlePriority.POLL))
+        for i in range(ble_scheduler_module.MAX_CONNECTIONS_PER_SCANNER)
+    ]
+    await asyncio.sleep(0)
+    poll = asyncio.create_task(operation("poll", BlePriority.POLL))
+    command = asyncio.create_task(operation("command", BlePriority.COMMAND))
+    await asyncio.sleep(0)
+
+    assert scheduler.diagnostics() == {"hci0": {"in_use": 2, "queue_depth": 2}}
+    release.set()
+    await asyncio.gather(*busy, poll, command)
+
+    assert order[-2:] == ["command", "poll"]
+    assert scheduler.diagnostics() == {"hci0": {"in_use": 0, "queue_depth": 0}}
+
+
+@pytest.mark.asyncio
+async def test_polls_through_one_scanner_are_spaced(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Polls due together start POLL_SPACING apart, other scanners are free."""
+    monkeypatch.setattr(ble_scheduler_module, "POLL_SPACING", 0.05)
+    scheduler = WyzeBleScheduler(Mock())
+    started: dict[str, float] = {}
+    loop = asyncio.get_running_loop()
+
+    async def poll(name: str, source: str) -> None:
+        async with scheduler.async_slot(source, BlePriority.POLL):
+            started[name] = loop.time()
+
+    await asyncio.gather(
+        poll("first", "hci0"), poll("second", "hci0"), poll("other", "proxy")
+    )
+
+    assert started["second"] - started["first"] >= 0.04
+    assert started["other"] - started["first"] < 0.04
@@ -0,0 +1,176 @@
+"""Tests for the on-disk Wyze device cache."""
+
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+import custom_components.wyzeapi as integration
+from custom_components.wyzeapi import cache as cache_module
+from custom_components.wyzeapi.cache import WyzeInventoryCache
+from custom_components.wyzeapi.inventory import WyzeDeviceInventory
+
+
+class _MemoryStore:
+    """Stand-in for Home Assistant's Store keeping data in memory."""
+
+    def __init__(self, hass: Any, version: int, key: str) -> None:
+        self.key = key
+        self.data: dict[str, Any] | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        return self.data
+
+    async def async_save(self, data: dict[str, Any]) -> None:
+        self.data = data
+
+    async def async_remove(self) -> None:
+        self.data = None
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> WyzeInventoryCache:
+    """Return a cache backed by memory."""
+    monkeypatch.setattr(cache_module, "Store", _MemoryStore)
+    return WyzeInventoryCache(Mock(), SimpleNamespace(entry_id="entry"))
+
+
+def _inventory(*macs: str) -> WyzeDeviceInventory:
+    """Return an inventory of bulbs with the given macs."""
+    return WyzeDeviceInventory(
+        bulbs=[SimpleNamespace(mac=mac, device_params={}) for mac in macs],
+        unique_device_ids=set(macs),
+        object_list=[{"mac": mac, "device_params": {"ip": mac}} for mac in macs],
+    )
+
+
+@pytest.mark.asyncio
+async def test_load_rebuilds_inventory_from_stored_list(
+    monkeypatch: pytest.MonkeyPatch, cache: WyzeInventoryCache
+) -> None:
+    """A stored device list is handed to the inventory without the cloud."""
+    fetch = AsyncMock(return_value=_inventory("A"))
+    monkeypatch.setattr(WyzeDeviceInventory, "async_fetch", fetch)
+    client = Mock()
+
+    assert await cache.async_load(client) is None
+    await cache.async_save(_inventory("A"))
+    assert await cache.async_load(client) is fetch.return_value
+
+    fetch.assert_awaited_once_with(client, [{"mac": "A", "device_params": {"ip": "A"}}])
+
+
+@pytest.mark.asyncio
+async def test_reconcile_refreshes_unchanged_devices(
+    monkeypatch: pytest.MonkeyPatch, cache: WyzeInventoryCache
+) -> None:
+    """The same devices are refreshed in place and stored again."""
+    inventory = _inventory("A", "B")
+    fresh = _inventory("A", "B")
+    monkeypatch.setattr(
+        WyzeDeviceInventory, "async_fetch", AsyncMock(return_value=fresh)
+    )
+
+    assert await cache.async_reconcile(Mock(), inventory) is True
+
+    assert inventory.bulbs[0].device_params == {"ip": "A"}
+    assert cache._store.data["object_list"] == fresh.object_list
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_changed_devices(
+    monkeypatch: pytest.MonkeyPatch, cache: WyzeInventoryCache
+) -> None:
+    """Added or removed devices require the entities to be rebuilt."""
+    fresh = _inventory("A", "C")
+    monkeypatch.setattr(
+        WyzeDeviceInventory, "async_fetch", AsyncMock(return_value=fresh)
+    )
+
+    assert await cache.async_reconcile(Mock(), _inventory("A", "B")) is False
+    assert cache._store.data["object_list"] == fresh.object_list
+
+
+class _FakeCoordinator:
+    """Lock Bolt coordinator resolving its lock info from a counted cloud call."""
+
+    def __init__(self, hass: Any, lock_service: Any, lock: Any, **kwargs: Any) -> None:
+        self.lock_service = lock_service
+        self.lock_info: dict[str, Any] | None = None
+
+    async def update_lock_info(self) -> None:
+        self.lock_info = await self.lock_service.update()
+
+    def restore_lock_info(self, lock_info: dict[str, Any]) -> None:
+        self.lock_info = lock_info
+
+
+@pytest.mark.asyncio
+async def test_lock_bolts_are_resolved_once_and_restored(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Lock Bolts hit the cloud concurrently on the first start only."""
+    monkeypatch.setattr(cache_module, "Store", _MemoryStore)
+    monkeypatch.setattr(integration, "WyzeLockBoltCoordinator", _FakeCoordinator)
+    monkeypatch.setattr(
+        integration.bluetooth, "async_scanner_count", Mock(return_value=1)
+    )
+    stores: dict[str, _MemoryStore] = {}
+    monkeypatch.setattr(
+        integration,
+        "WyzeLockBoltCache",
+        lambda hass, entry: stores.setdefault(
+            "lock_bolts", cache_module.WyzeLockBoltCache(hass, entry)
+        ),
+    )
+    lock_service = SimpleNamespace(update=AsyncMock(return_value={"ble_id": 7}))
+    client = SimpleNamespace(lock_service=AsyncMock(return_value=lock_service)())
+    entry = Mock(entry_id="entry", options={})
+    inventory = SimpleNamespace(
+        locks=[
+            SimpleNamespace(mac=mac, product_model=model)
+            for mac, model in (("A", "YD_BT1"), ("B", "YD_BT1"), ("C", "YD.LO1"))
+        ]
+    )
+    hass = SimpleNamespace(data={integration.DOMAIN: {"entry": {}}})
+
+    await integration.setup_coordinators(hass, entry, client, inventory)
+    assert lock_service.update.await_count == 2
+    entry.async_create_background_task.assert_not_called()
+
+    hass.data[integration.DOMAIN]["entry"] = {}
+    client = SimpleNamespace(lock_service=AsyncMock(return_value=lock_service)())
+    await integration.setup_coordinators(hass, entry, client, inventory)
+
+    assert lock_service.update.await_count == 2
+    coordinators = hass.data[integration.DOMAIN]["entry"]["coordinators"]
+    assert {mac: c.lock_info for mac, c in coordinators.items()} == {
+        "A": {"ble_id": 7},
+        "B": {"ble_id": 7},
+    }
+    entry.async_create_background_task.assert_called_once()
+    entry.async_create_background_task.call_args.args[1].close()
+
+
+@pytest.mark.asyncio
+async def test_only_restored_lock_bolts_are_refreshed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Locks resolved during setup are not asked for again in the background."""
+    monkeypatch.setattr(cache_module, "Store", _MemoryStore)
+    lock_bolt_cache = cache_module.WyzeLockBoltCache(Mock(), Mock(entry_id="entry"))
+    restored = _FakeCoordinator(None, SimpleNamespace(update=AsyncMock()), None)
+    resolved = _FakeCoordinator(None, SimpleNamespace(update=AsyncMock()), None)
+    restored.lock_service.update.return_value = {"ble_id": 1}
+    resolved.lock_info = {"ble_id": 2}
+
+    await integration.async_refresh_lock_bolts(
+        {"A": restored}, {"A": restored, "B": resolved}, lock_bolt_cache
+    )
+
+    resolved.lock_service.update.assert_not_awaited()
+    assert await lock_bolt_cache.async_load() == {
+        "A": {"ble_id": 1},
+        "B": {"ble_id": 2},
+    }
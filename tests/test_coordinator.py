@@ -0,0 +1,466 @@
+"""Tests for the Lock Bolt BLE coordinator."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from bleak.exc import BleakError
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import frame
+import pytest
+
+from custom_components.wyzeapi import (
+    ble_scheduler as ble_scheduler_module,
+    coordinator as coordinator_module,
+)
+from custom_components.wyzeapi.const import (
+    YDBLE_LOCK_STATE_UUID,
+    YDBLE_UART_RX_UUID,
+)
+from custom_components.wyzeapi.ble_scheduler import BlePriority
+from custom_components.wyzeapi.coordinator import WyzeLockBoltCoordinator
+from custom_components.wyzeapi.ydble_utils import (
+    encrypt_ecb,
+    pack_l1,
+    pack_l2_dict,
+    parse_l1,
+)
+
+UUID = "0123456789abcdef0123456789abcdef"
+LOCKED = encrypt_ecb(UUID[-16:], bytes([1, 0, 0, 0, 0]) + bytes(11))
+
+
+class _FakeLockBolt:
+    """Answers the UART protocol like a Lock Bolt, one client per connection."""
+
+    def __init__(self) -> None:
+        self.coordinator: WyzeLockBoltCoordinator | None = None
+        self.clients: list[Mock] = []
+        self.ignored_requests = 0
+
+    async def establish_connection(self, *args: object, **kwargs: object) -> Mock:
+        client = Mock(is_connected=True)
+        client.read_gatt_char = AsyncMock(return_value=LOCKED)
+        client.start_notify = AsyncMock()
+        client.write_gatt_char = AsyncMock(side_effect=self._write)
+
+        async def disconnect() -> None:
+            client.is_connected = False
+
+        client.disconnect = AsyncMock(side_effect=disconnect)
+        self.clients.append(client)
+        return client
+
+    async def _write(self, uuid: str, data: bytes, response: bool) -> None:
+        _, flags, seq_no, _ = parse_l1(data)
+        if flags == 0x08:
+            return
+        if seq_no == 1:
+            if self.ignored_requests:
+                self.ignored_requests -= 1
+                return
+            challenge = pack_l2_dict(0x86, 0, {0xD2: bytes(range(16))})
+            self._notify(pack_l1(0x48, 1, b"") + pack_l1(0x40, 3, challenge))
+        elif seq_no == 2:
+            result = pack_l2_dict(0x04, 0, {0x01: b"\x00"})
+            self._notify(pack_l1(0x48, 2, b""), pack_l1(0x40, 4, result))
+            asyncio.get_running_loop().call_soon(
+                asyncio.ensure_future, self.coordinator._handle_state(None, LOCKED)
+            )
+
+    def _notify(self, *notifications: bytes) -> None:
+        for data in notifications:
+            asyncio.get_running_loop().call_soon(
+                asyncio.ensure_future, self.coordinator._handle_uart_rx(None, data)
+            )
+
+
+@pytest.fixture
+def lock_bolt(monkeypatch: pytest.MonkeyPatch) -> _FakeLockBolt:
+    """Route BLE connections to a fake Lock Bolt."""
+    lock_bolt = _FakeLockBolt()
+    monkeypatch.setattr(
+        coordinator_module, "establish_connection", lock_bolt.establish_connection
+    )
+    monkeypatch.setattr(
+        ble_scheduler_module.bluetooth,
+        "async_scanner_devices_by_address",
+        Mock(
+            return_value=[
+                SimpleNamespace(
+                    scanner=SimpleNamespace(source="hci0"),
+                    ble_device=SimpleNamespace(address="AA:BB"),
+                    advertisement=SimpleNamespace(rssi=-60),
+                )
+            ]
+        ),
+    )
+    monkeypatch.setattr(coordinator_module, "async_call_later", Mock())
+    monkeypatch.setattr(ble_scheduler_module, "POLL_SPACING", 0)
+    # The coordinator is created outside of a running Home Assistant
+    monkeypatch.setattr(frame, "report_usage", Mock())
+    return lock_bolt
+
+
+def _coordinator(
+    lock_bolt: _FakeLockBolt, persistent_connection: bool
+) -> WyzeLockBoltCoordinator:
+    """Return a coordinator for a Lock Bolt whose BLE address is known."""
+    lock = SimpleNamespace(mac=UUID, nickname="Front door", ble_id=7, ble_token=UUID)
+    coordinator = WyzeLockBoltCoordinator(
+        Mock(), Mock(), lock, persistent_connection=persistent_connection
+    )
+    coordinator._mac = "AA:BB"
+    coordinator.async_update_listeners = Mock()
+    lock_bolt.coordinator = coordinator
+    return coordinator
+
+
+def _written_seq_nos(client: Mock) -> list[int]:
+    """Return the sequence numbers of the frames written to the lock."""
+    return [
+        parse_l1(call.args[1])[2] for call in client.write_gatt_char.await_args_list
+    ]
+
+
+@pytest.mark.asyncio
+async def test_polls_disconnect_by_default(lock_bolt: _FakeLockBolt) -> None:
+    """Without a persistent connection every poll connects anew."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+
+    assert (await coordinator._async_update_data())["state"] == 1
+    await coordinator._async_update_data()
+
+    assert len(lock_bolt.clients) == 2
+    assert all(client.disconnect.await_count == 1 for client in lock_bolt.clients)
+    lock_bolt.clients[0].start_notify.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_persistent_connection_is_kept_and_subscribed(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A persistent connection is reused and pushes state notifications."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=True)
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+
+    (client,) = lock_bolt.clients
+    client.disconnect.assert_not_awaited()
+    assert {call.args[0] for call in client.start_notify.await_args_list} == {
+        YDBLE_UART_RX_UUID,
+        YDBLE_LOCK_STATE_UUID,
+    }
+    coordinator_module.async_call_later.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_persistent_connection_is_replaced(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A read failing on a kept connection reconnects and reads again."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=True)
+    await coordinator._async_update_data()
+    lock_bolt.clients[0].read_gatt_char.side_effect = BleakError("Not connected")
+
+    assert (await coordinator._async_update_data())["state"] == 1
+
+    assert len(lock_bolt.clients) == 2
+    lock_bolt.clients[0].disconnect.assert_awaited_once()
+    lock_bolt.clients[1].start_notify.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_command_runs_the_full_exchange(lock_bolt: _FakeLockBolt) -> None:
+    """A command requests a challenge, answers it and waits for the result."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+
+    await coordinator.lock_unlock("unlock")
+
+    (client,) = lock_bolt.clients
+    # Challenge request, challenge ack, command, result ack
+    assert _written_seq_nos(client) == [1, 3, 2, 4]
+    assert list(coordinator.stage_timings["command"]) == [
+        "connect",
+        "challenge_ack",
+        "challenge",
+        "command_ack",
+        "result",
+        "state",
+    ]
+    client.disconnect.assert_awaited_once()
+    assert coordinator._current_command is None
+
+
+@pytest.mark.asyncio
+async def test_prefetched_challenge_leaves_only_the_command(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A command after a prefetch writes the command straight away."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+
+    await coordinator.async_prefetch_challenge()
+    (client,) = lock_bolt.clients
+    client.disconnect.assert_not_awaited()
+    client.write_gatt_char.reset_mock()
+    await coordinator.lock_unlock("unlock")
+
+    assert _written_seq_nos(client) == [2, 4]
+    assert list(coordinator.stage_timings["prefetch"]) == [
+        "connect",
+        "challenge_ack",
+        "challenge",
+    ]
+    assert list(coordinator.stage_timings["command"]) == [
+        "connect",
+        "command_ack",
+        "result",
+        "state",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prefetched_challenge_is_not_used_on_a_new_connection(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A challenge from a dropped connection is replaced by a fresh one."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    await coordinator.async_prefetch_challenge()
+    lock_bolt.clients[0].is_connected = False
+
+    await coordinator.lock_unlock("lock")
+
+    assert _written_seq_nos(lock_bolt.clients[1]) == [1, 3, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_commands_share_one_exchange(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """Back to back identical commands are merged, different ones queue up."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=True)
+
+    await asyncio.gather(
+        coordinator.lock_unlock("lock"),
+        coordinator.lock_unlock("lock"),
+        coordinator.lock_unlock("unlock"),
+    )
+
+    (client,) = lock_bolt.clients
+    commands = [seq_no for seq_no in _written_seq_nos(client) if seq_no == 2]
+    assert len(commands) == 2
+    assert coordinator._current_command is None
+
+
+@pytest.mark.asyncio
+async def test_stage_timeout_retries_on_a_fresh_connection(
+    monkeypatch: pytest.MonkeyPatch, lock_bolt: _FakeLockBolt
+) -> None:
+    """An exchange the lock stops answering is retried after a backoff."""
+    monkeypatch.setattr(coordinator_module, "RETRY_BACKOFF", 0)
+    monkeypatch.setitem(
+        coordinator_module.STAGE_TIMEOUTS,
+        coordinator_module.LockBoltStage.CHALLENGE_ACK,
+        0.01,
+    )
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    lock_bolt.ignored_requests = 1
+
+    await coordinator.lock_unlock("lock")
+
+    assert len(lock_bolt.clients) == 2
+    assert _written_seq_nos(lock_bolt.clients[1]) == [1, 3, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_command_fails_after_the_last_attempt(
+    monkeypatch: pytest.MonkeyPatch, lock_bolt: _FakeLockBolt
+) -> None:
+    """A lock that never answers fails the command with a Home Assistant error."""
+    monkeypatch.setattr(coordinator_module, "RETRY_BACKOFF", 0)
+    monkeypatch.setitem(
+        coordinator_module.STAGE_TIMEOUTS,
+        coordinator_module.LockBoltStage.CHALLENGE_ACK,
+        0.01,
+    )
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    lock_bolt.ignored_requests = coordinator_module.COMMAND_ATTEMPTS
+
+    with pytest.raises(HomeAssistantError, match="sent no challenge_ack"):
+        await coordinator.lock_unlock("lock")
+
+    assert len(lock_bolt.clients) == coordinator_module.COMMAND_ATTEMPTS
+    assert not coordinator._commands
+
+
+@pytest.mark.asyncio
+async def test_advertisement_changes_trigger_a_read(
+    monkeypatch: pytest.MonkeyPatch, lock_bolt: _FakeLockBolt
+) -> None:
+    """Only an advertisement that differs from the last one reads the lock."""
+    register_callback = Mock()
+    monkeypatch.setattr(
+        coordinator_module.bluetooth, "async_register_callback", register_callback
+    )
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    coordinator.async_request_refresh = Mock()
+
+    coordinator.async_watch_advertisements()
+    callback, matcher, mode = register_callback.call_args.args[1:]
+    assert matcher["address"] == "AA:BB"
+    assert mode is coordinator_module.bluetooth.BluetoothScanningMode.PASSIVE
+
+    def advertise(counter: int) -> None:
+        callback(
+            SimpleNamespace(
+                manufacturer_data={0x0870: bytes([counter])}, service_data={}
+            ),
+            coordinator_module.bluetooth.BluetoothChange.ADVERTISEMENT,
+        )
+
+    advertise(1)
+    advertise(1)
+    coordinator.async_request_refresh.assert_not_called()
+    advertise(2)
+    coordinator.async_request_refresh.assert_called_once()
+    coordinator.hass.async_create_task.assert_called_once()
+
+    # Changes right after a read are read once the interval has passed
+    advertise(3)
+    advertise(4)
+    coordinator.async_request_refresh.assert_called_once()
+    (call,) = coordinator_module.async_call_later.call_args_list
+    assert 0 < call.args[1] <= coordinator_module.ADVERTISEMENT_READ_INTERVAL
+    coordinator._advertisement_read_at -= coordinator_module.ADVERTISEMENT_READ_INTERVAL
+    call.args[2](None)
+    assert coordinator.async_request_refresh.call_count == 2
+
+
+def test_churning_advertisements_are_logged_once(
+    caplog: pytest.LogCaptureFixture, lock_bolt: _FakeLockBolt
+) -> None:
+    """A lock whose advertisement changes all the time is pointed out."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    coordinator.async_request_refresh = Mock()
+
+    for counter in range(3 * coordinator_module.ADVERTISEMENT_CHURN_SAMPLE):
+        coordinator._handle_advertisement(
+            SimpleNamespace(
+                manufacturer_data={0x0870: bytes([counter])}, service_data={}
+            ),
+            coordinator_module.bluetooth.BluetoothChange.ADVERTISEMENT,
+        )
+
+    assert "Front door changes on" in caplog.text
+    assert caplog.text.count("changes on") == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_waiting_for_a_slot_yields_to_a_command(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A command queued behind a poll still waiting for its slot runs first."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    scheduler = coordinator._ble_scheduler
+    release = asyncio.Event()
+    occupied = asyncio.Semaphore(0)
+
+    async def occupy() -> None:
+        async with scheduler.async_slot("hci0", BlePriority.POLL):
+            occupied.release()
+            await release.wait()
+
+    busy = [
+        asyncio.create_task(occupy())
+        for _ in range(ble_scheduler_module.MAX_CONNECTIONS_PER_SCANNER)
+    ]
+    for _ in busy:
+        await occupied.acquire()
+    poll = asyncio.create_task(coordinator._async_update_data())
+    await asyncio.sleep(0)
+    command = asyncio.create_task(coordinator.lock_unlock("lock"))
+    await asyncio.sleep(0)
+    assert not coordinator._connection_lock.locked()
+
+    release.set()
+    await command
+    await poll
+    await asyncio.gather(*busy)
+
+    # The command connected first, the poll read afterwards on its own
+    assert _written_seq_nos(lock_bolt.clients[0]) == [1, 3, 2, 4]
+    assert len(lock_bolt.clients) == 2
+
+
+@pytest.mark.asyncio
+async def test_kept_connection_holds_its_slot(lock_bolt: _FakeLockBolt) -> None:
+    """A persistent connection holds a slot until it is closed."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=True)
+    scheduler = coordinator._ble_scheduler
+
+    await coordinator._async_update_data()
+    await coordinator.lock_unlock("lock")
+    assert scheduler.diagnostics()["hci0"]["in_use"] == 1
+
+    await coordinator.async_shutdown()
+    assert scheduler.diagnostics()["hci0"]["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_connection_is_not_kept_when_the_scanner_is_at_its_cap(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """A persistent lock connects per poll while other locks use the scanner."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=True)
+    scheduler = coordinator._ble_scheduler
+    release = asyncio.Event()
+    occupied = asyncio.Event()
+
+    async def occupy() -> None:
+        async with scheduler.async_slot("hci0", BlePriority.POLL):
+            occupied.set()
+            await release.wait()
+
+    busy = asyncio.create_task(occupy())
+    await occupied.wait()
+    await coordinator._async_update_data()
+    release.set()
+    await busy
+
+    lock_bolt.clients[0].disconnect.assert_awaited_once()
+    assert scheduler.diagnostics()["hci0"]["in_use"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_commands_fail_when_the_worker_stops(
+    lock_bolt: _FakeLockBolt,
+) -> None:
+    """Shutting down while commands wait for a slot fails them instead of hanging."""
+    coordinator = _coordinator(lock_bolt, persistent_connection=False)
+    scheduler = coordinator._ble_scheduler
+    release = asyncio.Event()
+    occupied = asyncio.Semaphore(0)
+
+    async def occupy() -> None:
+        async with scheduler.async_slot("hci0", BlePriority.POLL):
+            occupied.release()
+            await release.wait()
+
+    busy = [
+        asyncio.create_task(occupy())
+        for _ in range(ble_scheduler_module.MAX_CONNECTIONS_PER_SCANNER)
+    ]
+    for _ in busy:
+        await occupied.acquire()
+    command = asyncio.create_task(coordinator.lock_unlock("lock"))
+    while not scheduler.diagnostics()["hci0"]["queue_depth"]:
+        await asyncio.sleep(0)
+
+    await coordinator.async_shutdown()
+
+    with pytest.raises(HomeAssistantError, match="aborted"):
+        await command
+    assert not coordinator._commands
+    release.set()
+    await asyncio.gather(*busy)
@@ -0,0 +1,51 @@
+"""Tests for the device to entity index."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from custom_components.wyzeapi.device_index import WyzeDeviceIndex
+
+
+def test_update_is_applied_before_states_are_written() -> None:
+    """Every entity of the device holds the update before any state is written."""
+    index = WyzeDeviceIndex()
+    calls: list[tuple[str, object]] = []
+    source = SimpleNamespace(
+        async_write_ha_state=lambda: calls.append(("write", "source"))
+    )
+    siblings = [
+        Mock(async_write_ha_state=lambda name=name: calls.append(("write", name)))
+        for name in ("siren", "sensor")
+    ]
+    for name, sibling in zip(("siren", "sensor"), siblings):
+        index.async_register(
+            "AA", sibling, lambda device, name=name: calls.append((name, device))
+        )
+    other = Mock()
+    index.async_register("BB", other, Mock())
+    device = SimpleNamespace(mac="AA")
+
+    index.async_device_updated(source, device)
+
+    assert calls == [
+        ("siren", device),
+        ("sensor", device),
+        ("write", "source"),
+        ("write", "siren"),
+        ("write", "sensor"),
+    ]
+    other.async_write_ha_state.assert_not_called()
+
+
+def test_unregister_drops_the_entity() -> None:
+    """Removed entities no longer receive updates of their device."""
+    index = WyzeDeviceIndex()
+    entity, update_callback = Mock(), Mock()
+    unregister = index.async_register("AA", entity, update_callback)
+
+    unregister()
+    index.async_device_updated(Mock(), SimpleNamespace(mac="AA"))
+
+    update_callback.assert_not_called()
+    entity.async_write_ha_state.assert_not_called()
+    assert not index._entities
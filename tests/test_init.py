@@ -0,0 +1,32 @@
+"""Tests for the integration setup."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+import custom_components.wyzeapi as integration
+from custom_components.wyzeapi.const import DOMAIN, WYZE_NOTIFICATION_TOGGLE
+
+
+def test_own_devices_survive_stale_device_removal(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Only devices gone from the cloud are removed, not the integration's own."""
+    devices = {
+        mac: SimpleNamespace(id=mac, identifiers={(DOMAIN, mac)})
+        for mac in ("PLUG", "GONE", WYZE_NOTIFICATION_TOGGLE, "entry-api")
+    }
+    registry = Mock()
+    monkeypatch.setattr(integration.dr, "async_get", lambda hass: registry)
+    monkeypatch.setattr(
+        integration.dr,
+        "async_entries_for_config_entry",
+        lambda registry, entry_id: list(devices.values()),
+    )
+
+    integration.async_remove_stale_devices(
+        Mock(), SimpleNamespace(entry_id="entry"), {"PLUG"}
+    )
+
+    registry.async_remove_device.assert_called_once_with("GONE")
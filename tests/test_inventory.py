@@ -0,0 +1,190 @@
+"""Tests for the shared Wyze device inventory."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from wyzeapy.services.base_service import BaseService
+from wyzeapy.services.camera_service import CameraService
+from wyzeapy.services.irrigation_service import Irrigation, Zone
+
+from custom_components.wyzeapi import inventory as inventory_module
+from custom_components.wyzeapi.inventory import WyzeDeviceInventory
+
+
+def _awaitable(service: object) -> asyncio.Future:
+    """Return an awaitable resolving to a service, like the client properties."""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(service)
+    return future
+
+
+def _service(**getters: list) -> asyncio.Future:
+    """Return an awaitable service exposing the given device getters."""
+    return _awaitable(
+        SimpleNamespace(
+            **{name: AsyncMock(return_value=value) for name, value in getters.items()}
+        )
+    )
+
+
+def _device(mac: str) -> SimpleNamespace:
+    """Return a device as listed by get_object_list."""
+    return SimpleNamespace(mac=mac, raw_dict={"mac": mac})
+
+
+@pytest.mark.asyncio
+async def test_fetch_builds_snapshot_from_one_object_list() -> None:
+    """The inventory asks for the account device list once."""
+    camera = _device("CAM")
+    bulb = _device("BULB")
+    lock = _device("LOCK")
+    object_list = [camera, bulb, lock, _device("GATEWAY")]
+    camera_service = _service(get_object_list=object_list, get_cameras=[camera])
+    client = SimpleNamespace(
+        camera_service=camera_service,
+        bulb_service=_service(get_bulbs=[bulb]),
+        switch_service=_service(get_switches=[]),
+        wall_switch_service=_service(get_switches=[]),
+        lock_service=_service(get_locks=[lock]),
+        sensor_service=_service(get_sensors=[]),
+        thermostat_service=_service(get_thermostats=[]),
+        irrigation_service=_service(get_irrigations=[]),
+        air_purifier_service=_service(get_air_purifiers=[]),
+    )
+
+    inventory = await WyzeDeviceInventory.async_fetch(client)
+
+    camera_service.result().get_object_list.assert_awaited_once_with()
+    assert inventory.cameras == [camera]
+    assert inventory.bulbs == [bulb]
+    assert inventory.locks == [lock]
+    assert inventory.unique_device_ids == {"CAM", "BULB", "LOCK", "GATEWAY"}
+    assert inventory.object_list == [device.raw_dict for device in object_list]
+
+
+@pytest.mark.asyncio
+async def test_fetch_from_cached_object_list_skips_the_cloud(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A stored device list seeds wyzeapy's device cache for the getters."""
+    monkeypatch.setattr(BaseService, "_devices", None)
+    raw = {"mac": "CAM", "product_type": "Camera", "product_model": "WYZE_CAKP2JFUS"}
+    camera_service = CameraService(Mock())
+    camera_service.get_object_list = AsyncMock()
+    client = SimpleNamespace(
+        camera_service=_awaitable(camera_service),
+        **{
+            name: _service(**{getter: []})
+            for name, getter in (
+                ("bulb_service", "get_bulbs"),
+                ("switch_service", "get_switches"),
+                ("wall_switch_service", "get_switches"),
+                ("lock_service", "get_locks"),
+                ("sensor_service", "get_sensors"),
+                ("thermostat_service", "get_thermostats"),
+                ("irrigation_service", "get_irrigations"),
+                ("air_purifier_service", "get_air_purifiers"),
+            )
+        },
+    )
+
+    inventory = await WyzeDeviceInventory.async_fetch(client, [raw])
+
+    camera_service.get_object_list.assert_not_awaited()
+    assert [camera.mac for camera in inventory.cameras] == ["CAM"]
+    assert inventory.unique_device_ids == {"CAM"}
+    assert inventory.object_list == [raw]
+
+
+def test_refresh_from_copies_newer_device_params() -> None:
+    """Cached devices pick up the params of a fresh snapshot."""
+    bulb = SimpleNamespace(mac="BULB", device_params={"switch_state": 0})
+    inventory = WyzeDeviceInventory(bulbs=[bulb])
+    fresh = WyzeDeviceInventory(
+        object_list=[{"mac": "BULB", "device_params": {"switch_state": 1}}]
+    )
+
+    inventory.refresh_from(fresh)
+
+    assert bulb.device_params == {"switch_state": 1}
+    assert inventory.object_list == fresh.object_list
+
+
+@pytest.mark.asyncio
+async def test_hydrate_updates_each_device_once() -> None:
+    """Platforms sharing a device wait on the same hydration call."""
+    devices = [SimpleNamespace(mac="A"), SimpleNamespace(mac="B")]
+    service = SimpleNamespace(update=AsyncMock(side_effect=lambda device: device))
+    inventory = WyzeDeviceInventory(irrigations=devices)
+
+    first, second = await asyncio.gather(
+        inventory.async_hydrate(service, inventory.irrigations),
+        inventory.async_hydrate(service, inventory.irrigations),
+    )
+
+    assert first == devices
+    assert second == devices
+    assert service.update.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_hydrate_runs_concurrently_within_bound(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Hydration overlaps device updates but never exceeds the bound."""
+    monkeypatch.setattr(inventory_module, "MAX_CONCURRENT_HYDRATIONS", 2)
+    running = 0
+    peak = 0
+
+    async def update(device: SimpleNamespace) -> SimpleNamespace:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return device
+
+    devices = [SimpleNamespace(mac=str(index)) for index in range(5)]
+    inventory = WyzeDeviceInventory(cameras=devices)
+
+    result = await inventory.async_hydrate(SimpleNamespace(update=update), devices)
+
+    assert result == devices
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_restored_devices_are_hydrated_after_their_entities() -> None:
+    """A warm start builds entities from restored zones and hydrates later."""
+
+    async def update(device: Irrigation) -> Irrigation:
+        device.zones = [Zone({"zone_number": 1, "name": f"{device.mac} zone"})]
+        return device
+
+    camera = SimpleNamespace(mac="CAM", nickname="Porch")
+    restored, added = Irrigation({"mac": "A"}), Irrigation({"mac": "B"})
+    camera_service = SimpleNamespace(update=AsyncMock(side_effect=lambda d: d))
+    irrigation_service = SimpleNamespace(update=AsyncMock(side_effect=update))
+    inventory = WyzeDeviceInventory(cameras=[camera], irrigations=[restored, added])
+    assert inventory.update_before_add
+    inventory.restore({"A": [{"zone_number": 1, "name": "Lawn"}]})
+    assert not inventory.update_before_add
+
+    devices = await inventory.async_entity_devices(
+        irrigation_service, inventory.irrigations
+    )
+    assert devices == [restored, added]
+    irrigation_service.update.assert_awaited_once_with(added)
+    assert [zone.name for zone in restored.zones] == ["Lawn"]
+    assert await inventory.async_entity_devices(camera_service, [camera]) == [camera]
+    camera_service.update.assert_not_awaited()
+
+    client = SimpleNamespace(
+        camera_service=_awaitable(camera_service),
+        irrigation_service=_awaitable(irrigation_service),
+    )
+    assert await inventory.async_hydrate_deferred(client) == [camera, restored]
+    assert inventory.irrigation_zones["A"][0]["name"] == "A zone"
+    assert inventory.irrigation_zones["B"][0]["name"] == "B zone"
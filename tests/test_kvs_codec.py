@@ -0,0 +1,73 @@
+"""Tests for the KVS signaling codec."""
+
+import base64
+import json
+
+from webrtc_models import RTCIceCandidateInit
+
+from custom_components.wyzeapi.kvs_codec import (
+    decode_answer,
+    decode_candidate,
+    decode_message,
+    encode_candidate,
+    encode_offer,
+)
+from custom_components.wyzeapi.stream_info import KVS_RECIPIENT_CLIENT_ID
+
+CANDIDATE = (
+    "candidate:1 1 udp 2122260223 192.168.1.2 50000 typ host "
+    "generation 0 ufrag AbCd network-id 1"
+)
+
+
+def _payload(message: str) -> dict:
+    return json.loads(base64.b64decode(json.loads(message)["messagePayload"]))
+
+
+def test_offer_is_a_valid_signaling_message() -> None:
+    """The formatted envelope parses as the message KVS expects."""
+    message = json.loads(encode_offer("v=0\r\n", "1234"))
+
+    assert message["action"] == "SDP_OFFER"
+    assert message["recipientClientId"] == KVS_RECIPIENT_CLIENT_ID
+    assert message["correlationId"] == "1234"
+    assert _payload(json.dumps(message)) == {"type": "offer", "sdp": "v=0\r\n"}
+
+
+def test_candidate_takes_its_username_fragment_from_the_candidate() -> None:
+    """The ufrag in the candidate line wins over the one given."""
+    message = encode_candidate(
+        RTCIceCandidateInit(
+            candidate=CANDIDATE, sdp_mid="0", sdp_m_line_index=0, user_fragment="x"
+        )
+    )
+
+    assert json.loads(message)["action"] == "ICE_CANDIDATE"
+    assert _payload(message) == {
+        "candidate": CANDIDATE,
+        "sdpMid": "0",
+        "sdpMLineIndex": 0,
+        "usernameFragment": "AbCd",
+    }
+
+
+def test_received_messages_are_decoded() -> None:
+    """Candidates and answers, JSON or bare SDP, are read from their payloads."""
+    candidate = decode_message(
+        json.dumps(
+            {
+                "messageType": "ICE_CANDIDATE",
+                "messagePayload": base64.b64encode(
+                    json.dumps({"candidate": CANDIDATE, "sdpMid": "0"}).encode()
+                ).decode(),
+            }
+        )
+    )
+    assert decode_candidate(candidate) == RTCIceCandidateInit(
+        candidate=CANDIDATE, sdp_mid="0"
+    )
+
+    answer = {"type": "answer", "sdp": "v=0\r\n"}
+    for payload in (json.dumps(answer).encode(), b"v=0\r\n"):
+        message = {"messagePayload": base64.b64encode(payload).decode()}
+        assert decode_answer(message) == "v=0\r\n"
@@ -0,0 +1,179 @@
+"""Tests for Wyze light entities."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_COLOR_TEMP_KELVIN
+from homeassistant.exceptions import HomeAssistantError
+import pytest
+from wyzeapy.exceptions import UnknownApiError
+from wyzeapy.types import DeviceTypes, PropertyIDs
+from wyzeapy.utils import create_pid_pair
+
+from custom_components.wyzeapi import light as light_module
+from custom_components.wyzeapi.light import WyzeLight, WyzeLightCommandBatcher
+
+
+@pytest.fixture(autouse=True)
+def short_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep the coalescing and batching windows short in tests."""
+    monkeypatch.setattr(light_module, "COMMAND_COALESCE_WINDOW", 0.01)
+    monkeypatch.setattr(light_module, "COMMAND_BATCH_WINDOW", 0.001)
+
+
+def _bulb(device_type: DeviceTypes, mac: str = "AA:BB:CC:DD:EE:FF") -> SimpleNamespace:
+    """Return a representative bulb of a type."""
+    return SimpleNamespace(
+        mac=mac,
+        nickname="Desk Lamp",
+        product_model="WLPA19",
+        product_type=device_type.value,
+        type=device_type,
+        on=False,
+        brightness=10,
+        color_temp=2700,
+        sun_match=False,
+    )
+
+
+@pytest.fixture
+def bulb() -> SimpleNamespace:
+    """Return a representative mesh bulb."""
+    return _bulb(DeviceTypes.MESH_LIGHT)
+
+
+@pytest.fixture
+def service() -> SimpleNamespace:
+    """Return a mocked bulb service."""
+    return SimpleNamespace(turn_on=AsyncMock(), turn_off=AsyncMock())
+
+
+@pytest.fixture
+def entity(service: SimpleNamespace, bulb: SimpleNamespace) -> WyzeLight:
+    """Return a light entity."""
+    return _entity(service, bulb, WyzeLightCommandBatcher(service))
+
+
+def _entity(
+    service: SimpleNamespace,
+    bulb: SimpleNamespace,
+    batcher: WyzeLightCommandBatcher,
+) -> WyzeLight:
+    """Return a light entity that doesn't write state to Home Assistant."""
+    light = WyzeLight(service, bulb, SimpleNamespace(options={}), batcher)
+    light.async_write_ha_state = Mock()
+    light.async_schedule_update_ha_state = Mock()
+    return light
+
+
+@pytest.mark.asyncio
+async def test_rapid_turn_ons_are_sent_as_one_request(
+    entity: WyzeLight, service: SimpleNamespace, bulb: SimpleNamespace
+) -> None:
+    """Slider steps are merged, the latest value of each property wins."""
+    await asyncio.gather(
+        entity.async_turn_on(**{ATTR_BRIGHTNESS: 64}),
+        entity.async_turn_on(**{ATTR_COLOR_TEMP_KELVIN: 4000}),
+        entity.async_turn_on(**{ATTR_BRIGHTNESS: 255}),
+    )
+
+    service.turn_on.assert_awaited_once()
+    sent_bulb, _, options = service.turn_on.await_args.args
+    assert sent_bulb is bulb
+    assert options == [
+        create_pid_pair(PropertyIDs.BRIGHTNESS, "100"),
+        create_pid_pair(PropertyIDs.COLOR_TEMP, "4000"),
+        create_pid_pair(PropertyIDs.COLOR_MODE, "2"),
+    ]
+    assert bulb.on is True
+    assert bulb.brightness == 100
+
+
+@pytest.mark.asyncio
+async def test_optimistic_state_is_written_before_sending(
+    entity: WyzeLight, service: SimpleNamespace, bulb: SimpleNamespace
+) -> None:
+    """The UI sees the new state while the request is still waiting."""
+    task = asyncio.create_task(entity.async_turn_on(**{ATTR_BRIGHTNESS: 128}))
+    await asyncio.sleep(0)
+
+    entity.async_write_ha_state.assert_called_once_with()
+    assert bulb.on is True
+    service.turn_on.assert_not_awaited()
+    await task
+    service.turn_on.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_turn_off_overrides_pending_turn_on(
+    entity: WyzeLight, service: SimpleNamespace, bulb: SimpleNamespace
+) -> None:
+    """A turn on still waiting to be sent is dropped by a turn off."""
+    turn_on = asyncio.create_task(entity.async_turn_on(**{ATTR_BRIGHTNESS: 128}))
+    await asyncio.sleep(0)
+    await entity.async_turn_off()
+    await turn_on
+
+    service.turn_on.assert_not_awaited()
+    service.turn_off.assert_awaited_once_with(bulb, None)
+    assert bulb.on is False
+
+
+@pytest.mark.asyncio
+async def test_scene_sends_classic_bulbs_in_one_grouped_request(
+    monkeypatch: pytest.MonkeyPatch, service: SimpleNamespace
+) -> None:
+    """Classic bulbs switched together share one bulk request."""
+    set_property_lists = AsyncMock()
+    monkeypatch.setattr(light_module, "async_set_property_lists", set_property_lists)
+    batcher = WyzeLightCommandBatcher(service)
+    bulbs = [_bulb(DeviceTypes.LIGHT, mac=f"AA:{index}") for index in range(3)]
+    mesh = _bulb(DeviceTypes.MESH_LIGHT, mac="BB:0")
+    entities = [_entity(service, bulb, batcher) for bulb in [*bulbs, mesh]]
+
+    await asyncio.gather(
+        entities[0].async_turn_on(**{ATTR_BRIGHTNESS: 255}),
+        entities[1].async_turn_on(),
+        entities[2].async_turn_off(),
+        entities[3].async_turn_off(),
+    )
+
+    set_property_lists.assert_awaited_once()
+    commands = set_property_lists.await_args.args[1]
+    assert [(bulb.mac, plist) for bulb, plist in commands] == [
+        (
+            "AA:0",
+            [
+                create_pid_pair(PropertyIDs.ON, "1"),
+                create_pid_pair(PropertyIDs.BRIGHTNESS, "100"),
+            ],
+        ),
+        ("AA:1", [create_pid_pair(PropertyIDs.ON, "1")]),
+        ("AA:2", [create_pid_pair(PropertyIDs.ON, "0")]),
+    ]
+    service.turn_on.assert_not_awaited()
+    service.turn_off.assert_awaited_once_with(mesh, None)
+
+
+@pytest.mark.asyncio
+async def test_failed_grouped_request_fails_every_command(
+    monkeypatch: pytest.MonkeyPatch, service: SimpleNamespace
+) -> None:
+    """Each bulb in a failed grouped request reports the error."""
+    monkeypatch.setattr(
+        light_module,
+        "async_set_property_lists",
+        AsyncMock(side_effect=UnknownApiError("unexpected response")),
+    )
+    batcher = WyzeLightCommandBatcher(service)
+    entities = [
+        _entity(service, _bulb(DeviceTypes.LIGHT, mac=f"AA:{index}"), batcher)
+        for index in range(2)
+    ]
+
+    results = await asyncio.gather(
+        *(entity.async_turn_off() for entity in entities), return_exceptions=True
+    )
+
+    assert all(isinstance(result, HomeAssistantError) for result in results)
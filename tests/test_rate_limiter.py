@@ -0,0 +1,136 @@
+"""Tests for the shared Wyze API rate limiter."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.wyzeapi.rate_limiter import (
+    REQUEST_PRIORITY,
+    RequestPriority,
+    WyzeRateLimiter,
+    user_command,
+)
+
+
+async def _acquire_as(
+    limiter: WyzeRateLimiter, priority: RequestPriority, order: list[str], name: str
+) -> None:
+    """Acquire a token with a priority and record when it was granted."""
+    REQUEST_PRIORITY.set(priority)
+    await limiter.acquire()
+    order.append(name)
+
+
+@pytest.mark.asyncio
+async def test_attach_routes_client_requests_through_limiter() -> None:
+    """Every HTTP verb of the client's auth lib waits for a token."""
+    post = AsyncMock(return_value={"code": "1"})
+    auth_lib = SimpleNamespace(
+        get=AsyncMock(),
+        post=post,
+        put=AsyncMock(),
+        patch=AsyncMock(),
+        delete=AsyncMock(),
+    )
+    limiter = WyzeRateLimiter(hourly_budget=10)
+    limiter.attach(SimpleNamespace(_auth_lib=auth_lib))
+
+    assert await auth_lib.post("https://example", json={}) == {"code": "1"}
+
+    post.assert_awaited_once_with("https://example", json={})
+    assert limiter.remaining_budget == 9
+
+
+@pytest.mark.asyncio
+async def test_commands_and_setup_skip_queued_polls() -> None:
+    """Once the bucket is empty, polls queue while commands and setup go out."""
+    limiter = WyzeRateLimiter(rate=20, burst=1)
+    await limiter.acquire()
+    order: list[str] = []
+
+    polls = [
+        asyncio.create_task(
+            _acquire_as(limiter, RequestPriority.POLL, order, f"poll{index}")
+        )
+        for index in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    await _acquire_as(limiter, RequestPriority.COMMAND, order, "command")
+    await asyncio.gather(
+        *(
+            _acquire_as(limiter, RequestPriority.SETUP, order, f"setup{index}")
+            for index in range(25)
+        )
+    )
+    assert order == ["command", *(f"setup{index}" for index in range(25))]
+
+    async with asyncio.timeout(1):
+        await asyncio.gather(*polls)
+    assert order[-2:] == ["poll0", "poll1"]
+    assert limiter.queue_depth == 0
+    assert limiter.remaining_budget == 3000 - 29
+
+
+@pytest.mark.asyncio
+async def test_spent_budget_holds_polls_but_not_commands() -> None:
+    """Polls wait for the hourly budget, commands still go out."""
+    limiter = WyzeRateLimiter(rate=100, burst=10, hourly_budget=1)
+    await limiter.acquire()
+    assert limiter.remaining_budget == 0
+    order: list[str] = []
+
+    poll = asyncio.create_task(
+        _acquire_as(limiter, RequestPriority.POLL, order, "poll")
+    )
+    async with asyncio.timeout(1):
+        await _acquire_as(limiter, RequestPriority.COMMAND, order, "command")
+    await asyncio.sleep(0.05)
+
+    assert order == ["command"]
+    assert limiter.queue_depth == 1
+    poll.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await poll
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_only_user_commands_are_sent_as_commands() -> None:
+    """Requests are polls unless they come from a user command."""
+    seen: list[RequestPriority] = []
+
+    @user_command
+    async def turn_on() -> str:
+        seen.append(REQUEST_PRIORITY.get())
+        return "on"
+
+    async def background_update() -> None:
+        seen.append(REQUEST_PRIORITY.get())
+
+    assert await turn_on() == "on"
+    await background_update()
+
+    assert seen == [RequestPriority.COMMAND, RequestPriority.POLL]
+
+
+@pytest.mark.asyncio
+async def test_polls_are_not_held_back_while_setting_up() -> None:
+    """Entity updates before they are added go out right away."""
+    limiter = WyzeRateLimiter(rate=0.001, burst=1)
+    await limiter.acquire()
+
+    with limiter.setting_up():
+        async with asyncio.timeout(1):
+            for _ in range(5):
+                await limiter.acquire()
+    poll = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    assert limiter.queue_depth == 1
+    assert limiter.remaining_budget == 3000 - 6
+    poll.cancel()
+    await asyncio.gather(poll, return_exceptions=True)
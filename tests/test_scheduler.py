@@ -0,0 +1,228 @@
+"""Tests for the per config entry poll scheduler."""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+import contextlib
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from custom_components.wyzeapi import scheduler as scheduler_module
+from custom_components.wyzeapi.scheduler import WyzePollScheduler
+
+
+def _entry(**options: object) -> SimpleNamespace:
+    """Return a config entry with the given options."""
+    return SimpleNamespace(options=options)
+
+
+@pytest.fixture
+def dispatcher(monkeypatch: pytest.MonkeyPatch) -> dict[str, list[Callable]]:
+    """Replace the Home Assistant dispatcher with an in-memory one."""
+    targets: dict[str, list[Callable]] = defaultdict(list)
+
+    def connect(hass: object, signal: str, target: Callable) -> Callable[[], None]:
+        targets[signal].append(target)
+        return lambda: targets[signal].remove(target)
+
+    def send(hass: object, signal: str, *args: object) -> None:
+        for target in list(targets[signal]):
+            target(*args)
+
+    monkeypatch.setattr(scheduler_module, "async_dispatcher_connect", connect)
+    monkeypatch.setattr(scheduler_module, "async_dispatcher_send", send)
+    return targets
+
+
+@pytest.mark.asyncio
+async def test_entities_of_one_device_share_a_poll(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """Every subscriber of a device is fed from a single update call."""
+    device = SimpleNamespace(mac="AA")
+    service = SimpleNamespace(update=AsyncMock(return_value=device))
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    first, second = Mock(), Mock()
+
+    scheduler.async_register(service, device, 30, first)
+    scheduler.async_register(service, device, 10, second)
+    (job,) = scheduler._jobs.values()
+    await scheduler._async_poll(job, service)
+
+    service.update.assert_awaited_once_with(device)
+    first.assert_called_once_with(device)
+    second.assert_called_once_with(device)
+    assert job.base_interval == 10
+
+
+@pytest.mark.asyncio
+async def test_first_polls_are_spread_over_the_interval(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """Devices registered together are not all polled at the same moment."""
+    service = SimpleNamespace(update=AsyncMock())
+    scheduler = WyzePollScheduler(Mock(), _entry())
+
+    for index in range(10):
+        scheduler.async_register(service, SimpleNamespace(mac=str(index)), 30, Mock())
+
+    dues = sorted(job.due for job in scheduler._jobs.values())
+    gaps = [later - earlier for earlier, later in zip(dues, dues[1:])]
+    assert dues[-1] - dues[0] < 30
+    assert min(gaps) > 30 / 10 / 3
+
+
+@pytest.mark.asyncio
+async def test_unregister_stops_polling_the_device(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """The poll is dropped once its last subscriber goes away."""
+    device = SimpleNamespace(mac="AA")
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    service = SimpleNamespace(update=AsyncMock(return_value=device))
+
+    first = scheduler.async_register(service, device, 30, Mock())
+    second = scheduler.async_register(service, device, 30, Mock())
+    first()
+    assert scheduler._jobs
+    second()
+
+    assert not scheduler._jobs
+    assert not any(dispatcher.values())
+
+
+@pytest.mark.asyncio
+async def test_run_polls_repeatedly_and_survives_errors(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """A failing poll is logged and the device is polled again later."""
+    device = SimpleNamespace(mac="AA")
+    service = SimpleNamespace(
+        update=AsyncMock(side_effect=[RuntimeError("offline"), device, device])
+    )
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    update_callback = Mock()
+    scheduler.async_register(service, device, 0.01, update_callback)
+
+    task = asyncio.create_task(scheduler._async_run())
+    async with asyncio.timeout(1):
+        while update_callback.call_count < 2:
+            await asyncio.sleep(0.01)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    assert service.update.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_polling_groups_devices_of_one_service(
+    monkeypatch: pytest.MonkeyPatch,
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """Devices of one service due in the same cycle are polled together."""
+    devices = [SimpleNamespace(mac=str(index)) for index in range(3)]
+    service = SimpleNamespace(update=AsyncMock())
+    batched = SimpleNamespace(update=AsyncMock(side_effect=lambda device: device))
+    batched_service = AsyncMock(return_value=batched)
+    monkeypatch.setattr(scheduler_module, "async_batched_service", batched_service)
+    scheduler = WyzePollScheduler(Mock(), _entry(batch_polling=True))
+    update_callback = Mock()
+    for device in devices:
+        scheduler.async_register(service, device, 30, update_callback)
+    lead = min(scheduler._jobs.values(), key=lambda job: job.due)
+    lead.due = 0
+
+    task = asyncio.create_task(scheduler._async_run())
+    async with asyncio.timeout(1):
+        while update_callback.call_count < 3:
+            await asyncio.sleep(0)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    batched_service.assert_awaited_once()
+    assert sorted(device.mac for device in batched_service.await_args.args[1]) == [
+        "0",
+        "1",
+        "2",
+    ]
+    assert batched.update.await_count == 3
+    service.update.assert_not_awaited()
+    assert len({job.due for job in scheduler._jobs.values()}) == 1
+
+
+@pytest.mark.asyncio
+async def test_intervals_adapt_to_state_churn(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """Quiet devices back off to the ceiling, changing ones tighten to the floor."""
+    device = SimpleNamespace(mac="AA", on=False)
+    service = SimpleNamespace(update=AsyncMock(side_effect=lambda device: device))
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    scheduler.async_register(service, device, 30, Mock())
+    (job,) = scheduler._jobs.values()
+
+    for _ in range(20):
+        await scheduler._async_poll(job, service)
+    assert job.interval == 30 * scheduler_module.MAX_INTERVAL_FACTOR
+
+    async def flip(device: SimpleNamespace) -> SimpleNamespace:
+        device.on = not device.on
+        return device
+
+    service.update.side_effect = flip
+    for _ in range(10):
+        await scheduler._async_poll(job, service)
+    assert job.interval == 30 * scheduler_module.MIN_INTERVAL_FACTOR
+    (diagnostics,) = scheduler.async_diagnostics()
+    assert diagnostics["mac"] == "AA"
+    assert diagnostics["interval"] == job.interval
+
+
+@pytest.mark.asyncio
+async def test_command_polls_device_soon(
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """A commanded device is polled at its floor interval right away."""
+    device = SimpleNamespace(mac="AA")
+    service = SimpleNamespace(update=AsyncMock())
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    scheduler.async_register(service, device, 30, Mock())
+    (job,) = scheduler._jobs.values()
+    job.current_interval = job.ceiling
+    job.due += 1000
+
+    scheduler.async_device_commanded(service, device)
+
+    assert job.interval == job.floor
+    assert job.due <= time.monotonic() + job.floor
+
+
+@pytest.mark.asyncio
+async def test_failing_polls_back_off_and_warn_once(
+    caplog: pytest.LogCaptureFixture,
+    dispatcher: dict[str, list[Callable]],
+) -> None:
+    """A device that keeps failing is polled less often and logged once."""
+    device = SimpleNamespace(mac="AA")
+    service = SimpleNamespace(update=AsyncMock(side_effect=RuntimeError("offline")))
+    scheduler = WyzePollScheduler(Mock(), _entry())
+    scheduler.async_register(service, device, 30, Mock())
+    (job,) = scheduler._jobs.values()
+
+    for _ in range(20):
+        await scheduler._async_poll(job, service)
+
+    assert job.interval == 30 * scheduler_module.MAX_INTERVAL_FACTOR
+    assert job.failures == 20
+    warnings = [record for record in caplog.records if record.levelname == "WARNING"]
+    assert len(warnings) == 1
+
+    service.update.side_effect = None
+    service.update.return_value = device
+    await scheduler._async_poll(job, service)
+    assert job.failures == 0
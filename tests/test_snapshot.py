@@ -0,0 +1,108 @@
+"""Tests for the camera snapshot cache."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.wyzeapi.snapshot import WyzeSnapshotCache, snapshot_url
+
+
+def _camera(mac: str, thumbnail: str | None = None, event: str | None = None):
+    """Return a camera with a cloud thumbnail and an event screenshot."""
+    return SimpleNamespace(
+        mac=mac,
+        nickname=mac,
+        device_params={
+            "camera_thumbnails": {"thumbnails_url": thumbnail, "thumbnails_ts": 1}
+        },
+        last_event=None
+        if event is None
+        else SimpleNamespace(
+            event_ts=2,
+            file_list=[{"type": 2, "url": "video"}, {"type": 1, "url": event}],
+        ),
+    )
+
+
+@pytest.fixture
+def downloads(monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """Replace downloads with a slow fetch returning the URL as the image."""
+
+    async def download(camera: SimpleNamespace, url: str) -> bytes:
+        await asyncio.sleep(0.01)
+        return url.encode()
+
+    mock = AsyncMock(side_effect=download)
+    monkeypatch.setattr(WyzeSnapshotCache, "_async_download", mock)
+    return mock
+
+
+def _cache(**kwargs: object) -> WyzeSnapshotCache:
+    """Return a cache scaling images by tagging them with the size."""
+
+    async def executor_job(target, *args):
+        return target(*args)
+
+    hass = SimpleNamespace(
+        async_create_task=asyncio.ensure_future, async_add_executor_job=executor_job
+    )
+    return WyzeSnapshotCache(
+        hass, lambda image, w, h: image + b"@%dx%d" % (w, h), **kwargs
+    )
+
+
+def test_newest_snapshot_is_used() -> None:
+    """An event screenshot newer than the thumbnail wins."""
+    assert snapshot_url(_camera("A", thumbnail="thumb")) == "thumb"
+    assert snapshot_url(_camera("A", thumbnail="thumb", event="shot")) == "shot"
+    assert snapshot_url(_camera("A")) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_viewers_share_one_download(downloads: AsyncMock) -> None:
+    """A wall of cards costs one download per camera and serves resized copies."""
+    cache = _cache()
+    camera = _camera("A", thumbnail="thumb")
+
+    images = await asyncio.gather(
+        *(cache.async_image(camera) for _ in range(10)),
+        *(cache.async_image(camera, 320, 180) for _ in range(10)),
+    )
+    assert images[:10] == [b"thumb"] * 10
+    assert images[10:] == [b"thumb@320x180"] * 10
+    assert await cache.async_image(camera, 320, 180) == b"thumb@320x180"
+    downloads.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_expired_or_outdated_snapshots_are_fetched_again(
+    downloads: AsyncMock,
+) -> None:
+    """A new event or the end of the TTL replaces the cached image."""
+    cache = _cache(ttl=60)
+    camera = _camera("A", thumbnail="thumb")
+    await cache.async_image(camera)
+
+    camera.last_event = _camera("A", event="shot").last_event
+    assert await cache.async_image(camera) == b"shot"
+
+    for key, (fetched_at, url, image) in cache._images.items():
+        cache._images[key] = (fetched_at - 61, url, image)
+    await cache.async_image(camera)
+    assert downloads.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_images_are_dropped(downloads: AsyncMock) -> None:
+    """The cache never holds more than its maximum number of images."""
+    cache = _cache(max_size=2)
+    cameras = [_camera(mac, thumbnail=mac) for mac in "ABC"]
+
+    await cache.async_image(cameras[0])
+    await cache.async_image(cameras[1])
+    await cache.async_image(cameras[0])
+    await cache.async_image(cameras[2])
+
+    assert [key[0] for key in cache._images] == ["A", "C"]
@@ -0,0 +1,133 @@
+"""Tests for the camera stream info prefetcher."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.wyzeapi import stream_info as stream_info_module
+from custom_components.wyzeapi.rate_limiter import REQUEST_PRIORITY, RequestPriority
+from custom_components.wyzeapi.stream_info import (
+    WyzeStreamInfoPrefetcher,
+    go2rtc_source,
+    signaling_url_lifetime,
+)
+
+
+def _fetch(lifetime: float = 300) -> AsyncMock:
+    """Return a get_stream_info numbering the signaling URLs it signs."""
+    count = 0
+
+    async def fetch() -> dict:
+        nonlocal count
+        count += 1
+        return {
+            "signaling_url": f"wss://kvs/?X-Amz-Expires={lifetime}&n={count}",
+            "ice_servers": [],
+        }
+
+    return AsyncMock(side_effect=fetch)
+
+
+def test_lifetime_is_read_from_the_signed_url() -> None:
+    """The X-Amz-Expires parameter sets the lifetime, with a fallback."""
+    assert signaling_url_lifetime({"signaling_url": "wss://a/?X-Amz-Expires=60"}) == 60
+    assert signaling_url_lifetime({"signaling_url": "wss://a/"}) == 300
+
+
+def test_go2rtc_source_connects_to_the_kvs_channel() -> None:
+    """The go2rtc source carries the undoubled URL and the KVS ICE servers."""
+    source = go2rtc_source(
+        {
+            "signaling_url": "wss://kvs/?X-Amz-Credential=a%252Fb",
+            "ice_servers": [{"url": "turn:t", "username": "u", "credential": "c"}],
+        }
+    )
+
+    url, *options = source.split("#")
+    assert url == "webrtc:wss://kvs/?X-Amz-Credential=a%2Fb"
+    assert options[0] == "format=kinesis"
+    assert options[2] == (
+        'ice_servers=[{"urls":"turn:t","username":"u","credential":"c"}]'
+    )
+
+
+@pytest.mark.asyncio
+async def test_prefetched_info_is_handed_out_once() -> None:
+    """Each take gets a URL nobody used, and the next one is fetched right away."""
+    fetch = _fetch()
+    prefetcher = WyzeStreamInfoPrefetcher(fetch, "Porch")
+    await prefetcher.async_refresh()
+
+    first = await prefetcher.async_take()
+    assert fetch.await_count == 1
+    second, third = await asyncio.gather(
+        prefetcher.async_take(), prefetcher.async_take()
+    )
+
+    urls = {info["signaling_url"] for info in (first, second, third)}
+    assert len(urls) == 3
+    assert prefetcher.latest is not None
+    prefetcher.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_info_is_refreshed_before_it_expires() -> None:
+    """A ready URL is replaced before its expiry, even if it is short lived."""
+    # Shorter than REFRESH_MARGIN, so replaced halfway through its lifetime
+    fetch = _fetch(lifetime=0.02)
+    prefetcher = WyzeStreamInfoPrefetcher(fetch, "Porch")
+    await prefetcher.async_refresh()
+
+    async with asyncio.timeout(1):
+        while fetch.await_count < 3:
+            await asyncio.sleep(0.005)
+    prefetcher.async_stop()
+
+    assert prefetcher._ready is None
+    assert prefetcher._refresh_timer is None
+
+
+@pytest.mark.asyncio
+async def test_streams_without_a_prefetch_fetch_as_a_command() -> None:
+    """Only the fetch a viewer waits for skips the queued polls."""
+    priorities = []
+
+    async def fetch() -> dict:
+        priorities.append(REQUEST_PRIORITY.get())
+        return {"signaling_url": f"wss://kvs/?n={len(priorities)}"}
+
+    prefetcher = WyzeStreamInfoPrefetcher(fetch, "Porch")
+    with stream_info_module.request_priority(RequestPriority.COMMAND):
+        await prefetcher.async_take()
+    await prefetcher.async_refresh()
+
+    assert priorities == [RequestPriority.COMMAND, RequestPriority.POLL]
+    prefetcher.async_stop()
+
+
+@pytest.mark.asyncio
+async def test_prefetching_pauses_while_no_stream_starts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Unused URLs stop being replaced until the next stream takes one."""
+    monkeypatch.setattr(stream_info_module, "PREFETCH_IDLE_TIMEOUT", 0.05)
+    fetch = _fetch(lifetime=0.02)
+    prefetcher = WyzeStreamInfoPrefetcher(fetch, "Porch")
+    await prefetcher.async_refresh()
+
+    async with asyncio.timeout(1):
+        while (
+            prefetcher._refresh_timer is not None or not prefetcher._fetch_task.done()
+        ):
+            await asyncio.sleep(0.005)
+    paused_at = fetch.await_count
+    await asyncio.sleep(0.05)
+
+    assert fetch.await_count == paused_at
+    assert prefetcher._ready is None
+    await prefetcher.async_take()
+    assert fetch.await_count == paused_at + 1
+    # The take resumes prefetching
+    assert not prefetcher._fetch_task.done()
+    prefetcher.async_stop()
@@ -0,0 +1,63 @@
+"""Tests for the WebRTC session manager."""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.wyzeapi.webrtc_sessions import WyzeWebRTCSessionManager
+
+
+def test_oldest_sessions_are_closed_beyond_the_cap() -> None:
+    """Opening more sessions than allowed closes the oldest ones."""
+    manager = WyzeWebRTCSessionManager("Porch", max_sessions=2)
+    sessions = [Mock() for _ in range(3)]
+
+    for index, session in enumerate(sessions):
+        manager.async_add(str(index), session)
+
+    sessions[0].close_connection.assert_called_once_with()
+    assert manager.get("0") is None
+    assert len(manager) == 2
+
+
+def test_cleanup_closes_idle_and_old_sessions() -> None:
+    """Sessions past the idle or absolute timeout are closed, others kept."""
+    manager = WyzeWebRTCSessionManager("Porch", idle_timeout=10, max_age=100)
+    idle, old, active = Mock(), Mock(), Mock()
+    manager.async_add("idle", idle)
+    manager.async_add("old", old)
+    manager.async_add("active", active)
+    manager._sessions["idle"].active_at -= 11
+    manager._sessions["old"].started_at -= 101
+    manager.async_buffer_candidate("orphan", "candidate")
+    manager._pending_candidates["orphan"] = (-1000.0, ["candidate"])
+    manager.async_start = Mock()
+
+    manager._async_cleanup()
+
+    idle.close_connection.assert_called_once_with()
+    old.close_connection.assert_called_once_with()
+    active.close_connection.assert_not_called()
+    assert manager.async_pop_candidates("orphan") == []
+    manager.async_start.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_sessions_and_cancels_tasks() -> None:
+    """Removing the camera leaves no session, candidate or task behind."""
+    manager = WyzeWebRTCSessionManager("Porch")
+    manager.async_start()
+    session = Mock()
+    manager.async_add("a", session)
+    manager.async_buffer_candidate("b", "candidate")
+    task = manager.async_create_task(asyncio.sleep(3600), "run_loop")
+
+    manager.async_stop()
+    await asyncio.gather(task, return_exceptions=True)
+
+    session.close_connection.assert_called_once_with()
+    assert task.cancelled()
+    assert not manager._tasks
+    assert manager.async_pop_candidates("b") == []
+    assert manager._cleanup_timer is None
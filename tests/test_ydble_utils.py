@@ -0,0 +1,166 @@
+"""Tests for the Lock Bolt BLE framing helpers."""
+
+import random
+
+import pytest
+
+from custom_components.wyzeapi.ydble_utils import (
+    L1FrameDecoder,
+    crc,
+    ecb_cipher,
+    pack_l1,
+    pack_l2_dict,
+    pack_l2_lock_unlock,
+    parse_l1,
+    parse_l2_dict,
+)
+
+CHALLENGE_REQUEST = bytes.fromhex("ab000006d35e000191000a000127")
+
+# Frames a Lock Bolt sends over UART RX while unlocking
+UNLOCK_TRACE = [
+    bytes.fromhex("ab48000000000001"),
+    bytes.fromhex("ab4000155cb700038600d200105f1c0e8a93b2d47710ce29aa0b6f3d81"),
+    bytes.fromhex("ab48000000000002"),
+    bytes.fromhex("ab400006e8010004040001000100"),
+]
+UNLOCK_FRAMES = [
+    (b"", 0x48, 1),
+    (bytes.fromhex("8600d200105f1c0e8a93b2d47710ce29aa0b6f3d81"), 0x40, 3),
+    (b"", 0x48, 2),
+    (bytes.fromhex("040001000100"), 0x40, 4),
+]
+
+
+def _chunks(data: bytes, sizes: list[int]) -> list[bytes]:
+    """Split data into notifications of the given sizes, then the rest."""
+    chunks = []
+    for size in sizes:
+        chunks.append(data[:size])
+        data = data[size:]
+    return [*chunks, data]
+
+
+def _decode(decoder: L1FrameDecoder, chunks: list[bytes]) -> list[tuple]:
+    """Feed every chunk to the decoder and return the frames it completed."""
+    return [frame for chunk in chunks for frame in decoder.feed(chunk)]
+
+
+def test_crc_matches_crc16_arc_check_value() -> None:
+    """The table driven checksum is CRC-16/ARC."""
+    assert crc(b"123456789") == 0xBB3D
+    assert crc(b"") == 0
+
+
+def test_pack_matches_recorded_frames() -> None:
+    """Packed frames are byte for byte what the lock expects."""
+    assert pack_l1(0, 1, pack_l2_dict(0x91, 0, {10: b"\x27"})) == CHALLENGE_REQUEST
+    assert pack_l1(0x08, 5, b"") == bytes.fromhex("ab08000000000005")
+
+
+@pytest.mark.parametrize(
+    ("command", "expected"),
+    [
+        (
+            "lock",
+            "04000500020007040010a27999f0e2bfbe16f9959385ebcb2adc"
+            "ad000100f4000101f7000101",
+        ),
+        (
+            "unlock",
+            "04000500020007040010a17999f0e2bfbe16f9959385ebcb2adc"
+            "ad000100f4000101f7000101",
+        ),
+    ],
+)
+def test_pack_lock_unlock_matches_recorded_commands(
+    command: str, expected: str
+) -> None:
+    """The encrypted challenge is XORed with the command's magic bytes."""
+    ble_token = "0123456789abcdef0123456789abcdef"
+
+    l2_content = pack_l2_lock_unlock(7, ble_token, bytes(range(16)), command)
+
+    assert l2_content.hex() == expected
+    with pytest.raises(ValueError, match="Only accept"):
+        pack_l2_lock_unlock(7, ble_token, bytes(range(16)), "open")
+
+
+def test_ciphers_are_created_once_per_key() -> None:
+    """Every lock's key maps to a single reused cipher."""
+    assert ecb_cipher("0123456789abcdef") is ecb_cipher("0123456789abcdef")
+    assert ecb_cipher("0123456789abcdef") is not ecb_cipher("fedcba9876543210")
+
+
+def test_parse_round_trips_packed_frames() -> None:
+    """Parsing a packed frame returns its L2 content and dict."""
+    l2_content = pack_l2_dict(0x86, 0x01, {0xD2: bytes(range(16)), 0x01: b""})
+
+    l2_data, flags, seq_no, remain = parse_l1(pack_l1(0x40, 7, l2_content))
+    cmd, l2_flags, l2_dict = parse_l2_dict(l2_data)
+
+    assert (l2_data, flags, seq_no, remain) == (l2_content, 0x40, 7, 0)
+    assert (cmd, l2_flags) == (0x86, 0x01)
+    assert l2_dict == {0xD2: bytes(range(16)), 0x01: b""}
+
+
+def test_parse_reports_missing_bytes_of_a_fragment() -> None:
+    """A truncated frame is returned with the number of bytes still to come."""
+    l2_data, _, _, remain = parse_l1(CHALLENGE_REQUEST[:10])
+
+    assert l2_data == b"\x91\x00"
+    assert remain == 4
+
+
+def test_parse_rejects_corrupt_frames() -> None:
+    """Bad headers and checksums raise."""
+    with pytest.raises(ValueError, match="Unexpected data"):
+        parse_l1(b"\x00" + CHALLENGE_REQUEST[1:])
+    with pytest.raises(ValueError, match="CRC Checksum failed"):
+        parse_l1(CHALLENGE_REQUEST[:-1] + b"\x28")
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_decoder_reassembles_any_chunking(seed: int) -> None:
+    """Frames come out the same however the notifications split them."""
+    stream = b"".join(UNLOCK_TRACE)
+    rng = random.Random(seed)
+    sizes = [rng.randint(1, 12) for _ in range(len(stream) // 4)]
+    decoder = L1FrameDecoder()
+
+    assert _decode(decoder, _chunks(stream, sizes)) == UNLOCK_FRAMES
+    assert decoder.pending == 0
+
+
+def test_decoder_handles_single_bytes_and_frames_sharing_a_notification() -> None:
+    """One byte per notification and several frames per notification both work."""
+    stream = b"".join(UNLOCK_TRACE)
+
+    assert _decode(L1FrameDecoder(), [bytes([b]) for b in stream]) == UNLOCK_FRAMES
+    assert _decode(L1FrameDecoder(), [stream]) == UNLOCK_FRAMES
+
+
+def test_decoder_waits_for_the_rest_of_a_frame() -> None:
+    """A partial frame is kept until its last byte arrives."""
+    decoder = L1FrameDecoder()
+    frame = UNLOCK_TRACE[1]
+
+    assert _decode(decoder, [frame[:5], frame[5:20]]) == []
+    assert decoder.pending == 20
+    assert _decode(decoder, [frame[20:]]) == [UNLOCK_FRAMES[1]]
+
+
+def test_decoder_resyncs_after_garbage_and_corrupt_frames() -> None:
+    """Noise and frames failing their CRC are skipped."""
+    corrupt = bytearray(UNLOCK_TRACE[1])
+    corrupt[-1] ^= 0xFF
+    stream = b"\x00\x13" + bytes(corrupt) + UNLOCK_TRACE[3] + b"\xff"
+
+    assert _decode(L1FrameDecoder(), _chunks(stream, [3, 7, 9])) == [UNLOCK_FRAMES[3]]
+
+
+def test_decoder_resyncs_after_an_implausible_length() -> None:
+    """A noise header claiming a huge frame doesn't hold back the real one."""
+    stream = b"\xab\x40\xff\xff\x00\x00\x00\x00" + UNLOCK_TRACE[3]
+
+    assert _decode(L1FrameDecoder(), [stream]) == [UNLOCK_FRAMES[3]]